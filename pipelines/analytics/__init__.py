@@ -0,0 +1,9 @@
+"""
+Module d'analyse en mémoire pour JobMarket V3.
+Fournit des structures compactes pour les analyses sur les offres normalisées.
+"""
+
+from .near_duplicates import NearDuplicateIndex
+from .offer_table import CATEGORICAL_FIELDS, CategoricalColumn, OfferTable
+
+__all__ = ["CATEGORICAL_FIELDS", "CategoricalColumn", "NearDuplicateIndex", "OfferTable"]
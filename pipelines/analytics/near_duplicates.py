@@ -0,0 +1,313 @@
+"""
+Détection de quasi-doublons d'offres par MinHash + LSH.
+
+Une même offre republiée sous un nouvel identifiant, ou diffusée par plusieurs
+agences avec une description quasi identique, n'est pas détectée par la
+déduplication sur `id`. On compare ici le contenu (titre + description) :
+
+1. le texte est découpé en shingles de mots, hachés sur 32 bits (crc32, stable
+   d'une exécution à l'autre) ;
+2. les signatures MinHash sont calculées par batch avec NumPy
+   (permutations universelles (a*h + b) mod p, minimum par document) ;
+3. les signatures sont découpées en bandes (LSH) : seules les offres partageant
+   au moins un bucket sont comparées, ce qui évite la comparaison quadratique ;
+4. les paires dont la similarité estimée dépasse le seuil sont regroupées
+   (union-find) ; le groupe d'une offre est l'identifiant du premier membre indexé.
+
+L'index est incrémental : de nouvelles offres sont comparées aux buckets
+existants sans recalculer le corpus, et l'état peut être sauvegardé sur disque
+(tableaux NumPy .npz + métadonnées JSON, sans pickle).
+Une offre déjà indexée dont le texte a changé est re-signée : ses entrées de
+buckets sont remplacées et les groupes recalculés.
+"""
+
+import hashlib
+import json
+import os
+import re
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError(
+        "Le package 'numpy' n'est pas installé. "
+        "Installez-le avec: pip install numpy>=1.26.0"
+    )
+
+# Nombre premier > 2^32 - 1 : (a*h + b) reste exact sur uint64 pour a, b, h < 2^32
+_PRIME = np.uint64(4294967311)
+_MAX_HASH = np.uint32(0xFFFFFFFF)
+
+# Nombre maximal de shingles traités en une passe vectorisée (borne la mémoire)
+_CHUNK_SHINGLES = 20000
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def shingle_hashes(text: str, size: int = 3) -> np.ndarray:
+    """Empreintes 32 bits des shingles de `size` mots d'un texte (dédoublonnées)."""
+    tokens = _TOKEN.findall(text.lower())
+    if not tokens:
+        return np.empty(0, dtype=np.uint64)
+    if len(tokens) < size:
+        shingles = {" ".join(tokens)}
+    else:
+        shingles = {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+    return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def offer_text(offer: Dict[str, Any]) -> str:
+    """Texte comparé pour une offre normalisée : titre + description."""
+    return f"{offer.get('title') or ''} {offer.get('description') or ''}"
+
+
+def text_digest(text: str) -> bytes:
+    """Empreinte (8 octets) du texte comparé : détecte une offre modifiée."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+
+
+class NearDuplicateIndex:
+    """Index MinHash/LSH incrémental des offres."""
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, threshold: float = 0.8, shingle_size: int = 3, seed: int = 1):
+        """
+        Args:
+            num_perm: Nombre de permutations (taille des signatures)
+            bands: Nombre de bandes LSH (num_perm doit en être un multiple)
+            threshold: Similarité de Jaccard estimée minimale pour deux quasi-doublons
+            shingle_size: Nombre de mots par shingle
+            seed: Graine des permutations (doit rester stable pour un index persistant)
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm doit être un multiple de bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+
+        self.seed = seed
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 2**32 - 1, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.randint(0, 2**32 - 1, size=(num_perm, 1), dtype=np.uint64)
+
+        self.ids: List[str] = []
+        self._row_by_id: Dict[str, int] = {}
+        self._signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self._parent: List[int] = []
+        self._text_hashes: Dict[str, bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, offer_id: str) -> bool:
+        return offer_id in self._row_by_id
+
+    def signatures(self, texts: List[str]) -> np.ndarray:
+        """
+        Calcule les signatures MinHash d'un batch de textes.
+
+        Returns:
+            Matrice (len(texts), num_perm) uint32 ; ligne à 0xFFFFFFFF pour un texte vide
+        """
+        hashes = [shingle_hashes(t, self.shingle_size) for t in texts]
+        result = np.full((len(texts), self.num_perm), _MAX_HASH, dtype=np.uint32)
+
+        start = 0
+        while start < len(hashes):
+            # Regrouper des documents jusqu'à la taille de chunk
+            end, total = start, 0
+            while end < len(hashes) and (total == 0 or total + len(hashes[end]) <= _CHUNK_SHINGLES):
+                total += len(hashes[end])
+                end += 1
+            chunk = hashes[start:end]
+            lengths = np.array([len(h) for h in chunk])
+            if total:
+                values = np.concatenate(chunk)
+                permuted = ((self._a * values + self._b) % _PRIME).astype(np.uint32)
+                non_empty = np.flatnonzero(lengths)
+                offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))[non_empty]
+                result[start + non_empty] = np.minimum.reduceat(permuted, offsets, axis=1).T
+            start = end
+        return result
+
+    def _find(self, row: int) -> int:
+        parent = self._parent
+        while parent[row] != row:
+            parent[row] = parent[parent[row]]
+            row = parent[row]
+        return row
+
+    def _union(self, a: int, b: int) -> None:
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a != root_b:
+            # Le représentant reste le membre indexé en premier (identifiant stable)
+            first, second = sorted((root_a, root_b))
+            self._parent[second] = first
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        """Clés LSH d'une signature ([] pour un texte vide : pas de comparaison possible)."""
+        if signature[0] == _MAX_HASH and np.all(signature == _MAX_HASH):
+            return []
+        return [signature[b * self.rows:(b + 1) * self.rows].tobytes() for b in range(self.bands)]
+
+    def _link(self, row: int) -> None:
+        """Regroupe une offre avec les membres de ses buckets assez similaires."""
+        signature = self._signatures[row]
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+        candidates.discard(row)
+        if candidates:
+            rows = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            similarity = (self._signatures[rows] == signature).mean(axis=1)
+            for match in rows[similarity >= self.threshold]:
+                self._union(row, int(match))
+
+    def add(self, offers: Iterable[Dict[str, Any]]) -> int:
+        """
+        Ajoute des offres normalisées à l'index.
+
+        Une offre déjà indexée avec le même texte est ignorée ; si son texte a
+        changé, elle est re-signée (buckets remplacés) et les groupes sont
+        recalculés pour ses anciens groupes (elle peut en sortir).
+        Pour un identifiant répété, la dernière occurrence l'emporte.
+
+        Returns:
+            Nombre d'offres nouvelles ou modifiées indexées
+        """
+        pending: Dict[str, Tuple[str, bytes]] = {}
+        for offer in offers:
+            offer_id = offer.get("id")
+            if not offer_id:
+                continue
+            text = offer_text(offer)
+            digest = text_digest(text)
+            if self._text_hashes.get(offer_id) == digest:
+                pending.pop(offer_id, None)
+            else:
+                pending[offer_id] = (text, digest)
+        if not pending:
+            return 0
+
+        # Groupes des offres modifiées : leurs unions passées ne se défont pas,
+        # elles sont recalculées (les autres groupes ne sont pas concernés)
+        stale_roots = {self._find(self._row_by_id[i]) for i in pending if i in self._row_by_id}
+        affected = [row for row in range(len(self.ids)) if self._find(row) in stale_roots] if stale_roots else []
+
+        signatures = self.signatures([text for text, _ in pending.values()])
+        new_rows = []
+        for signature, (offer_id, (_, digest)) in zip(signatures, pending.items()):
+            self._text_hashes[offer_id] = digest
+            row = self._row_by_id.get(offer_id)
+            if row is None:
+                row = len(self.ids)
+                self.ids.append(offer_id)
+                self._row_by_id[offer_id] = row
+                self._parent.append(row)
+                new_rows.append((row, signature))
+                continue
+            # Offre modifiée : retirer les entrées de l'ancienne signature
+            for band, key in enumerate(self._band_keys(self._signatures[row])):
+                members = self._buckets[band][key]
+                members.remove(row)
+                if not members:
+                    del self._buckets[band][key]
+            self._signatures[row] = signature
+            for band, key in enumerate(self._band_keys(signature)):
+                self._buckets[band].setdefault(key, []).append(row)
+
+        if new_rows:
+            self._signatures = np.vstack([self._signatures] + [signature[None, :] for _, signature in new_rows])
+            for row, signature in new_rows:
+                for band, key in enumerate(self._band_keys(signature)):
+                    self._buckets[band].setdefault(key, []).append(row)
+
+        for row in affected:
+            self._parent[row] = row
+        for row in affected + [row for row, _ in new_rows]:
+            self._link(row)
+        return len(pending)
+
+    def group_of(self, offer_id: str) -> Optional[str]:
+        """Identifiant du groupe de quasi-doublons d'une offre (son propre id si isolée)."""
+        row = self._row_by_id.get(offer_id)
+        if row is None:
+            return None
+        return self.ids[self._find(row)]
+
+    def groups(self) -> Dict[str, str]:
+        """Groupe de chaque offre indexée : {id offre: id du groupe}."""
+        return {offer_id: self.ids[self._find(row)] for row, offer_id in enumerate(self.ids)}
+
+    def clusters(self, min_size: int = 2) -> List[List[str]]:
+        """Groupes d'au moins `min_size` offres, du plus grand au plus petit."""
+        members: Dict[int, List[str]] = {}
+        for row, offer_id in enumerate(self.ids):
+            members.setdefault(self._find(row), []).append(offer_id)
+        return sorted((m for m in members.values() if len(m) >= min_size), key=len, reverse=True)
+
+    def save(self, path: Path) -> None:
+        """
+        Sauvegarde l'index : métadonnées dans `path` (JSON), tableaux à côté (.npz).
+
+        Les buckets ne sont pas sauvegardés : ils se déduisent des signatures.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays_path = path.with_suffix(".npz")
+        tmp_arrays = arrays_path.with_suffix(".npz.tmp")
+        with tmp_arrays.open("wb") as f:
+            np.savez(f, signatures=self._signatures, parent=np.array(self._parent, dtype=np.int64), a=self._a, b=self._b)
+        state = {
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "threshold": self.threshold,
+            "shingle_size": self.shingle_size,
+            "seed": self.seed,
+            "ids": self.ids,
+            "text_hashes": {offer_id: digest.hex() for offer_id, digest in self._text_hashes.items()},
+        }
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_arrays, arrays_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "NearDuplicateIndex":
+        """
+        Recharge un index sauvegardé par save().
+
+        Raises:
+            ValueError: Fichiers incomplets ou incohérents entre eux
+        """
+        path = Path(path)
+        with path.open("r", encoding="utf-8") as f:
+            state = json.load(f)
+        with np.load(path.with_suffix(".npz"), allow_pickle=False) as arrays:
+            signatures, parent, a, b = arrays["signatures"], arrays["parent"], arrays["a"], arrays["b"]
+
+        try:
+            index = cls(state["num_perm"], state["bands"], state["threshold"], state["shingle_size"], state["seed"])
+            ids = state["ids"]
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"{path} ne contient pas un index de quasi-doublons") from e
+        if signatures.shape != (len(ids), index.num_perm) or len(parent) != len(ids):
+            raise ValueError(f"{path} et {path.with_suffix('.npz').name} ne correspondent pas")
+
+        index._a, index._b = a, b
+        index.ids = list(ids)
+        index._row_by_id = {offer_id: row for row, offer_id in enumerate(index.ids)}
+        index._signatures = signatures.astype(np.uint32, copy=False)
+        index._parent = parent.tolist()
+        index._text_hashes = {offer_id: bytes.fromhex(digest) for offer_id, digest in state.get("text_hashes", {}).items()}
+        for row, signature in enumerate(index._signatures):
+            for band, key in enumerate(index._band_keys(signature)):
+                index._buckets[band].setdefault(key, []).append(row)
+        return index
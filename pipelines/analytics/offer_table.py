@@ -0,0 +1,213 @@
+"""
+Table d'offres en mémoire avec encodage dictionnaire des champs catégoriels.
+
+Chaque colonne stocke un code entier (int32) par offre et un dictionnaire
+partagé code -> valeur. Les comptages et group-by s'exécutent sur les codes
+(NumPy) au lieu de compter des chaînes Python offre par offre.
+"""
+
+import json
+import math
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError(
+        "Le package 'numpy' n'est pas installé. "
+        "Installez-le avec: pip install numpy>=1.26.0"
+    )
+
+# Champs de faible cardinalité encodés par défaut
+CATEGORICAL_FIELDS = [
+    "contract_type",
+    "rome_code",
+    "location_department",
+    "experience_code",
+    "company_size",
+    "salary_unit",
+]
+
+# Code réservé aux valeurs absentes (None, "", [])
+NULL_CODE = -1
+
+# Au-delà de ce nombre de combinaisons possibles, group_counts ne compte que
+# les combinaisons présentes (un compteur int64 par cellule : 8 Mo ici)
+_DENSE_GROUP_CELLS = 1 << 20
+
+
+def _default_getter(offer: Dict[str, Any], field_name: str) -> Optional[Any]:
+    return offer.get(field_name)
+
+
+class CategoricalColumn:
+    """Colonne encodée : codes int32 + dictionnaire des valeurs distinctes."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.categories: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._codes = array("i")
+
+    def encode(self, value: Optional[Any]) -> int:
+        """Retourne le code d'une valeur (en l'ajoutant au dictionnaire si besoin)."""
+        if value is None or value == "" or value == []:
+            return NULL_CODE
+        key = value if isinstance(value, str) else str(value)
+        code = self._index.get(key)
+        if code is None:
+            code = len(self.categories)
+            self._index[key] = code
+            self.categories.append(key)
+        return code
+
+    def append(self, value: Optional[Any]) -> None:
+        self._codes.append(self.encode(value))
+
+    def set(self, row: int, value: Optional[Any]) -> None:
+        self._codes[row] = self.encode(value)
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    @property
+    def codes(self) -> np.ndarray:
+        """
+        Copie NumPy des codes.
+
+        Une vue (np.frombuffer) verrouillerait le tableau sous-jacent : tout
+        append() ultérieur lèverait BufferError tant qu'elle existe. La copie
+        est un simple memcpy de 4 octets par offre.
+        """
+        return np.array(self._codes, dtype=np.int32)
+
+    def _counts_with_null(self) -> np.ndarray:
+        """Comptages en une passe : index 0 = valeurs absentes, code + 1 sinon."""
+        return np.bincount(self.codes + 1, minlength=len(self.categories) + 1)
+
+    def counts(self) -> np.ndarray:
+        """Nombre d'offres par code (index = code)."""
+        return self._counts_with_null()[1:]
+
+    def null_count(self) -> int:
+        return int(self._counts_with_null()[0])
+
+    def value_counts(self, top: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Valeurs triées par fréquence décroissante (équivalent de Counter.most_common)."""
+        counts = self.counts()
+        order = np.argsort(-counts, kind="stable")
+        order = order[counts[order] > 0]
+        if top is not None:
+            order = order[:top]
+        return [(self.categories[i], int(counts[i])) for i in order]
+
+    def nbytes(self) -> int:
+        """Empreinte approximative : codes + dictionnaire."""
+        return self._codes.itemsize * len(self._codes) + sum(len(c) for c in self.categories)
+
+
+class OfferTable:
+    """
+    Table colonne d'offres normalisées, dédupliquées par `id`.
+
+    Comme les scripts d'analyse, la dernière occurrence d'un identifiant
+    remplace les précédentes.
+    """
+
+    def __init__(
+        self,
+        fields: Sequence[str] = CATEGORICAL_FIELDS,
+        value_getter: Callable[[Dict[str, Any], str], Optional[Any]] = _default_getter,
+    ):
+        self.fields = list(fields)
+        self.columns: Dict[str, CategoricalColumn] = {f: CategoricalColumn(f) for f in self.fields}
+        self.value_getter = value_getter
+        self._rows_by_id: Dict[str, int] = {}
+        self.total_raw = 0
+
+    @classmethod
+    def from_jsonl_files(
+        cls,
+        files: Iterable[Path],
+        fields: Sequence[str] = CATEGORICAL_FIELDS,
+        value_getter: Callable[[Dict[str, Any], str], Optional[Any]] = _default_getter,
+    ) -> "OfferTable":
+        """Construit la table en streaming (une ligne JSON à la fois)."""
+        table = cls(fields, value_getter)
+        for file_path in files:
+            with open(file_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        table.append(json.loads(line))
+        return table
+
+    def append(self, offer: Dict[str, Any]) -> None:
+        self.total_raw += 1
+        offer_id = offer.get("id")
+        if not offer_id:
+            return
+        row = self._rows_by_id.get(offer_id)
+        if row is None:
+            self._rows_by_id[offer_id] = len(self._rows_by_id)
+            for name, column in self.columns.items():
+                column.append(self.value_getter(offer, name))
+        else:
+            for name, column in self.columns.items():
+                column.set(row, self.value_getter(offer, name))
+
+    def extend(self, offers: Iterable[Dict[str, Any]]) -> None:
+        for offer in offers:
+            self.append(offer)
+
+    def __len__(self) -> int:
+        return len(self._rows_by_id)
+
+    @property
+    def duplicates(self) -> int:
+        return self.total_raw - len(self)
+
+    def value_counts(self, field_name: str, top: Optional[int] = None) -> List[Tuple[str, int]]:
+        return self.columns[field_name].value_counts(top)
+
+    def group_counts(self, fields: Sequence[str]) -> Dict[Tuple[str, ...], int]:
+        """
+        Comptage croisé sur plusieurs colonnes (ex: rome_code × location_department).
+
+        Les offres dont l'une des colonnes est absente sont écartées, puis les
+        codes sont combinés en un index linéaire. Si le produit des
+        cardinalités reste petit, un seul np.bincount dense compte toutes les
+        combinaisons ; sinon (ex: entreprise × ville × ROME) seules les
+        combinaisons présentes sont comptées par np.unique, sans tableau de
+        la taille du produit.
+        """
+        columns = [self.columns[f] for f in fields]
+        dims = tuple(len(c.categories) for c in columns)
+        codes = np.vstack([c.codes for c in columns])
+        codes = codes[:, np.all(codes != NULL_CODE, axis=0)]
+        if not codes.shape[1]:
+            return {}
+        flat = np.ravel_multi_index(codes, dims)
+        if math.prod(dims) <= _DENSE_GROUP_CELLS:
+            counts = np.bincount(flat, minlength=math.prod(dims))
+            linear = np.flatnonzero(counts)
+            counts = counts[linear]
+        else:
+            linear, counts = np.unique(flat, return_counts=True)
+        result = {}
+        for n, *indices in zip(counts, *np.unravel_index(linear, dims)):
+            result[tuple(c.categories[i] for c, i in zip(columns, indices))] = int(n)
+        return result
+
+    def nbytes(self) -> int:
+        return sum(c.nbytes() for c in self.columns.values())
+
+    def to_frame(self):
+        """Exporte la table en DataFrame pandas (colonnes `category`, sans recopie des chaînes)."""
+        import pandas as pd
+
+        return pd.DataFrame({
+            name: pd.Categorical.from_codes(column.codes, categories=column.categories)
+            for name, column in self.columns.items()
+        })
@@ -0,0 +1,7 @@
+"""
+Service HTTP de lecture pour JobMarket V3 (recherche, facettes, salaires, carte).
+"""
+
+from .service import ReadAPI, create_server
+
+__all__ = ["ReadAPI", "create_server"]
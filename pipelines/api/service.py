@@ -0,0 +1,366 @@
+"""
+Service HTTP de lecture pour le dashboard.
+
+Un seul point d'entrée, au-dessus d'un backend de stockage partagé
+(ElasticsearchClient : connexion et pool HTTP créés une fois au démarrage) :
+
+- GET /search  : recherche d'offres, pagination par curseur (search_after) ;
+- GET /facets  : répartitions (contrat, ROME, département...) en une requête ;
+- GET /salary  : repères salariaux (percentiles) ventilés par ROME, région... ;
+- GET /geo     : nombre d'offres par tuile cartographique (geotile_grid) ;
+- GET /health  : état du service et du cache.
+
+Les réponses sont mises en cache (LRU + TTL) et portent un ETag : un client
+qui renvoie If-None-Match reçoit un 304 sans corps. Les en-têtes
+Server-Timing / X-Cache indiquent le temps passé dans le backend et l'origine
+de la réponse.
+
+Le backend est injecté : les tests utilisent un backend de substitution
+local, sans Elasticsearch.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+import time
+import traceback
+from datetime import date, datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from pipelines.storage.backends import UnsupportedQuery
+from pipelines.storage.query_cache import QueryCache
+
+try:
+    from elastic_transport import TransportError
+except ImportError:  # stockage SQLite sans le client Elasticsearch
+    TransportError = None
+
+# Backend injoignable (réponse 502) ; toute autre exception est une erreur interne (500)
+BACKEND_UNAVAILABLE: Tuple[type, ...] = (ConnectionError, TimeoutError) + ((TransportError,) if TransportError else ())
+
+# Champs filtrables par paramètre de requête (?contract_type=CDI&rome_code=M1805)
+FILTER_FIELDS = ["contract_type", "rome_code", "location_department", "location_region", "experience_level"]
+# Champs disponibles pour /facets et pour la ventilation de /salary
+FACET_FIELDS = FILTER_FIELDS + ["skills", "location_city"]
+SALARY_GROUPS = ["rome_code", "location_region", "experience_level"]
+# Champs des offres renvoyés par /search
+SEARCH_FIELDS = [
+    "id", "title", "company_name", "location_city", "location_department", "contract_type",
+    "rome_code", "salary_annual_min", "salary_annual_max", "published_at", "url",
+]
+# Ordre stable pour search_after : date de publication puis identifiant
+SEARCH_SORT = [{"published_at": {"order": "desc", "missing": "_last"}}, {"id": "asc"}]
+MAX_PAGE_SIZE = 100
+
+
+class BadRequest(ValueError):
+    """Paramètre de requête invalide (réponse 400)."""
+
+
+def encode_cursor(sort_values: List[Any]) -> str:
+    """Curseur opaque transmis au client (valeurs de tri du dernier résultat)."""
+    payload = json.dumps(sort_values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise BadRequest("curseur invalide")
+    if not isinstance(values, list) or len(values) != len(SEARCH_SORT):
+        raise BadRequest("curseur invalide")
+    if not all(v is None or isinstance(v, (str, int, float)) for v in values):
+        raise BadRequest("curseur invalide")
+    return values
+
+
+def _int_param(params: Dict[str, List[str]], name: str, default: int, low: int, high: int) -> int:
+    raw = params.get(name, [None])[0]
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise BadRequest(f"'{name}' doit être un entier")
+    if not low <= value <= high:
+        raise BadRequest(f"'{name}' doit être compris entre {low} et {high}")
+    return value
+
+
+def _date_param(params: Dict[str, List[str]], name: str) -> Optional[str]:
+    """Date ISO (AAAA-MM-JJ, éventuellement suivie d'une heure) ou None si absente."""
+    raw = params.get(name, [None])[0]
+    if raw is None:
+        return None
+    try:
+        date.fromisoformat(raw[:10])
+        if len(raw) > 10:
+            datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    except ValueError:
+        raise BadRequest(f"'{name}' doit être une date AAAA-MM-JJ")
+    return raw
+
+
+def _choices(params: Dict[str, List[str]], name: str, allowed: List[str]) -> List[str]:
+    values = [v for raw in params.get(name, []) for v in raw.split(",") if v]
+    unknown = [v for v in values if v not in allowed]
+    if unknown:
+        raise BadRequest(f"'{name}' inconnu: {', '.join(unknown)} (valeurs possibles: {', '.join(allowed)})")
+    return values
+
+
+def build_query(params: Dict[str, List[str]]) -> Dict[str, Any]:
+    """
+    Clause "query" DSL à partir des paramètres communs à tous les endpoints.
+
+    - q : texte libre (titre, description, entreprise)
+    - <champ>=valeur : filtre exact sur FILTER_FIELDS (plusieurs valeurs = OU)
+    - published_from / published_to : bornes de date de publication (ISO)
+
+    Raises:
+        BadRequest: date invalide ou intervalle inversé
+    """
+    must: List[Dict[str, Any]] = []
+    filters: List[Dict[str, Any]] = []
+    text = params.get("q", [""])[0].strip()
+    if text:
+        must.append({"multi_match": {"query": text, "fields": ["title^3", "company_name^2", "description"]}})
+    for field in FILTER_FIELDS:
+        values = [v for raw in params.get(field, []) for v in raw.split(",") if v]
+        if values:
+            filters.append({"terms": {field: values}})
+    start, end = _date_param(params, "published_from"), _date_param(params, "published_to")
+    if start and end and start[:10] > end[:10]:
+        raise BadRequest("'published_from' doit précéder 'published_to'")
+    date_range = {op: value for op, value in (("gte", start), ("lte", end)) if value}
+    if date_range:
+        filters.append({"range": {"published_at": date_range}})
+    if not must and not filters:
+        return {"match_all": {}}
+    return {"bool": {"must": must, "filter": filters}}
+
+
+class ReadAPI:
+    """Routage et logique des endpoints, indépendants du transport HTTP."""
+
+    def __init__(self, backend: Any, cache_entries: int = 1024, cache_ttl: float = 30.0):
+        """
+        Args:
+            backend: Client de stockage partagé (ElasticsearchClient ou équivalent)
+            cache_entries: Taille du cache des réponses (0 = désactivé)
+            cache_ttl: Durée de vie d'une réponse en cache (secondes)
+        """
+        self.backend = backend
+        self.cache = QueryCache(max_entries=cache_entries, ttl=cache_ttl)
+        self.routes: Dict[str, Callable[[Dict[str, List[str]]], Dict[str, Any]]] = {
+            "/search": self.search,
+            "/facets": self.facets,
+            "/salary": self.salary,
+            "/geo": self.geo,
+        }
+
+    def handle(self, path: str, params: Dict[str, List[str]]) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        """
+        Traite une requête GET.
+
+        Returns:
+            (statut HTTP, corps JSON, métadonnées : "etag", "cache" HIT/MISS, "backend_ms")
+        """
+        if path == "/health":
+            return HTTPStatus.OK, {"status": "ok", "cache": self.cache.stats()}, {}
+        route = self.routes.get(path)
+        if route is None:
+            return HTTPStatus.NOT_FOUND, {"error": f"endpoint inconnu: {path}"}, {}
+
+        key = (path, json.dumps(sorted((k, sorted(v)) for k, v in params.items())))
+        cached = self.cache.get(key)
+        if cached is not None:
+            body, etag = cached
+            return HTTPStatus.OK, body, {"etag": etag, "cache": "HIT", "backend_ms": "0.0"}
+
+        started = time.perf_counter()
+        try:
+            body = route(params)
+        except BadRequest as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}, {}
+        except UnsupportedQuery as e:
+            # Limite connue du stockage (ex: /geo sous SQLite), pas une erreur du service
+            return HTTPStatus.NOT_IMPLEMENTED, {"error": str(e)}, {}
+        except BACKEND_UNAVAILABLE as e:
+            return HTTPStatus.BAD_GATEWAY, {"error": f"backend indisponible: {e}"}, {}
+        except Exception:
+            print(f"❌ Erreur interne sur {path}:\n{traceback.format_exc()}")
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "erreur interne"}, {}
+        backend_ms = (time.perf_counter() - started) * 1000
+
+        payload = json.dumps(body, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+        etag = '"' + hashlib.sha1(payload.encode("utf-8")).hexdigest() + '"'
+        self.cache.put(key, (body, etag))
+        return HTTPStatus.OK, body, {"etag": etag, "cache": "MISS", "backend_ms": f"{backend_ms:.1f}"}
+
+    def search(self, params: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Offres correspondant aux filtres, par pages de `size` (curseur `cursor`)."""
+        size = _int_param(params, "size", 20, 1, MAX_PAGE_SIZE)
+        body: Dict[str, Any] = {
+            "size": size,
+            "query": build_query(params),
+            "sort": SEARCH_SORT,
+            "_source": SEARCH_FIELDS,
+            "track_total_hits": True,
+        }
+        if "cursor" in params:
+            body["search_after"] = decode_cursor(params["cursor"][0])
+        result = self.backend.search(body)
+        hits = result["hits"]["hits"]
+        return {
+            "total": result["hits"]["total"]["value"],
+            "offers": [hit["_source"] for hit in hits],
+            # Page pleine : il peut rester des résultats après le dernier
+            "next_cursor": encode_cursor(hits[-1]["sort"]) if len(hits) == size else None,
+        }
+
+    def facets(self, params: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Répartition des offres filtrées sur un ou plusieurs champs (?field=contract_type,rome_code)."""
+        fields = _choices(params, "field", FACET_FIELDS)
+        if not fields:
+            raise BadRequest(f"paramètre 'field' requis (valeurs possibles: {', '.join(FACET_FIELDS)})")
+        size = _int_param(params, "size", 20, 1, 1000)
+        result = self.backend.search({
+            "size": 0,
+            "query": build_query(params),
+            "aggs": {field: {"terms": {"field": field, "size": size}} for field in fields},
+        })
+        aggregations = result["aggregations"]
+        return {
+            "total": result["hits"]["total"]["value"],
+            "facets": {
+                field: [{"key": b["key"], "count": b["doc_count"]} for b in aggregations[field]["buckets"]]
+                for field in fields
+            },
+        }
+
+    def salary(self, params: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Repères salariaux annuels (percentiles, rang d'un montant) par groupe (?by=rome_code&rank=40000)."""
+        groups = _choices(params, "by", SALARY_GROUPS)
+        if len(groups) > 1:
+            raise BadRequest("un seul champ 'by' à la fois")
+        try:
+            ranks = [float(v) for raw in params.get("rank", []) for v in raw.split(",") if v]
+        except ValueError:
+            raise BadRequest("'rank' doit être un montant")
+        benchmark = self.backend.salary_benchmark(
+            by=groups[0] if groups else None,
+            ranks=ranks,
+            query=build_query(params),
+            size=_int_param(params, "size", 20, 1, 200),
+        )
+        # Clés numériques converties en chaînes pour le JSON (50.0 -> "50")
+        return {
+            "groups": {
+                key: {
+                    "offers": row["offers"],
+                    "avg": row["avg"],
+                    "percentiles": {f"{p:g}": v for p, v in row["percentiles"].items()},
+                    "ranks": {f"{r:g}": v for r, v in row["ranks"].items()},
+                }
+                for key, row in benchmark.items()
+            }
+        }
+
+    def geo(self, params: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Nombre d'offres par tuile z/x/y au niveau de zoom demandé (?zoom=6)."""
+        zoom = _int_param(params, "zoom", 6, 0, 29)
+        result = self.backend.search({
+            "size": 0,
+            "query": build_query(params),
+            "aggs": {
+                "tiles": {
+                    "geotile_grid": {"field": "location_coordinates", "precision": zoom, "size": 10000},
+                    "aggs": {"center": {"geo_centroid": {"field": "location_coordinates"}}},
+                }
+            },
+        })
+        return {
+            "zoom": zoom,
+            "tiles": [
+                {
+                    "tile": bucket["key"],
+                    "count": bucket["doc_count"],
+                    "lat": bucket["center"]["location"]["lat"],
+                    "lon": bucket["center"]["location"]["lon"],
+                }
+                for bucket in result["aggregations"]["tiles"]["buckets"]
+            ],
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    api: ReadAPI  # renseigné par create_server
+    server_version = "JobMarketAPI/1.0"
+
+    def do_GET(self) -> None:
+        started = time.perf_counter()
+        url = urlsplit(self.path)
+        status, body, meta = self.api.handle(url.path.rstrip("/") or "/", parse_qs(url.query))
+
+        etag = meta.get("etag")
+        not_modified = etag is not None and etag in self.headers.get("If-None-Match", "")
+        data = b"" if not_modified else json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+
+        self.send_response(HTTPStatus.NOT_MODIFIED if not_modified else status)
+        if not not_modified:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", f"private, max-age={int(self.api.cache.ttl)}")
+            self.send_header("X-Cache", meta["cache"])
+        total_ms = (time.perf_counter() - started) * 1000
+        timing = f"total;dur={total_ms:.1f}"
+        if "backend_ms" in meta:
+            timing = f"backend;dur={meta['backend_ms']}, {timing}"
+        self.send_header("Server-Timing", timing)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Une ligne par requête, sans l'horodatage de BaseHTTPRequestHandler
+        print(f"   {self.command} {self.path} → {args[1] if len(args) > 1 else ''}")
+
+
+def create_server(
+    backend: Any,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    cache_entries: int = 1024,
+    cache_ttl: float = 30.0,
+    quiet: bool = False
+) -> ThreadingHTTPServer:
+    """
+    Crée le serveur HTTP (un thread par requête, backend partagé).
+
+    Usage:
+        server = create_server(ElasticsearchClient(connections_per_node=20), port=8000)
+        server.serve_forever()
+
+    Args:
+        backend: Client de stockage partagé par tous les threads
+        host: Adresse d'écoute
+        port: Port d'écoute (0 = port libre choisi par le système)
+        cache_entries: Taille du cache des réponses (0 = désactivé)
+        cache_ttl: Durée de vie d'une réponse en cache (secondes)
+        quiet: Si True, n'affiche pas une ligne par requête
+    """
+    attributes: Dict[str, Any] = {"api": ReadAPI(backend, cache_entries=cache_entries, cache_ttl=cache_ttl)}
+    if quiet:
+        attributes["log_message"] = lambda self, format, *args: None
+    handler = type("ReadAPIHandler", (_Handler,), attributes)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
@@ -0,0 +1,148 @@
+"""
+Référentiel géographique hors ligne : commune / code postal -> département -> région.
+
+Le référentiel tient en mémoire sous forme compacte :
+- une table département -> région (101 départements, 18 régions) ;
+- un index trié des débuts de plages de codes postaux, interrogé par
+  recherche dichotomique (bisect), construit une seule fois au premier usage.
+"""
+
+import re
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+
+# Régions (code INSEE -> libellé), découpage 2016
+REGIONS = {
+    "01": "Guadeloupe",
+    "02": "Martinique",
+    "03": "Guyane",
+    "04": "La Réunion",
+    "06": "Mayotte",
+    "11": "Île-de-France",
+    "24": "Centre-Val de Loire",
+    "27": "Bourgogne-Franche-Comté",
+    "28": "Normandie",
+    "32": "Hauts-de-France",
+    "44": "Grand Est",
+    "52": "Pays de la Loire",
+    "53": "Bretagne",
+    "75": "Nouvelle-Aquitaine",
+    "76": "Occitanie",
+    "84": "Auvergne-Rhône-Alpes",
+    "93": "Provence-Alpes-Côte d'Azur",
+    "94": "Corse",
+}
+
+# Départements (code INSEE -> code région)
+DEPARTMENT_REGIONS = {
+    "01": "84", "02": "32", "03": "84", "04": "93", "05": "93", "06": "93",
+    "07": "84", "08": "44", "09": "76", "10": "44", "11": "76", "12": "76",
+    "13": "93", "14": "28", "15": "84", "16": "75", "17": "75", "18": "24",
+    "19": "75", "2A": "94", "2B": "94", "21": "27", "22": "53", "23": "75",
+    "24": "75", "25": "27", "26": "84", "27": "28", "28": "24", "29": "53",
+    "30": "76", "31": "76", "32": "76", "33": "75", "34": "76", "35": "53",
+    "36": "24", "37": "24", "38": "84", "39": "27", "40": "75", "41": "24",
+    "42": "84", "43": "84", "44": "52", "45": "24", "46": "76", "47": "75",
+    "48": "76", "49": "52", "50": "28", "51": "44", "52": "44", "53": "52",
+    "54": "44", "55": "44", "56": "53", "57": "44", "58": "27", "59": "32",
+    "60": "32", "61": "28", "62": "32", "63": "84", "64": "75", "65": "76",
+    "66": "76", "67": "44", "68": "44", "69": "84", "70": "27", "71": "27",
+    "72": "52", "73": "84", "74": "84", "75": "11", "76": "28", "77": "11",
+    "78": "11", "79": "75", "80": "32", "81": "76", "82": "76", "83": "93",
+    "84": "93", "85": "52", "86": "75", "87": "75", "88": "44", "89": "27",
+    "90": "27", "91": "11", "92": "11", "93": "11", "94": "11", "95": "11",
+    "971": "01", "972": "02", "973": "03", "974": "04", "976": "06",
+}
+
+# Plages de codes postaux ne suivant pas la règle "2 premiers chiffres" :
+# (début de plage, département). Une plage court jusqu'au début de la suivante.
+_POSTAL_RANGE_OVERRIDES = [
+    (0, None),
+    (20000, "2A"),  # Corse-du-Sud : 200xx-201xx
+    (20200, "2B"),  # Haute-Corse : 202xx-206xx
+    (96000, None),
+    (97000, None),
+    (97100, "971"),
+    (97133, "977"),  # Saint-Barthélemy (hors région)
+    (97134, "971"),
+    (97150, "978"),  # Saint-Martin (hors région)
+    (97151, "971"),
+    (97200, "972"),
+    (97300, "973"),
+    (97400, "974"),
+    (97500, "975"),  # Saint-Pierre-et-Miquelon (hors région)
+    (97600, "976"),
+    (97700, None),
+    (98000, None),   # Monaco, collectivités du Pacifique
+]
+
+_postal_starts: Optional[List[int]] = None
+_postal_departments: Optional[List[Optional[str]]] = None
+
+# Libellé France Travail "69 - LYON 03" : département en préfixe
+_LABEL_DEPARTMENT = re.compile(r"^\s*(\d{2,3}|2[AB])\s*-")
+
+
+def _build_postal_index() -> None:
+    """Construit l'index trié des plages de codes postaux (une seule fois)."""
+    global _postal_starts, _postal_departments
+    ranges = dict(_POSTAL_RANGE_OVERRIDES)
+    for dept in DEPARTMENT_REGIONS:
+        if len(dept) == 2 and dept.isdigit():
+            ranges.setdefault(int(dept) * 1000, dept)
+    ordered = sorted(ranges.items())
+    _postal_starts = [start for start, _ in ordered]
+    _postal_departments = [dept for _, dept in ordered]
+
+
+def department_from_postal_code(postal_code: Optional[str]) -> Optional[str]:
+    """Département d'un code postal (ex: "69003" -> "69", "20090" -> "2A")."""
+    if not postal_code:
+        return None
+    postal_code = str(postal_code).strip()
+    if len(postal_code) != 5 or not postal_code.isdigit():
+        return None
+    if _postal_starts is None:
+        _build_postal_index()
+    return _postal_departments[bisect_right(_postal_starts, int(postal_code)) - 1]
+
+
+def department_from_commune_code(commune_code: Optional[str]) -> Optional[str]:
+    """Département d'un code commune INSEE (ex: "75056" -> "75", "2A004" -> "2A", "97411" -> "974")."""
+    if not commune_code:
+        return None
+    commune_code = str(commune_code).strip().upper()
+    if len(commune_code) != 5:
+        return None
+    dept = commune_code[:3] if commune_code.startswith("97") else commune_code[:2]
+    return dept if dept in DEPARTMENT_REGIONS else None
+
+
+def region_of_department(department: Optional[str]) -> Optional[str]:
+    """Libellé de la région d'un département (None hors régions)."""
+    region_code = DEPARTMENT_REGIONS.get(department) if department else None
+    return REGIONS.get(region_code) if region_code else None
+
+
+def lookup_location(
+    commune_code: Optional[str] = None,
+    postal_code: Optional[str] = None,
+    label: Optional[str] = None,
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Résout le département et la région d'un lieu de travail.
+
+    Priorité : code commune INSEE, puis code postal, puis préfixe du libellé
+    ("75 - Paris 15e Arrondissement").
+
+    Returns:
+        Tuple (code département, libellé région)
+    """
+    department = department_from_commune_code(commune_code) or department_from_postal_code(postal_code)
+    if department is None and label:
+        match = _LABEL_DEPARTMENT.match(label)
+        if match:
+            candidate = match.group(1)
+            if candidate in DEPARTMENT_REGIONS:
+                department = candidate
+    return department, region_of_department(department)
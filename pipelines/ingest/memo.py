@@ -0,0 +1,124 @@
+"""
+Mémoïsation bornée (LRU) pour les parseurs purs de la normalisation.
+
+Les libellés catégoriels (expérience, durée de travail, libellé de salaire...)
+se répètent des milliers de fois d'une offre à l'autre : on ne parse chaque
+valeur distincte qu'une seule fois et on expose des compteurs de hits/misses
+(appels réels) et de valeurs pré-calculées (primed).
+"""
+
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Optional
+
+# Capacité par défaut d'un cache : quelques centaines de valeurs distinctes
+# suffisent largement pour les libellés France Travail.
+DEFAULT_MAXSIZE = 1024
+
+# Plafond absolu lors d'un redimensionnement piloté par la cardinalité d'un batch
+MAX_RESERVED_SIZE = 65536
+
+_registry: Dict[str, "MemoizedParser"] = {}
+
+
+class MemoizedParser:
+    """Enveloppe LRU bornée autour d'une fonction pure à un argument hashable."""
+
+    def __init__(self, func: Callable[[Any], Any], maxsize: int = DEFAULT_MAXSIZE, name: Optional[str] = None):
+        self.func = func
+        self.maxsize = maxsize
+        self.name = name or func.__name__
+        self.hits = 0
+        self.misses = 0
+        self.primed = 0  # valeurs calculées par prime(), hors appels réels
+        self._cache: "OrderedDict[Any, Any]" = OrderedDict()
+
+    def __call__(self, value: Any) -> Any:
+        try:
+            result = self._cache[value]
+        except KeyError:
+            self.misses += 1
+            result = self.func(value)
+            self._cache[value] = result
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+            return result
+        except TypeError:
+            # Valeur non hashable (donnée inattendue) : pas de cache
+            self.misses += 1
+            return self.func(value)
+        self.hits += 1
+        self._cache.move_to_end(value)
+        return result
+
+    def reserve(self, distinct_count: int) -> None:
+        """
+        Agrandit le cache pour contenir `distinct_count` valeurs distinctes.
+
+        Le cache ne rétrécit jamais ici : un batch de faible cardinalité ne doit
+        pas évincer les valeurs chaudes des batches précédents.
+        """
+        self.maxsize = max(self.maxsize, min(distinct_count, MAX_RESERVED_SIZE))
+
+    def prime(self, values: Iterable[Any]) -> int:
+        """
+        Pré-calcule les valeurs distinctes d'un batch (taille du cache ajustée).
+
+        Les valeurs calculées ici sont comptées dans `primed` et non dans
+        `misses` : hits et misses ne reflètent que les appels réels.
+
+        Returns:
+            Nombre de valeurs distinctes rencontrées
+        """
+        distinct = {v for v in values if v is not None}
+        self.reserve(len(distinct))
+        for value in distinct:
+            if value in self._cache:
+                # Valeur du batch déjà en cache : la protéger de l'éviction ci-dessous
+                self._cache.move_to_end(value)
+            else:
+                self.primed += 1
+                self._cache[value] = self.func(value)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return len(distinct)
+
+    def cache_clear(self) -> None:
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+        self.primed = 0
+
+    def cache_stats(self) -> Dict[str, Any]:
+        calls = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "primed": self.primed,
+            "size": len(self._cache),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / calls if calls else 0.0,
+        }
+
+
+def memoized(maxsize: int = DEFAULT_MAXSIZE, name: Optional[str] = None) -> Callable[[Callable[[Any], Any]], MemoizedParser]:
+    """Décorateur : mémoïse une fonction pure et l'enregistre pour les statistiques."""
+
+    def decorator(func: Callable[[Any], Any]) -> MemoizedParser:
+        memo = MemoizedParser(func, maxsize=maxsize, name=name)
+        wraps(func)(memo)
+        _registry[memo.name] = memo
+        return memo
+
+    return decorator
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Retourne les compteurs de tous les caches enregistrés, par nom."""
+    return {name: memo.cache_stats() for name, memo in _registry.items()}
+
+
+def clear_caches() -> None:
+    """Vide tous les caches enregistrés et remet les compteurs à zéro."""
+    for memo in _registry.values():
+        memo.cache_clear()
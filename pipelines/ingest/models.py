@@ -23,11 +23,12 @@ class JobOffer:
     
     # === Localisation ===
     location_city: Optional[str] = None
-    location_department: Optional[str] = None
-    location_region: Optional[str] = None
+    location_department: Optional[str] = None  # Code département (75, 2A, 971...)
+    location_region: Optional[str] = None  # Libellé de la région
     location_latitude: Optional[float] = None  # Coordonnées GPS
     location_longitude: Optional[float] = None
     location_commune_code: Optional[str] = None  # Code INSEE commune
+    location_postal_code: Optional[str] = None  # Code postal du lieu de travail
     
     # === Contrat ===
     contract_type: Optional[str] = None
@@ -41,6 +42,8 @@ class JobOffer:
     salary_min: Optional[float] = None
     salary_max: Optional[float] = None
     salary_unit: Optional[str] = None  # horaire, mensuel, annuel
+    salary_annual_min: Optional[float] = None  # Salaire annuel brut en EUR (calculé à la normalisation)
+    salary_annual_max: Optional[float] = None
     salary_comment: Optional[str] = None  # Commentaire sur le salaire
     salary_benefits: Optional[List[str]] = None  # Avantages (primes, mutuelle...)
     
@@ -76,6 +79,9 @@ class JobOffer:
     qualification_code: Optional[str] = None  # Code qualification
     qualification_label: Optional[str] = None  # Libellé qualification
     url: Optional[str] = None  # URL de l'offre originale
+    mapping_version: Optional[str] = None  # Version du mapping ayant produit l'offre
+    raw_hash: Optional[str] = None  # Empreinte du contenu brut (régénération incrémentale)
+    duplicate_group: Optional[str] = None  # Groupe de quasi-doublons (id du premier membre)
     raw: Optional[Dict[str, Any]] = None  # Données brutes complètes
 
     def to_dict(self) -> Dict[str, Any]:
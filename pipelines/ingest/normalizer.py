@@ -1,10 +1,135 @@
-from typing import Any, Dict
+"""
+Normalisation des offres brutes vers le schéma canonique JobOffer.
+
+Les adapters de source sont enregistrés par chemin de module
+("paquet.module:fonction") et importés uniquement au premier usage : un script
+qui ne normalise qu'une source ne paie pas l'import des autres adapters.
+Des adapters externes peuvent aussi s'enregistrer via le groupe d'entry points
+`jobmarket.sources`.
+"""
+
+import hashlib
+import importlib
+import json
+import time
+from importlib import metadata
+from typing import Any, Callable, Dict, Iterable, List, Optional
 
 from pipelines.ingest.models import JobOffer
-from pipelines.ingest.sources.francetravail.mapping import map_france_travail
+
+ENTRY_POINT_GROUP = "jobmarket.sources"
+
+# Adapters intégrés : source -> "module:fonction de mapping"
+_SOURCE_PATHS: Dict[str, str] = {
+    "francetravail": "pipelines.ingest.sources.francetravail.mapping:map_france_travail",
+}
+
+# Adapters déjà importés : source -> (fonction de mapping, version du mapping)
+_loaded: Dict[str, tuple[Callable[[Dict[str, Any]], JobOffer], str]] = {}
+
+# Durée d'import de chaque adapter (secondes)
+_import_seconds: Dict[str, float] = {}
+
+_entry_points_loaded = False
+
+
+def register_source(source: str, target: str) -> None:
+    """
+    Enregistre un adapter sans l'importer.
+
+    Args:
+        source: Nom de la source (ex: "francetravail")
+        target: Chemin "module:fonction" de la fonction de mapping. Le module peut
+                définir MAPPING_VERSION (versionnement des offres normalisées).
+    """
+    _SOURCE_PATHS[source] = target
+    _loaded.pop(source, None)
+
+
+def _load_entry_points() -> None:
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    for entry_point in metadata.entry_points(group=ENTRY_POINT_GROUP):
+        _SOURCE_PATHS.setdefault(entry_point.name, entry_point.value)
+
+
+def _resolve(source: str) -> tuple[Callable[[Dict[str, Any]], JobOffer], str]:
+    adapter = _loaded.get(source)
+    if adapter is not None:
+        return adapter
+
+    target = _SOURCE_PATHS.get(source)
+    if target is None:
+        _load_entry_points()
+        target = _SOURCE_PATHS.get(source)
+    if target is None:
+        raise ValueError(f"Unsupported source: {source}")
+
+    module_path, _, attr = target.partition(":")
+    started = time.perf_counter()
+    module = importlib.import_module(module_path)
+    _import_seconds[source] = time.perf_counter() - started
+
+    adapter = (getattr(module, attr), str(getattr(module, "MAPPING_VERSION", "0")))
+    _loaded[source] = adapter
+    return adapter
+
+
+def available_sources() -> list[str]:
+    """Liste des sources enregistrées (importées ou non)."""
+    _load_entry_points()
+    return sorted(_SOURCE_PATHS)
+
+
+def registry_stats() -> Dict[str, Dict[str, Optional[float]]]:
+    """Pour chaque source enregistrée : chargée ou non et coût d'import en millisecondes."""
+    return {
+        source: {
+            "loaded": source in _loaded,
+            "import_ms": _import_seconds[source] * 1000 if source in _import_seconds else None,
+        }
+        for source in sorted(_SOURCE_PATHS)
+    }
+
+
+def raw_content_hash(raw: Dict[str, Any]) -> str:
+    """Empreinte stable du contenu brut d'une offre (indépendante de l'ordre des clés)."""
+    payload = json.dumps(raw, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def mapping_version(source: str) -> str:
+    """Version courante du mapping d'une source."""
+    return _resolve(source)[1]
+
+
+def _map_offer(raw: Dict[str, Any], source: str) -> JobOffer:
+    mapper, version = _resolve(source)
+    offer = mapper(raw)
+    offer.mapping_version = version
+    offer.raw_hash = raw_content_hash(raw)
+    return offer
 
 
 def normalize_offer(raw: Dict[str, Any], source: str) -> JobOffer:
-    if source == "francetravail":
-        return map_france_travail(raw)
-    raise ValueError(f"Unsupported source: {source}")
+    from pipelines.ingest.salary import annual_salary
+
+    offer = _map_offer(raw, source)
+    offer.salary_annual_min = annual_salary(offer.salary_min, offer.salary_unit, offer.weekly_hours)
+    offer.salary_annual_max = annual_salary(offer.salary_max, offer.salary_unit, offer.weekly_hours)
+    return offer
+
+
+def normalize_offers(raws: Iterable[Dict[str, Any]], source: str) -> List[Dict[str, Any]]:
+    """
+    Normalise un lot d'offres brutes en dictionnaires.
+
+    Les salaires annuels (salary_annual_min / salary_annual_max) sont calculés
+    pour tout le lot en une passe vectorisée (NumPy importé au premier lot,
+    pas à l'import du normalizer).
+    """
+    from pipelines.ingest.salary import annualize_salaries
+
+    return annualize_salaries([_map_offer(raw, source).to_dict() for raw in raws])
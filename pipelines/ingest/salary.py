@@ -0,0 +1,98 @@
+"""
+Salaires annuels normalisés (EUR brut par an).
+
+Les offres expriment leur salaire à l'heure, au mois ou à l'année
+(`salary_unit`) : moyenner `salary_min` tous types confondus n'a pas de sens.
+Les montants sont ramenés à l'année :
+
+- horaire : montant x heures hebdomadaires (35 h par défaut) x 52 semaines ;
+- mensuel : montant x 12 ;
+- annuel  : montant.
+
+`annual_salary` convertit un montant (offre unique), `annualize_salaries`
+renseigne `salary_annual_min` / `salary_annual_max` pour un lot d'offres en
+une passe vectorisée (NumPy, importé au premier lot).
+"""
+
+import math
+from typing import Any, Dict, List, Optional
+
+DEFAULT_WEEKLY_HOURS = 35.0
+WEEKS_PER_YEAR = 52.0
+MONTHS_PER_YEAR = 12.0
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and not math.isnan(value)
+
+
+def annual_salary(amount: Any, unit: Optional[str], weekly_hours: Any = None) -> Optional[float]:
+    """
+    Montant annuel brut d'un salaire exprimé dans l'unité `unit`.
+
+    Args:
+        amount: Montant dans l'unité d'origine
+        unit: "hourly", "monthly" ou "yearly"
+        weekly_hours: Heures hebdomadaires (salaires horaires ; défaut: 35 h)
+
+    Returns:
+        Montant annuel arrondi au centime, None si le montant ou l'unité manque
+    """
+    if not _is_number(amount):
+        return None
+    hours = weekly_hours if _is_number(weekly_hours) and weekly_hours > 0 else DEFAULT_WEEKLY_HOURS
+    factor = {"hourly": hours * WEEKS_PER_YEAR, "monthly": MONTHS_PER_YEAR, "yearly": 1.0}.get(unit)
+    if factor is None:
+        return None
+    return round(amount * factor, 2)
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError(
+            "Le package 'numpy' n'est pas installé. "
+            "Installez-le avec: pip install numpy>=1.26.0"
+        )
+    return np
+
+
+def annualize_salaries(offers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Renseigne salary_annual_min / salary_annual_max sur un lot d'offres normalisées.
+
+    Même résultat que annual_salary() offre par offre, en une passe vectorisée.
+
+    Args:
+        offers: Offres normalisées (dictionnaires), modifiées en place
+
+    Returns:
+        Les mêmes offres (pour chaîner les appels)
+    """
+    if not offers:
+        return offers
+    np = _numpy()
+
+    def column(field: str) -> "np.ndarray":
+        # Valeurs numériques d'un champ (NaN si absent ou non numérique)
+        return np.array(
+            [value if _is_number(value) else np.nan for value in (offer.get(field) for offer in offers)],
+            dtype=np.float64
+        )
+
+    units = np.array([offer.get("salary_unit") or "" for offer in offers], dtype=object)
+    hours = column("weekly_hours")
+    hours = np.where(np.isnan(hours) | (hours <= 0), DEFAULT_WEEKLY_HOURS, hours)
+    factor = np.select(
+        [units == "hourly", units == "monthly", units == "yearly"],
+        [hours * WEEKS_PER_YEAR, MONTHS_PER_YEAR, 1.0],
+        default=np.nan
+    )
+
+    for field in ("salary_min", "salary_max"):
+        annual = np.round(column(field) * factor, 2)
+        target = field.replace("salary_", "salary_annual_")
+        for offer, value in zip(offers, annual.tolist()):
+            offer[target] = None if math.isnan(value) else value
+    return offers
@@ -5,7 +5,7 @@ from pathlib import Path
 from typing import Any, Dict, List
 
 from pipelines.ingest.io import write_jsonl
-from pipelines.ingest.normalizer import normalize_offer
+from pipelines.ingest.normalizer import normalize_offers
 from pipelines.ingest.sources.francetravail.client import FranceTravailClient
 
 
@@ -174,7 +174,7 @@ def run(sample: bool = False, rome_codes: List[str] = None, keywords: str = None
             print(status_msg)
             
             write_jsonl(raw_path, new_offers)
-            normalized = [normalize_offer(raw, "francetravail").to_dict() for raw in new_offers]
+            normalized = normalize_offers(new_offers, "francetravail")
             write_jsonl(normalized_path, normalized)
             
             total_collected += len(new_offers)
@@ -2,7 +2,14 @@ from datetime import datetime, timezone
 from typing import Any, Dict, Optional, List
 import re
 
+from pipelines.ingest.geo import lookup_location
+from pipelines.ingest.memo import memoized
 from pipelines.ingest.models import JobOffer
+from pipelines.ingest.sources.francetravail.reference_data import classify_experience_level
+
+# Version du mapping : à incrémenter à chaque modification qui change la sortie
+# normalisée, afin que la régénération incrémentale re-mappe les offres concernées.
+MAPPING_VERSION = "4"
 
 
 def _get_nested(data: Dict[str, Any], path: str) -> Optional[Any]:
@@ -17,6 +24,50 @@ def _get_nested(data: Dict[str, Any], path: str) -> Optional[Any]:
     return current
 
 
+# Durée de versement dans un libellé de salaire ("sur 12.0 mois", "sur 13 mois")
+_SALARY_MONTHS = re.compile(r"\bsur\s+\d+(?:[.,]\d+)?\s*mois\b", re.IGNORECASE)
+
+
+@memoized(name="salary_libelle")
+def _parse_salary_libelle(libelle: str) -> tuple[Optional[float], Optional[float], Optional[str]]:
+    """Parse un libellé de salaire (ex: "Mensuel de 2500.0 Euros à 3000.0 Euros").
+    
+    Les libellés se répètent fortement d'une offre à l'autre : le résultat est mémoïsé.
+    
+    Returns:
+        Tuple (salary_min, salary_max, salary_unit)
+    """
+    salary_min = None
+    salary_max = None
+    salary_unit = None
+    
+    # Extraire l'unité (Horaire, Mensuel, Annuel)
+    if "Horaire" in libelle or "horaire" in libelle:
+        salary_unit = "hourly"
+    elif "Mensuel" in libelle or "mensuel" in libelle:
+        salary_unit = "monthly"
+    elif "Annuel" in libelle or "annuel" in libelle:
+        salary_unit = "yearly"
+    
+    # Extraire les montants, sans la durée de versement ("... sur 12.0 mois"),
+    # qui serait sinon lue comme montant maximum
+    amounts = _SALARY_MONTHS.sub(" ", libelle)
+    numbers = re.findall(r'\d+\.?\d*', amounts)
+    if len(numbers) >= 2:
+        try:
+            salary_min = float(numbers[0])
+            salary_max = float(numbers[1])
+        except (ValueError, IndexError):
+            pass
+    elif len(numbers) == 1:
+        try:
+            salary_min = float(numbers[0])
+        except ValueError:
+            pass
+    
+    return salary_min, salary_max, salary_unit
+
+
 def _parse_salary(salary_data: Dict[str, Any]) -> tuple[Optional[float], Optional[float], Optional[str], Optional[str]]:
     """Parse les données de salaire France Travail.
     
@@ -31,30 +82,9 @@ def _parse_salary(salary_data: Dict[str, Any]) -> tuple[Optional[float], Optiona
     salary_unit = None
     salary_comment = salary_data.get("commentaire")
     
-    # Parser le libellé (ex: "Mensuel de 2500.0 Euros à 3000.0 Euros")
     libelle = salary_data.get("libelle", "")
     if libelle:
-        # Extraire l'unité (Horaire, Mensuel, Annuel)
-        if "Horaire" in libelle or "horaire" in libelle:
-            salary_unit = "hourly"
-        elif "Mensuel" in libelle or "mensuel" in libelle:
-            salary_unit = "monthly"
-        elif "Annuel" in libelle or "annuel" in libelle:
-            salary_unit = "yearly"
-        
-        # Extraire les montants
-        numbers = re.findall(r'\d+\.?\d*', libelle)
-        if len(numbers) >= 2:
-            try:
-                salary_min = float(numbers[0])
-                salary_max = float(numbers[1])
-            except (ValueError, IndexError):
-                pass
-        elif len(numbers) == 1:
-            try:
-                salary_min = float(numbers[0])
-            except ValueError:
-                pass
+        salary_min, salary_max, salary_unit = _parse_salary_libelle(libelle)
     
     return salary_min, salary_max, salary_unit, salary_comment
 
@@ -165,8 +195,9 @@ def _extract_work_context(context: Dict[str, Any]) -> Optional[List[str]]:
     return contexts if contexts else None
 
 
+@memoized(name="weekly_hours")
 def _parse_weekly_hours(duree_travail: str) -> Optional[float]:
-    """Parse le nombre d'heures hebdomadaires.
+    """Parse le nombre d'heures hebdomadaires (résultat mémoïsé).
     
     Ex: "35H/semaine" -> 35.0
     """
@@ -183,6 +214,29 @@ def _parse_weekly_hours(duree_travail: str) -> Optional[float]:
     return None
 
 
+def warm_parser_caches(raw_offers: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Pré-remplit les caches des parseurs avec les valeurs distinctes d'un batch.
+    
+    La taille de chaque cache est ajustée à la cardinalité observée, ce qui
+    évite les évictions lorsqu'un gros batch contient plus de libellés
+    distincts que la capacité par défaut.
+    
+    Returns:
+        Nombre de valeurs distinctes par parseur
+    """
+    return {
+        "weekly_hours": _parse_weekly_hours.prime(
+            o.get("dureeTravailLibelle") for o in raw_offers if o.get("dureeTravailLibelle")
+        ),
+        "salary_libelle": _parse_salary_libelle.prime(
+            _get_nested(o, "salaire.libelle") for o in raw_offers if _get_nested(o, "salaire.libelle")
+        ),
+        "experience_level": classify_experience_level.prime(
+            o.get("experienceLibelle") for o in raw_offers
+        ),
+    }
+
+
 def map_france_travail(raw_offer: Dict[str, Any], include_raw: bool = False) -> JobOffer:
     """Mappe les données brutes France Travail vers le modèle JobOffer enrichi.
     
@@ -210,10 +264,15 @@ def map_france_travail(raw_offer: Dict[str, Any], include_raw: bool = False) ->
     
     # === Localisation ===
     location_city = _get_nested(raw_offer, "lieuTravail.libelle") or raw_offer.get("lieu")
-    location_department = _get_nested(raw_offer, "lieuTravail.codePostal")
     location_latitude = _get_nested(raw_offer, "lieuTravail.latitude")
     location_longitude = _get_nested(raw_offer, "lieuTravail.longitude")
     location_commune_code = _get_nested(raw_offer, "lieuTravail.commune")
+    location_postal_code = _get_nested(raw_offer, "lieuTravail.codePostal")
+    location_department, location_region = lookup_location(
+        commune_code=location_commune_code,
+        postal_code=location_postal_code,
+        label=location_city,
+    )
     
     # === Contrat ===
     contract_type = raw_offer.get("typeContratLibelle") or raw_offer.get("typeContrat")
@@ -248,7 +307,7 @@ def map_france_travail(raw_offer: Dict[str, Any], include_raw: bool = False) ->
     
     experience_required = raw_offer.get("experienceLibelle")
     experience_code = raw_offer.get("experienceExige")
-    # TODO: classifier experience_level (junior/confirmé/senior) via reference_data
+    experience_level = classify_experience_level(experience_required) if experience_required else None
     
     # === Entreprise ===
     company_size = raw_offer.get("trancheEffectifEtab")
@@ -289,9 +348,11 @@ def map_france_travail(raw_offer: Dict[str, Any], include_raw: bool = False) ->
         # Localisation
         location_city=location_city,
         location_department=location_department,
+        location_region=location_region,
         location_latitude=location_latitude,
         location_longitude=location_longitude,
         location_commune_code=location_commune_code,
+        location_postal_code=location_postal_code,
         
         # Contrat
         contract_type=contract_type,
@@ -318,6 +379,7 @@ def map_france_travail(raw_offer: Dict[str, Any], include_raw: bool = False) ->
         education_level=education_level,
         education_required=education_required,
         experience_required=experience_required,
+        experience_level=experience_level,
         experience_code=experience_code,
         
         # Entreprise
@@ -5,6 +5,8 @@ Ce fichier centralise la classification des emplois liés à la data
 pour faciliter le filtrage des offres France Travail.
 """
 
+from pipelines.ingest.memo import memoized
+
 # Codes ROME prioritaires pour les métiers data
 # ⚠️  CODES VALIDÉS depuis l'API France Travail (février 2026)
 ROME_CODES_DATA = {
@@ -232,6 +234,7 @@ def extract_technical_skills(skills_list: list) -> dict:
     return {k: list(set(v)) for k, v in found_skills.items() if v}
 
 
+@memoized(name="experience_level")
 def classify_experience_level(experience_str: str) -> str:
     """
     Classifie le niveau d'expérience demandé.
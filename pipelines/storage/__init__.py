@@ -1,8 +1,34 @@
 """
 Module de stockage pour JobMarket V3.
-Gère l'indexation des données dans Elasticsearch.
+Gère l'indexation des données dans Elasticsearch (ou une base SQLite embarquée).
+
+Les clients sont importés au premier accès : le stockage SQLite s'utilise sans
+le package elasticsearch.
 """
 
-from .elasticsearch import ElasticsearchClient
+import importlib
+from typing import Any
+
+# Nom exporté -> module qui le définit
+_EXPORTS = {
+    "AsyncElasticsearchClient": ".async_elasticsearch",
+    "ContentHashStore": ".content_hashes",
+    "DailyRollup": ".rollups",
+    "ElasticsearchClient": ".elasticsearch",
+    "SQLiteClient": ".sqlite",
+    "UnsupportedQuery": ".backends",
+    "create_storage_client": ".backends",
+    "document_hash": ".content_hashes",
+    "storage_backend": ".backends",
+}
+
+__all__ = sorted(_EXPORTS)
+
 
-__all__ = ["ElasticsearchClient"]
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,214 @@
+"""
+Client Elasticsearch asynchrone (asyncio) pour les couches API et dashboards.
+
+Même surface que ElasticsearchClient pour la lecture et l'indexation
+(search, count, bulk_index_offers, get_stats, partitionnement mensuel et
+with_index), sur AsyncElasticsearch : une
+requête en attente ne bloque pas de thread, et search_concurrent() lance
+plusieurs recherches en parallèle sur le pool de connexions (une page de
+dashboard attend la plus lente de ses agrégations, pas leur somme).
+"""
+
+import asyncio
+import os
+from typing import Any, AsyncIterable, Dict, Iterable, List, Optional, Union
+
+try:
+    from elasticsearch import AsyncElasticsearch, helpers
+    from elasticsearch.exceptions import ConnectionError as ESConnectionError
+except ImportError:
+    raise ImportError(
+        "Le package 'elasticsearch' n'est pas installé. "
+        "Installez-le avec: pip install elasticsearch[async]>=8.0.0"
+    )
+
+from .elasticsearch import (
+    BULK_INITIAL_BACKOFF,
+    BULK_MAX_BACKOFF,
+    BULK_MAX_RETRIES,
+    DEFAULT_CHUNK_BYTES,
+    IndexRoutingMixin,
+    _record_bulk_item,
+)
+
+
+class AsyncElasticsearchClient(IndexRoutingMixin):
+    """Client asynchrone pour interroger et alimenter l'index des offres."""
+    
+    def __init__(
+        self,
+        host: str = None,
+        index_name: str = None,
+        connections_per_node: int = 25,
+        partitioning: Optional[str] = None
+    ):
+        """
+        Initialise le client (sans requête réseau : utiliser `connect()` ou `async with`).
+        
+        Args:
+            host: URL du serveur Elasticsearch (défaut: depuis ES_HOST env var)
+            index_name: Nom de l'index ou de l'alias (défaut: depuis ES_INDEX env var)
+            connections_per_node: Taille du pool de connexions HTTP (requêtes simultanées)
+            partitioning: "monthly" pour écrire chaque offre dans l'index de son
+                          mois, comme ElasticsearchClient (défaut: depuis
+                          ES_PARTITIONING env var, sinon index unique)
+        """
+        self.host = host or os.getenv("ES_HOST", "http://localhost:9200")
+        self.index_name = index_name or os.getenv("ES_INDEX", "jobmarket_v3")
+        self.partitioning = partitioning or os.getenv("ES_PARTITIONING") or None
+        if self.partitioning not in (None, "monthly"):
+            raise ValueError(f"Partitionnement inconnu: {self.partitioning} (valeurs possibles: monthly)")
+        self.client = AsyncElasticsearch([self.host], connections_per_node=connections_per_node)
+    
+    async def connect(self) -> "AsyncElasticsearchClient":
+        """Vérifie la connexion au cluster."""
+        if not await self.client.ping():
+            await self.client.close()
+            raise ESConnectionError(
+                f"Impossible de se connecter à Elasticsearch sur {self.host}. "
+                "Assurez-vous que le service est démarré (docker-compose up -d)."
+            )
+        print(f"✓ Connecté à Elasticsearch (async) sur {self.host}")
+        return self
+    
+    async def close(self) -> None:
+        """Ferme le pool de connexions."""
+        await self.client.close()
+    
+    async def __aenter__(self) -> "AsyncElasticsearchClient":
+        return await self.connect()
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+    
+    async def list_partitions(self) -> List[str]:
+        """Index mensuels existants, du plus ancien au plus récent."""
+        indices = await self.client.indices.get_alias(index=f"{self.index_name}-*.*")
+        return sorted(name for name in indices if self._is_partition(name))
+    
+    async def _search_index(self, body: Dict[str, Any]) -> Optional[str]:
+        """Index à interroger (mêmes règles que ElasticsearchClient._search_index)."""
+        bounds = self._search_bounds(body)
+        if bounds is None:
+            return self.index_name
+        partitions = self._partitions_in_range(await self.list_partitions(), *bounds)
+        return ",".join(partitions) if partitions else None
+    
+    async def search(self, query: Dict[str, Any], size: int = 10) -> Dict[str, Any]:
+        """
+        Effectue une recherche dans l'index.
+        
+        En partitionnement mensuel, une requête bornée sur `published_at`
+        n'interroge que les mois concernés (comme ElasticsearchClient).
+        
+        Args:
+            query: Requête Elasticsearch DSL
+            size: Nombre de résultats à retourner
+            
+        Returns:
+            Résultats de la recherche
+        """
+        body = dict(query)
+        body.setdefault("size", size)
+        index = await self._search_index(body)
+        if index is None:
+            return self._empty_response(body)
+        return await self.client.search(index=index, body=body)
+    
+    async def search_concurrent(self, queries: Dict[str, Dict[str, Any]], size: int = 10) -> Dict[str, Any]:
+        """
+        Exécute plusieurs recherches simultanément.
+        
+        Args:
+            queries: Requêtes nommées {nom: requête DSL}
+            size: Nombre de résultats par défaut des requêtes sans "size"
+            
+        Returns:
+            Résultats par nom ; une requête en échec a pour résultat l'exception
+            levée (les autres résultats restent disponibles)
+        """
+        names = list(queries)
+        results = await asyncio.gather(
+            *(self.search(queries[name], size=size) for name in names),
+            return_exceptions=True
+        )
+        return dict(zip(names, results))
+    
+    async def count(self) -> int:
+        """
+        Compte le nombre de documents dans l'index.
+        
+        Returns:
+            Nombre de documents
+        """
+        try:
+            result = await self.client.count(index=self.index_name)
+            return result["count"]
+        except Exception:
+            return 0
+    
+    async def get_stats(self) -> Dict[str, Any]:
+        """
+        Retourne des statistiques sur l'index.
+        
+        Returns:
+            Dictionnaire de statistiques
+        """
+        stats, total = await asyncio.gather(
+            self.client.indices.stats(index=self.index_name),
+            self.count()
+        )
+        return {
+            "total_documents": total,
+            "size_in_bytes": stats["_all"]["total"]["store"]["size_in_bytes"],
+            "index_name": self.index_name
+        }
+    
+    async def _generate_actions(self, offers: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]]):
+        if hasattr(offers, "__aiter__"):
+            async for offer in offers:
+                yield self._action(offer)
+        else:
+            for offer in offers:
+                yield self._action(offer)
+    
+    async def bulk_index_offers(
+        self,
+        offers: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+        batch_size: int = 500,
+        verbose: bool = False,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+        max_retries: int = BULK_MAX_RETRIES
+    ) -> Dict[str, Any]:
+        """
+        Indexe des offres en streaming (itérable synchrone ou asynchrone).
+        
+        Les documents rejetés par saturation du cluster (429) sont renvoyés
+        avec un backoff exponentiel par helpers.async_streaming_bulk.
+        
+        Args:
+            offers: Offres d'emploi (liste, générateur ou générateur asynchrone)
+            batch_size: Nombre maximal de documents par requête bulk
+            verbose: Si True, affiche les détails des erreurs
+            chunk_bytes: Taille maximale d'une requête bulk (octets)
+            max_retries: Nombre maximal de renvois d'un document rejeté (429)
+            
+        Returns:
+            Dictionnaire avec le nombre d'offres indexées, doublons et erreurs
+        """
+        result = {"indexed": 0, "duplicates": 0, "errors": 0, "error_details": {}, "total": 0}
+        async for ok, item in helpers.async_streaming_bulk(
+            self.client,
+            self._generate_actions(offers),
+            chunk_size=batch_size,
+            max_chunk_bytes=chunk_bytes,
+            max_retries=max_retries,
+            initial_backoff=BULK_INITIAL_BACKOFF,
+            max_backoff=BULK_MAX_BACKOFF,
+            raise_on_error=False,
+            raise_on_exception=False,
+            yield_ok=True
+        ):
+            result["total"] += 1
+            _record_bulk_item(result, ok, item, verbose)
+        return result
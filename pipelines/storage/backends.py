@@ -0,0 +1,55 @@
+"""
+Choix du stockage des offres selon la configuration.
+
+STORAGE_BACKEND=elasticsearch (défaut) ou sqlite (base embarquée, SQLITE_PATH).
+"""
+
+import os
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+if TYPE_CHECKING:
+    from .elasticsearch import ElasticsearchClient
+    from .sqlite import SQLiteClient
+
+STORAGE_BACKENDS = ("elasticsearch", "sqlite")
+
+
+class UnsupportedQuery(ValueError):
+    """Requête valide mais hors des capacités du stockage configuré (ex: geotile_grid sous SQLite)."""
+
+
+def storage_backend(backend: Optional[str] = None) -> str:
+    """Nom du stockage configuré (argument, sinon STORAGE_BACKEND env var)."""
+    name = (backend or os.getenv("STORAGE_BACKEND") or "elasticsearch").lower()
+    if name not in STORAGE_BACKENDS:
+        raise ValueError(f"Stockage inconnu: {name} (valeurs possibles: {', '.join(STORAGE_BACKENDS)})")
+    return name
+
+
+def create_storage_client(
+    backend: Optional[str] = None,
+    index_name: Optional[str] = None,
+    **es_options: Any
+) -> Union["ElasticsearchClient", "SQLiteClient"]:
+    """
+    Crée le client du stockage configuré.
+
+    Usage:
+        client = create_storage_client()  # STORAGE_BACKEND
+        client = create_storage_client("sqlite", index_name="jobmarket_test")
+
+    Args:
+        backend: "elasticsearch" ou "sqlite" (défaut: STORAGE_BACKEND env var)
+        index_name: Nom de l'index (ou de la table SQLite)
+        **es_options: Options propres à ElasticsearchClient (connections_per_node,
+                      partitioning...) ; ignorées par le stockage SQLite
+
+    Returns:
+        ElasticsearchClient ou SQLiteClient (même interface de lecture et d'écriture)
+    """
+    # Seul le client choisi est importé (SQLite : pas besoin du package elasticsearch)
+    if storage_backend(backend) == "sqlite":
+        from .sqlite import SQLiteClient
+        return SQLiteClient(index_name=index_name)
+    from .elasticsearch import ElasticsearchClient
+    return ElasticsearchClient(index_name=index_name, **es_options)
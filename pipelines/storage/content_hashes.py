@@ -0,0 +1,100 @@
+"""
+Empreintes de contenu des documents indexés (fichier sidecar local).
+
+Chaque document préparé pour Elasticsearch porte un champ `content_hash`
+(sha1 du document sérialisé). Le même couple {id: content_hash} est conservé
+localement : à la réindexation, une offre dont l'empreinte n'a pas changé
+n'est pas renvoyée, et une offre présente dans plusieurs fichiers n'est
+envoyée qu'une fois.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+# Métadonnées de collecte/normalisation, hors contenu de l'offre : collected_at
+# change à chaque normalisation, raw_hash/mapping_version à chaque collecte ou
+# version du mapping, duplicate_group est recalculé après coup
+_EXCLUDED_FIELDS = frozenset({"content_hash", "collected_at", "raw_hash", "mapping_version", "duplicate_group"})
+
+
+def document_hash(doc: Dict[str, Any]) -> str:
+    """
+    Empreinte stable d'un document préparé (indépendante de l'ordre des clés).
+    
+    Le champ `content_hash` lui-même et les métadonnées de collecte
+    (collected_at, raw_hash, mapping_version, duplicate_group) sont exclus du
+    calcul : une offre recollectée à l'identique garde la même empreinte.
+    """
+    content = {k: v for k, v in doc.items() if k not in _EXCLUDED_FIELDS}
+    payload = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class ContentHashStore:
+    """Table {id document: content_hash} persistée en JSON à côté des données."""
+    
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Args:
+            path: Fichier sidecar (None = table en mémoire uniquement)
+        """
+        self.path = Path(path) if path else None
+        self._hashes: Dict[str, str] = {}
+        self._dirty = False
+        if self.path and self.path.exists():
+            with self.path.open("r", encoding="utf-8") as f:
+                self._hashes = json.load(f)
+    
+    def __len__(self) -> int:
+        return len(self._hashes)
+    
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._hashes
+    
+    def get(self, doc_id: str) -> Optional[str]:
+        return self._hashes.get(doc_id)
+    
+    def set(self, doc_id: str, content_hash: str) -> None:
+        if self._hashes.get(doc_id) != content_hash:
+            self._hashes[doc_id] = content_hash
+            self._dirty = True
+    
+    def update(self, items: Iterable[Tuple[str, str]]) -> None:
+        for doc_id, content_hash in items:
+            self.set(doc_id, content_hash)
+    
+    def discard(self, doc_ids: Iterable[str]) -> int:
+        """
+        Oublie des documents supprimés de l'index.
+        
+        Returns:
+            Nombre d'empreintes retirées
+        """
+        removed = 0
+        for doc_id in doc_ids:
+            if self._hashes.pop(doc_id, None) is not None:
+                removed += 1
+        if removed:
+            self._dirty = True
+        return removed
+    
+    def clear(self) -> None:
+        """Vide la table (index recréé)."""
+        if self._hashes:
+            self._hashes = {}
+            self._dirty = True
+    
+    def save(self) -> None:
+        """Écrit le sidecar (atomiquement) s'il a changé."""
+        if not self.path or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(self._hashes, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        self._dirty = False
@@ -3,8 +3,15 @@ Client Elasticsearch pour l'indexation des offres d'emploi.
 """
 
 import os
+import re
+import copy
 import json
-from typing import List, Dict, Any, Optional
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple, TypeVar
 from datetime import datetime
 
 try:
@@ -16,22 +23,388 @@ except ImportError:
         "Installez-le avec: pip install elasticsearch>=8.0.0"
     )
 
+from .content_hashes import ContentHashStore
+from .offers import SalaryBenchmarkMixin, prepare_document
+from .query_cache import QueryCache
 
-class ElasticsearchClient:
+
+# Taille cible initiale d'une requête bulk et bornes du contrôleur adaptatif
+DEFAULT_CHUNK_BYTES = 5 * 1024 * 1024
+MIN_CHUNK_BYTES = 256 * 1024
+MAX_CHUNK_BYTES = 20 * 1024 * 1024
+
+# Renvoi des documents rejetés (429) : backoff exponentiel borné
+BULK_MAX_RETRIES = 5
+BULK_INITIAL_BACKOFF = 1.0
+BULK_MAX_BACKOFF = 30.0
+
+# Début de date ISO "AAAA-MM" (routage mensuel)
+_MONTH_PREFIX = re.compile(r"^\d{4}-\d{2}")
+
+# Surcoût approximatif de la ligne d'action bulk ({"index": {"_index", "_id"}})
+_ACTION_OVERHEAD_BYTES = 100
+
+# Taille des offres en attente d'acquittement au-delà de laquelle
+# _generate_actions oublie celles déjà acquittées (présentes dans `hashes`)
+_QUEUED_PRUNE_MIN = 10000
+
+
+def _action_size(action: Dict[str, Any]) -> int:
+    """Taille approximative (octets) d'une action une fois sérialisée en NDJSON."""
+    return len(json.dumps(action["_source"], ensure_ascii=False, default=str).encode("utf-8")) + _ACTION_OVERHEAD_BYTES
+
+
+class BulkSizeController:
+    """
+    Ajuste la taille (en octets) des requêtes bulk d'après leur latence mesurée.
+    
+    Stratégie AIMD : tant que les requêtes répondent nettement sous la latence
+    cible, la taille augmente de 25 % ; au-delà de la cible, elle est réduite
+    proportionnellement ; en cas de rejet (429), elle est divisée par deux.
+    Partagé entre threads (parallel_bulk_index_offers), d'où le verrou.
+    """
+    
+    def __init__(
+        self,
+        initial_bytes: int = DEFAULT_CHUNK_BYTES,
+        min_bytes: int = MIN_CHUNK_BYTES,
+        max_bytes: int = MAX_CHUNK_BYTES,
+        target_latency: float = 1.0
+    ):
+        """
+        Args:
+            initial_bytes: Taille de départ des requêtes
+            min_bytes: Taille minimale
+            max_bytes: Taille maximale
+            target_latency: Latence visée par requête bulk (secondes)
+        """
+        self.min_bytes = min_bytes
+        self.max_bytes = max_bytes
+        self.target_latency = target_latency
+        self._target_bytes = max(min_bytes, min(max_bytes, initial_bytes))
+        self._lock = threading.Lock()
+    
+    @property
+    def target_bytes(self) -> int:
+        return self._target_bytes
+    
+    def observe(self, seconds: float, rejected: int = 0) -> int:
+        """
+        Prend en compte la latence d'une requête bulk envoyée.
+        
+        Args:
+            seconds: Durée de la requête (hors attentes de backoff)
+            rejected: Nombre de documents rejetés (429) par la requête
+            
+        Returns:
+            Nouvelle taille cible (octets)
+        """
+        with self._lock:
+            target = self._target_bytes
+            if rejected:
+                target = target // 2
+            elif seconds > self.target_latency:
+                target = int(target * max(0.5, self.target_latency / seconds))
+            elif seconds < self.target_latency / 2:
+                target = int(target * 1.25)
+            self._target_bytes = max(self.min_bytes, min(self.max_bytes, target))
+            return self._target_bytes
+
+
+def _byte_chunks(
+    actions: Iterable[Dict[str, Any]],
+    controller: BulkSizeController,
+    max_docs: Optional[int] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Découpe paresseusement un flux d'actions en chunks d'environ
+    `controller.target_bytes` octets (relu à chaque chunk).
+    
+    Args:
+        actions: Flux d'actions bulk
+        controller: Contrôleur fournissant la taille cible courante
+        max_docs: Nombre maximal de documents par chunk (optionnel)
+    """
+    chunk: List[Dict[str, Any]] = []
+    chunk_bytes = 0
+    for action in actions:
+        size = _action_size(action)
+        if chunk and (chunk_bytes + size > controller.target_bytes or (max_docs and len(chunk) >= max_docs)):
+            yield chunk
+            chunk, chunk_bytes = [], 0
+        chunk.append(action)
+        chunk_bytes += size
+    if chunk:
+        yield chunk
+
+
+def _merge_bulk_result(total: Dict[str, Any], partial: Dict[str, Any]) -> None:
+    """Ajoute les statistiques d'un chunk aux statistiques globales."""
+    for key in ("indexed", "duplicates", "errors", "unchanged", "total", "rejected", "retries"):
+        total[key] = total.get(key, 0) + partial.get(key, 0)
+    for error_type, count in partial["error_details"].items():
+        total["error_details"][error_type] = total["error_details"].get(error_type, 0) + count
+
+
+def _record_bulk_item(result: Dict[str, Any], ok: bool, item: Dict[str, Any], verbose: bool = False) -> None:
+    """
+    Agrège le résultat d'une action bulk dans les statistiques d'indexation.
+    
+    Les conflits de version sont comptés comme doublons, les autres échecs
+    comme erreurs (détaillées par type).
+    """
+    if ok:
+        result["indexed"] += 1
+        return
+    
+    op_result = next(iter(item.values()), {}) if item else {}
+    error_info = op_result.get('error', {})
+    if not isinstance(error_info, dict):
+        # Erreur de transport sur tout un chunk (raise_on_exception=False)
+        exception = op_result.get('exception')
+        error_type = type(exception).__name__ if exception is not None else "transport_error"
+        error_info = {"type": error_type, "reason": str(error_info)}
+    error_type = error_info.get('type', '')
+    
+    if error_type == 'version_conflict_engine_exception':
+        result["duplicates"] += 1
+        return
+    
+    result["errors"] += 1
+    # Compter les types d'erreurs
+    result["error_details"][error_type] = result["error_details"].get(error_type, 0) + 1
+    
+    # Afficher le détail en mode verbose
+    if verbose:
+        doc_id = op_result.get('_id', 'unknown')
+        reason = error_info.get('reason', 'No reason provided')
+        print(f"      ⚠ {doc_id}: {error_type} - {reason[:100]}")
+
+
+_Client = TypeVar("_Client", bound="IndexRoutingMixin")
+
+
+# Résultat d'une agrégation métrique sur zéro document
+_EMPTY_METRICS: Dict[str, Dict[str, Any]] = {
+    "stats": {"count": 0, "min": None, "max": None, "avg": None, "sum": 0.0},
+    "value_count": {"value": 0},
+    "cardinality": {"value": 0},
+    "sum": {"value": 0.0},
+    "avg": {"value": None},
+    "min": {"value": None},
+    "max": {"value": None},
+    "geo_centroid": {"count": 0},
+}
+
+# Agrégations à un seul bucket (doc_count + sous-agrégations)
+_SINGLE_BUCKET_AGGS = {"filter", "nested", "reverse_nested", "global", "missing"}
+
+
+def _empty_aggregations(aggs: Dict[str, Any]) -> Dict[str, Any]:
+    """Résultats vides des agrégations `aggs` (sous-agrégations comprises)."""
+    result: Dict[str, Any] = {}
+    for name, agg in aggs.items():
+        kind = next((key for key in agg if key not in ("aggs", "aggregations", "meta")), None)
+        params = agg.get(kind) or {}
+        if kind == "percentiles":
+            result[name] = {"values": {str(float(p)): None for p in params.get("percents", [])}}
+        elif kind == "percentile_ranks":
+            result[name] = {"values": {str(float(v)): None for v in params.get("values", [])}}
+        elif kind in _EMPTY_METRICS:
+            result[name] = dict(_EMPTY_METRICS[kind])
+        elif kind in _SINGLE_BUCKET_AGGS:
+            sub = agg.get("aggs") or agg.get("aggregations") or {}
+            result[name] = {"doc_count": 0, **_empty_aggregations(sub)}
+        else:
+            # terms, composite, histogrammes, geotile_grid... : aucun bucket
+            result[name] = {"buckets": []}
+    return result
+
+
+class IndexRoutingMixin:
+    """
+    Routage des écritures vers l'index ou l'index mensuel d'une offre, et
+    choix des index mensuels interrogés par une recherche datée.
+    
+    Partagé par les clients synchrone et asynchrone, qui définissent
+    `index_name`, `partitioning` et `list_partitions()` (lui-même synchrone
+    ou asynchrone).
+    """
+    
+    index_name: str
+    partitioning: Optional[str]
+    
+    # Préparation commune à tous les stockages (pipelines.storage.offers)
+    _prepare_document = staticmethod(prepare_document)
+    
+    def partition_name(self, month: str) -> str:
+        """Index physique d'un mois "AAAA-MM" (ex: jobmarket_v3-2026.01)."""
+        return f"{self.index_name}-{month[:4]}.{month[5:7]}"
+    
+    def target_index(self, doc: Dict[str, Any]) -> str:
+        """
+        Index d'écriture d'un document préparé.
+        
+        En partitionnement mensuel, le mois de `published_at` (à défaut
+        `collected_at`, sinon le mois courant) ; sinon `index_name`.
+        """
+        if self.partitioning != "monthly":
+            return self.index_name
+        for field in ("published_at", "collected_at"):
+            value = doc.get(field)
+            if isinstance(value, str) and _MONTH_PREFIX.match(value):
+                return self.partition_name(value)
+        return self.partition_name(datetime.now().strftime("%Y-%m"))
+    
+    def _action(self, offer: Dict[str, Any], doc: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Action bulk d'une offre.
+        
+        Args:
+            offer: Offre d'emploi
+            doc: Document déjà préparé (défaut: préparé ici)
+        """
+        if doc is None:
+            doc = self._prepare_document(offer)
+        return {
+            "_index": self.target_index(doc),
+            "_id": offer["id"],
+            "_source": doc
+        }
+    
+    def with_index(self: _Client, index_name: str) -> _Client:
+        """
+        Copie du client ciblant un autre index (même connexion, sans nouveau ping).
+        
+        La copie écrit directement dans cet index (pas de partitionnement mensuel).
+        
+        Args:
+            index_name: Nom de l'index (ou alias) ciblé par la copie
+        """
+        clone = copy.copy(self)
+        clone.index_name = index_name
+        clone.partitioning = None
+        return clone
+    
+    # ------------------------------------------------------------------
+    # Choix des index interrogés (partitionnement mensuel)
+    # ------------------------------------------------------------------
+    
+    def _is_partition(self, index: str) -> bool:
+        """Vrai pour un index mensuel `<index_name>-AAAA.MM`."""
+        return re.fullmatch(rf"{re.escape(self.index_name)}-\d{{4}}\.\d{{2}}", index) is not None
+    
+    def _partition_month(self, index: str) -> int:
+        """Numéro de mois (année * 12 + mois - 1) d'un index mensuel."""
+        year, month = index.rsplit("-", 1)[1].split(".")
+        return int(year) * 12 + int(month) - 1
+    
+    def _partitions_in_range(self, partitions: Iterable[str], start: Optional[str], end: Optional[str]) -> List[str]:
+        """Index mensuels de `partitions` qui chevauchent l'intervalle [start, end]."""
+        def month_number(value: Optional[str]) -> Optional[int]:
+            # Expressions relatives ("now-30d") : pas de restriction sur les index
+            if not value or not _MONTH_PREFIX.match(value):
+                return None
+            return int(value[:4]) * 12 + int(value[5:7]) - 1
+        
+        low, high = month_number(start), month_number(end)
+        return [
+            name for name in partitions
+            if (low is None or self._partition_month(name) >= low)
+            and (high is None or self._partition_month(name) <= high)
+        ]
+    
+    @staticmethod
+    def _published_range(query: Optional[Dict[str, Any]]) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Bornes de `published_at` imposées par une requête (None = sans borne).
+        
+        Seules les clauses obligatoires comptent (range à la racine ou dans
+        les `must`/`filter` d'un bool, récursivement) ; les bornes strictes
+        (gt/lt) sont traitées comme larges, ce qui ne fait qu'élargir le choix
+        d'index.
+        """
+        start: Optional[str] = None
+        end: Optional[str] = None
+        pending = [query] if query else []
+        while pending:
+            clause = pending.pop()
+            if not isinstance(clause, dict):
+                continue
+            bounds = clause.get("range", {}).get("published_at")
+            if isinstance(bounds, dict):
+                low = bounds.get("gte") or bounds.get("gt")
+                high = bounds.get("lte") or bounds.get("lt")
+                # Plusieurs ranges : l'intersection (comparaison ISO lexicographique)
+                if isinstance(low, str) and (start is None or low > start):
+                    start = low
+                if isinstance(high, str) and (end is None or high < end):
+                    end = high
+            for occur in ("must", "filter"):
+                children = clause.get("bool", {}).get(occur, [])
+                pending.extend(children if isinstance(children, list) else [children])
+        return start, end
+    
+    def _search_bounds(self, body: Dict[str, Any]) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        """
+        Bornes de `published_at` qui restreignent une recherche aux index mensuels.
+        
+        Returns:
+            (début, fin), None si la requête interroge l'alias (pas de
+            partitionnement mensuel, ou requête non bornée)
+        """
+        if self.partitioning != "monthly":
+            return None
+        start, end = self._published_range(body.get("query"))
+        if start is None and end is None:
+            return None
+        return start, end
+    
+    @staticmethod
+    def _empty_response(body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Réponse d'une recherche sans index à interroger.
+        
+        Chaque agrégation demandée y figure, vide (buckets [], métriques
+        nulles), comme Elasticsearch la renverrait sur zéro document.
+        """
+        aggregations = _empty_aggregations(body.get("aggs") or body.get("aggregations") or {})
+        return {"hits": {"total": {"value": 0, "relation": "eq"}, "hits": []}, "aggregations": aggregations}
+
+
+class ElasticsearchClient(IndexRoutingMixin, SalaryBenchmarkMixin):
     """Client pour gérer l'indexation des offres dans Elasticsearch."""
     
-    def __init__(self, host: str = None, index_name: str = None):
+    def __init__(
+        self,
+        host: str = None,
+        index_name: str = None,
+        connections_per_node: int = 10,
+        partitioning: Optional[str] = None,
+        cache_entries: int = 256,
+        cache_ttl: float = 60.0
+    ):
         """
         Initialise le client Elasticsearch.
         
         Args:
             host: URL du serveur Elasticsearch (défaut: depuis ES_HOST env var)
             index_name: Nom de l'index (défaut: depuis ES_INDEX env var)
+            connections_per_node: Taille du pool de connexions HTTP (requêtes simultanées)
+            partitioning: "monthly" pour un index par mois de publication
+                          (défaut: depuis ES_PARTITIONING env var, sinon index unique)
+            cache_entries: Taille du cache local des résultats de recherche (0 = désactivé)
+            cache_ttl: Durée de vie d'un résultat en cache (secondes)
         """
         self.host = host or os.getenv("ES_HOST", "http://localhost:9200")
         self.index_name = index_name or os.getenv("ES_INDEX", "jobmarket_v3")
+        self.partitioning = partitioning or os.getenv("ES_PARTITIONING") or None
+        if self.partitioning not in (None, "monthly"):
+            raise ValueError(f"Partitionnement inconnu: {self.partitioning} (valeurs possibles: monthly)")
         
-        self.client = Elasticsearch([self.host])
+        self.client = Elasticsearch([self.host], connections_per_node=connections_per_node)
+        # Partagé avec les copies with_index() : leurs écritures invalident aussi l'alias
+        self.query_cache = QueryCache(max_entries=cache_entries, ttl=cache_ttl)
         
         # Vérifier la connexion
         if not self.client.ping():
@@ -42,29 +415,35 @@ class ElasticsearchClient:
         
         print(f"✓ Connecté à Elasticsearch sur {self.host}")
     
-    def create_index(self, force: bool = False) -> bool:
+    def index_definition(self) -> Dict[str, Any]:
         """
-        Crée l'index avec le mapping optimisé pour les offres d'emploi.
+        Réglages et mapping optimisés pour les offres d'emploi.
         
-        Args:
-            force: Si True, supprime l'index existant avant de le recréer
-            
-        Returns:
-            True si l'index a été créé, False s'il existait déjà
-        """
-        if self.client.indices.exists(index=self.index_name):
-            if force:
-                print(f"⚠ Suppression de l'index existant '{self.index_name}'...")
-                self.client.indices.delete(index=self.index_name)
-            else:
-                print(f"✓ L'index '{self.index_name}' existe déjà")
-                return False
+        Partagés par l'index simple (create_index) et les index versionnés
+        (create_versioned_index).
         
-        # Mapping optimisé pour les offres d'emploi
-        mapping = {
+        Les libellés courts (secteur, qualification, commentaire de salaire,
+        domaine de formation) n'ont pas de norms : ils servent au filtrage,
+        la normalisation par longueur n'apporte rien au score.
+        """
+        # Compétences détaillées (skills_required / skills_desired)
+        skill_properties = {
+            "code": {"type": "keyword"},
+            "label": {
+                "type": "text",
+                "analyzer": "french_analyzer",
+                "norms": False,
+                "fields": {"keyword": {"type": "keyword"}}
+            },
+            "level": {"type": "keyword"}
+        }
+        return {
             "settings": {
                 "number_of_shards": 1,
                 "number_of_replicas": 0,
+                # Pas de tri d'index (index.sort.*) : Elasticsearch le refuse sur un
+                # mapping avec des champs nested (skills_required, languages...).
+                # Le tri par date reste fait à la requête.
                 "analysis": {
                     "analyzer": {
                         "french_analyzer": {
@@ -113,19 +492,22 @@ class ElasticsearchClient:
                     },
                     
                     # Classification métier
-                    "rome_code": {"type": "keyword"},
+                    # eager_global_ordinals : ordinaux construits au refresh plutôt qu'à
+                    # la première agrégation terms (champs agrégés par les dashboards)
+                    "rome_code": {"type": "keyword", "eager_global_ordinals": True},
                     "rome_label": {"type": "text", "analyzer": "french_analyzer"},
                     "job_category": {"type": "keyword"},
                     "naf_code": {"type": "keyword"},
                     "sector": {"type": "keyword"},
-                    "sector_label": {"type": "text", "analyzer": "french_analyzer"},
+                    "sector_label": {"type": "text", "analyzer": "french_analyzer", "norms": False},
                     
                     # Localisation
-                    "location_city": {"type": "keyword"},
+                    "location_city": {"type": "keyword", "eager_global_ordinals": True},
                     "location_department": {"type": "keyword"},
                     "location_region": {"type": "keyword"},
                     "location_coordinates": {"type": "geo_point"},
                     "location_commune_code": {"type": "keyword"},
+                    "location_postal_code": {"type": "keyword"},
                     
                     # Contrat
                     "contract_type": {"type": "keyword"},
@@ -138,20 +520,43 @@ class ElasticsearchClient:
                     # Rémunération
                     "salary_min": {"type": "float"},
                     "salary_max": {"type": "float"},
+                    # Salaire annuel brut en EUR (toutes unités ramenées à l'année) :
+                    # champ des statistiques et percentiles salariaux
+                    "salary_annual_min": {"type": "scaled_float", "scaling_factor": 100},
+                    "salary_annual_max": {"type": "scaled_float", "scaling_factor": 100},
                     "salary_unit": {"type": "keyword"},
-                    "salary_comment": {"type": "text", "analyzer": "french_analyzer"},
+                    "salary_comment": {"type": "text", "analyzer": "french_analyzer", "norms": False},
                     "salary_benefits": {"type": "keyword"},
                     
                     # Compétences
-                    "skills": {"type": "keyword"},
-                    "skills_required": {"type": "nested"},
-                    "skills_desired": {"type": "nested"},
+                    "skills": {"type": "keyword", "eager_global_ordinals": True},
+                    "skills_required": {"type": "nested", "properties": skill_properties},
+                    "skills_desired": {"type": "nested", "properties": skill_properties},
                     "soft_skills": {"type": "keyword"},
-                    "languages": {"type": "nested"},
+                    "languages": {
+                        "type": "nested",
+                        "properties": {
+                            "language": {"type": "keyword"},
+                            "level": {"type": "keyword"}
+                        }
+                    },
                     
                     # Formation & Expérience
                     "education_level": {"type": "keyword"},
-                    "education_required": {"type": "nested"},
+                    "education_required": {
+                        "type": "nested",
+                        "properties": {
+                            "code": {"type": "keyword"},
+                            "domain": {
+                                "type": "text",
+                                "analyzer": "french_analyzer",
+                                "norms": False,
+                                "fields": {"keyword": {"type": "keyword"}}
+                            },
+                            "level": {"type": "keyword"},
+                            "required": {"type": "keyword"}
+                        }
+                    },
                     "experience_required": {"type": "keyword"},
                     "experience_level": {"type": "keyword"},
                     "experience_code": {"type": "keyword"},
@@ -172,12 +577,38 @@ class ElasticsearchClient:
                     "collected_at": {"type": "date"},
                     "positions_count": {"type": "integer"},
                     "qualification_code": {"type": "keyword"},
-                    "qualification_label": {"type": "text", "analyzer": "french_analyzer"},
-                    "url": {"type": "keyword"},
+                    "qualification_label": {"type": "text", "analyzer": "french_analyzer", "norms": False},
+                    # Jamais agrégés ni triés : pas de doc_values
+                    "url": {"type": "keyword", "doc_values": False},
+                    "mapping_version": {"type": "keyword"},
+                    "raw_hash": {"type": "keyword", "doc_values": False},
+                    "duplicate_group": {"type": "keyword"},
+                    "content_hash": {"type": "keyword", "index": False, "doc_values": False},
                     "raw": {"type": "object", "enabled": False}
                 }
             }
         }
+    
+    def create_index(self, force: bool = False) -> bool:
+        """
+        Crée l'index avec le mapping optimisé pour les offres d'emploi.
+        
+        Args:
+            force: Si True, supprime l'index existant avant de le recréer
+            
+        Returns:
+            True si l'index a été créé, False s'il existait déjà
+        """
+        if self.client.indices.exists(index=self.index_name):
+            if force:
+                print(f"⚠ Suppression de l'index existant '{self.index_name}'...")
+                self.client.indices.delete(index=self.alias_targets() or self.index_name)
+                self.query_cache.invalidate(self.index_name)
+            else:
+                print(f"✓ L'index '{self.index_name}' existe déjà")
+                return False
+        
+        mapping = self.index_definition()
         
         try:
             self.client.indices.create(index=self.index_name, body=mapping)
@@ -199,124 +630,577 @@ class ElasticsearchClient:
         """
         # Préparer le document pour l'indexation
         doc = self._prepare_document(offer)
+        index = self.target_index(doc)
         
         try:
             self.client.index(
-                index=self.index_name,
+                index=index,
                 id=offer["id"],
                 document=doc
             )
+            self.query_cache.invalidate(index)
             return True
         except Exception as e:
             print(f"❌ Erreur lors de l'indexation de l'offre {offer.get('id')}: {e}")
             return False
     
-    def bulk_index_offers(self, offers: List[Dict[str, Any]], batch_size: int = 500, verbose: bool = False) -> Dict[str, int]:
+    def _generate_actions(
+        self,
+        offers: Iterable[Dict[str, Any]],
+        hashes: Optional[ContentHashStore] = None,
+        result: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Génère paresseusement les actions bulk (un document préparé à la fois).
+        
+        Avec `hashes`, les offres dont l'empreinte de contenu est déjà connue
+        (indexée lors d'un passage précédent, ou déjà envoyée pendant ce
+        passage depuis un autre fichier) sont ignorées.
+        
+        Args:
+            offers: Itérable d'offres (liste, générateur de lecture de fichier...)
+            hashes: Empreintes des documents déjà indexés (optionnel)
+            result: Statistiques où compter les offres inchangées ("unchanged")
+            
+        Yields:
+            Actions bulk prêtes pour helpers.streaming_bulk
+        """
+        # Offres envoyées mais pas encore acquittées (les acquittées sont dans `hashes`)
+        queued: Dict[str, str] = {}
+        prune_at = _QUEUED_PRUNE_MIN
+        for offer in offers:
+            doc = self._prepare_document(offer)
+            if hashes is not None:
+                doc_id, content_hash = offer["id"], doc["content_hash"]
+                if hashes.get(doc_id) == content_hash or queued.get(doc_id) == content_hash:
+                    if result is not None:
+                        result["unchanged"] += 1
+                        result["total"] += 1
+                    continue
+                if len(queued) >= prune_at:
+                    # Chunks acquittés entre-temps : mémoire bornée par les envois en cours
+                    queued = {k: v for k, v in queued.items() if hashes.get(k) != v}
+                    prune_at = max(_QUEUED_PRUNE_MIN, 2 * len(queued))
+                queued[doc_id] = content_hash
+            yield self._action(offer, doc)
+    
+    def bulk_index_offers(
+        self,
+        offers: Iterable[Dict[str, Any]],
+        batch_size: Optional[int] = None,
+        verbose: bool = False,
+        chunk_bytes: Optional[int] = None,
+        target_latency: float = 1.0,
+        max_retries: int = BULK_MAX_RETRIES,
+        hashes: Optional[ContentHashStore] = None
+    ) -> Dict[str, int]:
         """
         Indexe plusieurs offres en batch pour de meilleures performances.
         
+        L'indexation est en streaming : les offres sont consommées au fil de
+        l'envoi des chunks et les résultats agrégés à la volée, la mémoire reste
+        constante quelle que soit la taille de l'entrée.
+        
+        Les chunks sont dimensionnés en octets (et non en nombre de documents,
+        la taille des descriptions variant fortement) ; la taille est ajustée
+        d'après la latence mesurée (BulkSizeController). Les documents rejetés
+        par saturation du cluster (429) sont renvoyés avec un backoff exponentiel.
+        
+        Avec `hashes`, seules les offres nouvelles ou modifiées sont envoyées ;
+        la table est mise à jour au fil des acquittements (à sauvegarder par
+        l'appelant).
+        
         Args:
-            offers: Liste d'offres d'emploi
-            batch_size: Taille des batches pour l'indexation
+            offers: Itérable d'offres d'emploi (liste ou générateur)
+            batch_size: Nombre maximal de documents par requête (optionnel)
             verbose: Si True, affiche les détails des erreurs
+            chunk_bytes: Taille initiale des requêtes bulk (octets, défaut: DEFAULT_CHUNK_BYTES)
+            target_latency: Latence visée par requête bulk (secondes)
+            max_retries: Nombre maximal de renvois d'un document rejeté (429)
+            hashes: Empreintes des documents déjà indexés (optionnel)
             
         Returns:
-            Dictionnaire avec le nombre d'offres indexées, doublons et erreurs
+            Dictionnaire avec le nombre d'offres indexées, doublons, erreurs,
+            inchangées ("unchanged"), documents rejetés puis renvoyés
+            ("rejected") et taille finale des requêtes ("chunk_bytes")
         """
-        actions = []
-        for offer in offers:
-            doc = self._prepare_document(offer)
-            actions.append({
-                "_index": self.index_name,
-                "_id": offer["id"],
-                "_source": doc
-            })
+        result = {"indexed": 0, "duplicates": 0, "errors": 0, "unchanged": 0, "error_details": {}, "total": 0, "rejected": 0, "retries": 0}
+        controller = BulkSizeController(initial_bytes=chunk_bytes or DEFAULT_CHUNK_BYTES, target_latency=target_latency)
+        consumed = 0
+        
+        def counted(source: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+            nonlocal consumed
+            for offer in source:
+                consumed += 1
+                yield offer
         
         try:
-            success, errors = helpers.bulk(
+            actions = self._generate_actions(counted(offers), hashes, result)
+            for chunk in _byte_chunks(actions, controller, batch_size):
+                _merge_bulk_result(result, self._index_chunk(chunk, verbose, controller, max_retries, hashes))
+        except Exception as e:
+            print(f"❌ Erreur lors de l'indexation en batch: {e}")
+            # Les offres consommées mais non acquittées sont comptées en erreur
+            result["total"] = consumed
+            result["errors"] = consumed - result["indexed"] - result["duplicates"] - result["unchanged"]
+        
+        result["chunk_bytes"] = controller.target_bytes
+        return result
+    
+    def _index_chunk(
+        self,
+        chunk: List[Dict[str, Any]],
+        verbose: bool = False,
+        controller: Optional[BulkSizeController] = None,
+        max_retries: int = BULK_MAX_RETRIES,
+        hashes: Optional[ContentHashStore] = None
+    ) -> Dict[str, Any]:
+        """
+        Envoie un chunk d'actions en une requête bulk (éventuellement depuis un thread worker).
+        
+        Les documents rejetés avec un statut 429 (es_rejected_execution_exception,
+        file d'attente d'écriture pleine) sont renvoyés après un backoff
+        exponentiel, jusqu'à `max_retries` fois ; ils ne sont comptés en erreur
+        qu'après épuisement des tentatives. Les empreintes des documents
+        acquittés sont enregistrées dans `hashes`, et le cache de recherche
+        de l'index est invalidé.
+        
+        Returns:
+            Statistiques du chunk, avec le nom du worker et la latence cumulée
+            des requêtes (hors attentes de backoff)
+        """
+        result = {"indexed": 0, "duplicates": 0, "errors": 0, "unchanged": 0, "error_details": {}, "total": len(chunk), "rejected": 0, "retries": 0}
+        seconds = 0.0
+        pending = chunk
+        attempt = 0
+        while pending:
+            rejected = []
+            started = time.perf_counter()
+            # streaming_bulk renvoie un résultat par action, dans l'ordre d'envoi
+            for action, (ok, item) in zip(pending, helpers.streaming_bulk(
                 self.client,
-                actions,
-                chunk_size=batch_size,
+                pending,
+                chunk_size=len(pending),
+                max_chunk_bytes=MAX_CHUNK_BYTES * 2,
                 raise_on_error=False,
-                stats_only=False
-            )
+                raise_on_exception=False,
+                yield_ok=True
+            )):
+                op_result = next(iter(item.values()), {}) if item else {}
+                if not ok and op_result.get("status") == 429 and attempt < max_retries:
+                    rejected.append(action)
+                    continue
+                _record_bulk_item(result, ok, item, verbose)
+                if ok and hashes is not None:
+                    hashes.set(action["_id"], action["_source"]["content_hash"])
+            elapsed = time.perf_counter() - started
+            seconds += elapsed
+            if controller is not None:
+                controller.observe(elapsed, rejected=len(rejected))
             
-            # Analyser les types d'erreurs
-            duplicates = 0
-            real_errors = 0
-            error_details = {}
+            if rejected:
+                result["rejected"] += len(rejected)
+                result["retries"] += 1
+                delay = min(BULK_MAX_BACKOFF, BULK_INITIAL_BACKOFF * 2 ** attempt)
+                if verbose:
+                    print(f"      ⏳ {len(rejected)} documents rejetés (429), nouvel essai dans {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+            pending = rejected
+        
+        # Les recherches en cache sur cet index (ou son alias) sont périmées
+        self.query_cache.invalidate(self.index_name)
+        result["seconds"] = seconds
+        result["worker"] = threading.current_thread().name
+        return result
+    
+    def parallel_bulk_index_offers(
+        self,
+        offers: Iterable[Dict[str, Any]],
+        workers: int = 4,
+        batch_size: Optional[int] = None,
+        verbose: bool = False,
+        chunk_bytes: Optional[int] = None,
+        target_latency: float = 1.0,
+        max_retries: int = BULK_MAX_RETRIES,
+        hashes: Optional[ContentHashStore] = None
+    ) -> Dict[str, Any]:
+        """
+        Indexe des offres avec plusieurs requêtes bulk en vol (pool de threads).
+        
+        Les offres sont découpées en chunks (en octets, taille adaptative
+        partagée entre les workers) au fil de la lecture ; au plus 2 x `workers`
+        chunks sont en attente, la mémoire reste bornée.
+        
+        Args:
+            offers: Itérable d'offres (peut enchaîner plusieurs fichiers)
+            workers: Nombre de threads d'envoi
+            batch_size: Nombre maximal de documents par requête bulk (optionnel)
+            verbose: Si True, affiche les détails des erreurs
+            chunk_bytes: Taille initiale des requêtes bulk (octets, défaut: DEFAULT_CHUNK_BYTES)
+            target_latency: Latence visée par requête bulk (secondes)
+            max_retries: Nombre maximal de renvois d'un document rejeté (429)
+            hashes: Empreintes des documents déjà indexés (optionnel)
             
-            if errors:
-                for error in errors:
-                    error_info = error.get('index', {}).get('error', {})
-                    error_type = error_info.get('type', '')
-                    
-                    if error_type == 'version_conflict_engine_exception':
-                        duplicates += 1
-                    else:
-                        real_errors += 1
-                        # Compter les types d'erreurs
-                        error_details[error_type] = error_details.get(error_type, 0) + 1
-                        
-                        # Afficher le détail en mode verbose
-                        if verbose:
-                            doc_id = error.get('index', {}).get('_id', 'unknown')
-                            reason = error_info.get('reason', 'No reason provided')
-                            print(f"      ⚠ {doc_id}: {error_type} - {reason[:100]}")
+        Returns:
+            Statistiques globales (comme bulk_index_offers) + "workers" :
+            par thread, chunks, documents, docs/s et latence moyenne (ms)
+        """
+        result = {"indexed": 0, "duplicates": 0, "errors": 0, "unchanged": 0, "error_details": {}, "total": 0, "rejected": 0, "retries": 0}
+        controller = BulkSizeController(initial_bytes=chunk_bytes or DEFAULT_CHUNK_BYTES, target_latency=target_latency)
+        per_worker: Dict[str, Dict[str, float]] = {}
+        
+        def collect(future: Future) -> None:
+            chunk_result = future.result()
+            _merge_bulk_result(result, chunk_result)
+            stats = per_worker.setdefault(chunk_result["worker"], {"chunks": 0, "docs": 0, "seconds": 0.0})
+            stats["chunks"] += 1
+            stats["docs"] += chunk_result["total"]
+            stats["seconds"] += chunk_result["seconds"]
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="es-bulk") as executor:
+            pending = set()
+            actions = self._generate_actions(offers, hashes, result)
+            for chunk in _byte_chunks(actions, controller, batch_size):
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future)
+                pending.add(executor.submit(self._index_chunk, chunk, verbose, controller, max_retries, hashes))
+            for future in as_completed(pending):
+                collect(future)
+        
+        result["chunk_bytes"] = controller.target_bytes
+        result["workers"] = {
+            name: {
+                "chunks": stats["chunks"],
+                "docs": stats["docs"],
+                "docs_per_s": stats["docs"] / stats["seconds"] if stats["seconds"] else 0.0,
+                "avg_latency_ms": stats["seconds"] / stats["chunks"] * 1000,
+            }
+            for name, stats in sorted(per_worker.items())
+        }
+        return result
+    
+    @contextmanager
+    def bulk_load(self, forcemerge_segments: Optional[int] = None) -> Iterator[Dict[str, float]]:
+        """
+        Contexte de chargement massif : réglages d'index optimisés pour l'écriture.
+        
+        Pendant le chargement, le refresh périodique est désactivé
+        (refresh_interval: -1) et les réplicas mis à 0 ; à la sortie, l'index
+        est rafraîchi une seule fois, éventuellement force-mergé, puis les
+        réglages d'origine sont restaurés (même en cas d'erreur).
+        
+        En partitionnement mensuel, le template porte aussi ces réglages
+        pendant le chargement : les index mensuels créés par les écritures
+        (premier chargement, nouveau mois) sont réglés de même, puis reçoivent
+        à la sortie les réglages normaux du template.
+        
+        Usage:
+            with es_client.bulk_load(forcemerge_segments=1) as phases:
+                es_client.bulk_index_offers(offers)
+            print(phases)
+        
+        Args:
+            forcemerge_segments: Si renseigné, nombre maximal de segments après
+                                 force-merge (1 = index figé, optimal en lecture)
             
-            result = {
-                "indexed": success,
-                "duplicates": duplicates,
-                "errors": real_errors,
-                "error_details": error_details,
-                "total": len(offers)
+        Yields:
+            Durée de chaque phase en secondes (rempli à la sortie du contexte) :
+            settings, load, refresh, forcemerge, restore
+        """
+        phases: Dict[str, float] = {}
+        bulk_settings = {"index.refresh_interval": "-1", "index.number_of_replicas": 0}
+        partitioned = self.partitioning == "monthly"
+        
+        started = time.perf_counter()
+        existing = set(self.list_partitions()) if partitioned else set()
+        # Derrière un alias (versions, index mensuels), réglages propres à
+        # chaque index physique : chacun retrouve les siens à la sortie
+        current = self.client.indices.get_settings(
+            index=self.index_name, flat_settings=True, ignore_unavailable=True, allow_no_indices=True
+        )
+        # None = réglage absent (valeur par défaut), restauré tel quel
+        originals = {
+            name: {
+                "index.refresh_interval": entry.get("settings", {}).get("index.refresh_interval"),
+                "index.number_of_replicas": entry.get("settings", {}).get("index.number_of_replicas"),
             }
+            for name, entry in current.items()
+        }
+        if originals:
+            self.client.indices.put_settings(index=",".join(originals), settings=bulk_settings)
+        if partitioned:
+            # Index mensuels créés pendant le chargement
+            self._put_partition_template(settings={"refresh_interval": "-1", "number_of_replicas": 0})
+        phases["settings"] = time.perf_counter() - started
+        scope = " et index mensuels créés pendant le chargement" if partitioned else ""
+        print(f"⚙️  Mode chargement massif sur '{self.index_name}'{scope} (refresh désactivé, 0 réplica)")
+        
+        started = time.perf_counter()
+        try:
+            yield phases
+        finally:
+            phases["load"] = time.perf_counter() - started
             
-            return result
-        except Exception as e:
-            print(f"❌ Erreur lors de l'indexation en batch: {e}")
-            return {"indexed": 0, "duplicates": 0, "errors": len(offers), "error_details": {}, "total": len(offers)}
+            started = time.perf_counter()
+            # Aucun index si rien n'a été écrit (premier chargement partitionné vide)
+            self.client.indices.refresh(index=self.index_name, ignore_unavailable=True, allow_no_indices=True)
+            self.query_cache.invalidate(self.index_name)
+            phases["refresh"] = time.perf_counter() - started
+            
+            if forcemerge_segments:
+                # Avant la restauration des réplicas : ils copieront les segments fusionnés
+                started = time.perf_counter()
+                self.client.options(request_timeout=3600).indices.forcemerge(
+                    index=self.index_name,
+                    max_num_segments=forcemerge_segments,
+                    ignore_unavailable=True,
+                    allow_no_indices=True
+                )
+                phases["forcemerge"] = time.perf_counter() - started
+            
+            started = time.perf_counter()
+            for name, original in originals.items():
+                self.client.indices.put_settings(index=name, settings=original)
+            if partitioned:
+                self._put_partition_template()
+                template = self.index_definition()["settings"]
+                normal = {
+                    "index.refresh_interval": template.get("refresh_interval"),
+                    "index.number_of_replicas": template.get("number_of_replicas"),
+                }
+                created = [name for name in self.list_partitions() if name not in existing and name not in originals]
+                if created:
+                    self.client.indices.put_settings(index=",".join(created), settings=normal)
+            phases["restore"] = time.perf_counter() - started
+            
+            print("⏱️  Phases du chargement massif : " + ", ".join(
+                f"{name} {seconds:.1f}s" for name, seconds in phases.items()
+            ))
     
-    def _prepare_document(self, offer: Dict[str, Any]) -> Dict[str, Any]:
+    def load_content_hashes(self, store: ContentHashStore) -> int:
         """
-        Prépare un document pour l'indexation (conversion des coordonnées GPS, dates, etc.).
+        Remplit une table d'empreintes depuis l'index (sidecar local perdu ou absent).
         
         Args:
-            offer: Offre d'emploi brute
+            store: Table à compléter
             
         Returns:
-            Document prêt pour l'indexation
+            Nombre d'empreintes lues
+        """
+        loaded = 0
+        for hit in helpers.scan(self.client, index=self.index_name, _source=["content_hash"], size=5000):
+            content_hash = hit.get("_source", {}).get("content_hash")
+            if content_hash:
+                store.set(hit["_id"], content_hash)
+                loaded += 1
+        return loaded
+    
+    # ------------------------------------------------------------------
+    # Partitionnement mensuel (published_at)
+    # ------------------------------------------------------------------
+    
+    @property
+    def template_name(self) -> str:
+        return f"{self.index_name}-monthly"
+    
+    def put_partition_template(self) -> None:
         """
-        doc = offer.copy()
+        Crée ou met à jour le template des index mensuels.
         
-        # Corriger company_name si c'est un objet (bug du normalizer)
-        if isinstance(doc.get("company_name"), dict):
-            # Extraire le nom ou la description
-            company_info = doc["company_name"]
-            doc["company_name"] = company_info.get("nom") or company_info.get("description", "")[:200] or None
+        Chaque index `<index_name>-AAAA.MM` créé (explicitement ou à la première
+        écriture) reçoit le mapping de index_definition() et l'alias de lecture
+        `index_name` : search(), count() et get_stats() couvrent tous les mois.
         
-        # Convertir les coordonnées GPS en format geo_point
-        if offer.get("location_latitude") and offer.get("location_longitude"):
-            doc["location_coordinates"] = {
-                "lat": offer["location_latitude"],
-                "lon": offer["location_longitude"]
+        Raises:
+            RuntimeError: `index_name` est déjà un index physique ou un alias
+                          vers des index non mensuels (installation non partitionnée)
+        """
+        # L'alias de lecture ne peut ni porter le nom d'un index existant, ni
+        # mélanger index versionnés et index mensuels
+        if self.client.indices.exists(index=self.index_name):
+            foreign = [name for name in self.alias_targets() or [self.index_name] if not self._is_partition(name)]
+            if foreign:
+                raise RuntimeError(
+                    f"'{self.index_name}' désigne déjà des index non partitionnés ({', '.join(foreign)}) : "
+                    f"supprimez-les ou indexez sans partitionnement mensuel"
+                )
+        self._put_partition_template()
+        print(f"✓ Template '{self.template_name}' ({self.index_name}-AAAA.MM) à jour")
+    
+    def _put_partition_template(self, settings: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Écrit le template des index mensuels (sans vérification de l'alias).
+        
+        Args:
+            settings: Réglages remplaçant ceux de index_definition() (ex:
+                      réglages d'écriture pendant un chargement massif)
+        """
+        definition = self.index_definition()
+        self.client.indices.put_index_template(
+            name=self.template_name,
+            index_patterns=[f"{self.index_name}-*.*"],
+            priority=100,
+            template={
+                "settings": {**definition["settings"], **(settings or {})},
+                "mappings": definition["mappings"],
+                "aliases": {self.index_name: {}},
             }
-            # Supprimer les champs séparés (optionnel, pour éviter la duplication)
-            doc.pop("location_latitude", None)
-            doc.pop("location_longitude", None)
-        
-        # S'assurer que les dates sont au bon format
-        for date_field in ["published_at", "updated_at", "collected_at"]:
-            if doc.get(date_field):
-                # Elasticsearch accepte ISO 8601
-                if isinstance(doc[date_field], str):
-                    try:
-                        # Valider le format de date
-                        datetime.fromisoformat(doc[date_field].replace("Z", "+00:00"))
-                    except ValueError:
-                        doc[date_field] = None
+        )
+    
+    def list_partitions(self) -> List[str]:
+        """Index mensuels existants, du plus ancien au plus récent."""
+        indices = self.client.indices.get_alias(index=f"{self.index_name}-*.*")
+        return sorted(name for name in indices if self._is_partition(name))
+    
+    def rollover_partitions(self, months_ahead: int = 1) -> List[str]:
+        """
+        Prépare les index du mois courant et des `months_ahead` mois suivants.
+        
+        Le routage par mois de publication étant déterministe, le « rollover »
+        consiste à créer les index à l'avance (template appliqué, shard alloué)
+        plutôt qu'à la première écriture du mois.
+        
+        Returns:
+            Index créés
+        """
+        self.put_partition_template()
+        today = datetime.now()
+        current = today.year * 12 + today.month - 1
+        created = []
+        for number in range(current, current + months_ahead + 1):
+            name = self.partition_name(f"{number // 12:04d}-{number % 12 + 1:02d}")
+            if not self.client.indices.exists(index=name):
+                self.client.indices.create(index=name)
+                created.append(name)
+                print(f"✓ Index mensuel '{name}' créé")
+        return created
+    
+    def apply_retention(
+        self,
+        keep_months: int = 24,
+        readonly_after_months: int = 3,
+        hashes: Optional[ContentHashStore] = None
+    ) -> Dict[str, List[str]]:
+        """
+        Politique de rétention des index mensuels.
+        
+        Les mois plus anciens que `keep_months` sont supprimés ; ceux plus
+        anciens que `readonly_after_months` sont figés (écriture bloquée) et
+        fusionnés en un segment, ce qui réduit leur empreinte mémoire et disque.
+        
+        Args:
+            keep_months: Nombre de mois conservés
+            readonly_after_months: Âge (mois) à partir duquel un index est figé
+            hashes: Empreintes du sidecar, dont les offres des mois supprimés
+                    sont retirées (à sauvegarder par l'appelant)
         
-        return doc
+        Returns:
+            {"deleted": [...], "frozen": [...]}
+        """
+        today = datetime.now()
+        current = today.year * 12 + today.month - 1
+        result: Dict[str, List[str]] = {"deleted": [], "frozen": []}
+        for name in self.list_partitions():
+            age = current - self._partition_month(name)
+            if age >= keep_months:
+                if hashes is not None:
+                    hashes.discard(hit["_id"] for hit in helpers.scan(self.client, index=name, _source=False, size=5000))
+                self.client.indices.delete(index=name)
+                self.query_cache.invalidate(name)
+                result["deleted"].append(name)
+                print(f"🗑  Index mensuel '{name}' supprimé ({age} mois)")
+            elif age >= readonly_after_months:
+                settings = self.client.indices.get_settings(index=name, flat_settings=True)
+                if settings.get(name, {}).get("settings", {}).get("index.blocks.write") == "true":
+                    continue
+                self.client.indices.put_settings(index=name, settings={"index.blocks.write": True})
+                self.client.options(request_timeout=3600).indices.forcemerge(index=name, max_num_segments=1)
+                result["frozen"].append(name)
+                print(f"❄️  Index mensuel '{name}' figé ({age} mois)")
+        return result
+    
+    def partitions_for_range(self, start: Optional[str] = None, end: Optional[str] = None) -> List[str]:
+        """
+        Index mensuels pouvant contenir des offres publiées entre `start` et `end`.
+        
+        Args:
+            start: Date de début incluse ("AAAA-MM-JJ...", None = sans borne)
+            end: Date de fin incluse ("AAAA-MM-JJ...", None = sans borne)
+            
+        Returns:
+            Index mensuels existants qui chevauchent l'intervalle
+        """
+        return self._partitions_in_range(self.list_partitions(), start, end)
+    
+    def search_published(
+        self,
+        query: Dict[str, Any],
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        size: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Recherche restreinte aux offres publiées entre `start` et `end`.
+        
+        En partitionnement mensuel, seuls les index des mois concernés sont
+        interrogés ; le filtre de dates est ajouté à la requête dans tous les cas.
+        
+        Args:
+            query: Requête Elasticsearch DSL (corps complet, comme search())
+            start: Date de début incluse (format accepté par Elasticsearch)
+            end: Date de fin incluse
+            size: Nombre de résultats à retourner
+        """
+        body = dict(query)
+        body.setdefault("size", size)
+        date_range = {key: value for key, value in (("gte", start), ("lte", end)) if value}
+        if date_range:
+            clauses = [body["query"]] if "query" in body else []
+            body["query"] = {"bool": {"must": clauses, "filter": [{"range": {"published_at": date_range}}]}}
+        
+        index = self._search_index(body)
+        if index is None:
+            return self._empty_response(body)
+        return self._cached_search(index, body)
+    
+    def _search_index(self, body: Dict[str, Any]) -> Optional[str]:
+        """
+        Index à interroger pour une requête.
+        
+        En partitionnement mensuel, une requête bornée sur `published_at`
+        n'interroge que les mois concernés.
+        
+        Returns:
+            Index (ou liste séparée par des virgules), None si aucun index
+            mensuel ne peut contenir de résultat
+        """
+        bounds = self._search_bounds(body)
+        if bounds is None:
+            return self.index_name
+        partitions = self.partitions_for_range(*bounds)
+        return ",".join(partitions) if partitions else None
+    
+    def _cached_search(self, index: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Recherche servie depuis le cache local si un résultat valide y est présent.
+        
+        Les requêtes d'agrégation (`size: 0`) sont aussi marquées pour le cache
+        de requêtes des shards Elasticsearch (request_cache), qui sert les
+        autres clients du cluster.
+        
+        Returns:
+            Résultats de la recherche (partagés avec le cache : ne pas les modifier)
+        """
+        key = self.query_cache.key(index, body) if self.query_cache.enabled else None
+        result = self.query_cache.get(key) if key else None
+        if result is None:
+            result = self.client.search(index=index, body=body, request_cache=body.get("size") == 0 or None)
+            if key:
+                self.query_cache.put(key, result)
+        return result
     
     def search(self, query: Dict[str, Any], size: int = 10) -> Dict[str, Any]:
         """
@@ -327,17 +1211,248 @@ class ElasticsearchClient:
             size: Nombre de résultats à retourner
             
         Returns:
-            Résultats de la recherche
+            Résultats de la recherche (éventuellement servis depuis le cache
+            local, à ne pas modifier)
         """
         try:
             # Ajouter size au body si pas déjà présent
             if "size" not in query:
                 query["size"] = size
-            return self.client.search(index=self.index_name, body=query)
+            index = self._search_index(query)
+            if index is None:
+                return self._empty_response(query)
+            return self._cached_search(index, query)
         except Exception as e:
             print(f"❌ Erreur lors de la recherche: {e}")
             raise
     
+    def multi_search(self, queries: Dict[str, Dict[str, Any]], size: int = 10) -> Dict[str, Any]:
+        """
+        Exécute plusieurs recherches nommées en une seule requête _msearch.
+        
+        Une page de tableau de bord fait un aller-retour au lieu d'un par
+        requête. Les résultats déjà en cache local ne sont pas renvoyés au
+        cluster ; les requêtes `size: 0` utilisent le cache de requêtes des shards.
+        
+        Usage:
+            results = es_client.multi_search({
+                "contrats": {"size": 0, "aggs": {"by": {"terms": {"field": "contract_type"}}}},
+                "villes": {"size": 0, "aggs": {"by": {"terms": {"field": "location_city"}}}},
+            })
+            results["contrats"]["aggregations"]
+        
+        Args:
+            queries: Requêtes Elasticsearch DSL indexées par nom
+            size: Nombre de résultats par requête (si absent de la requête)
+            
+        Returns:
+            Résultats indexés par nom, dans l'ordre de `queries`. Une requête
+            en échec donne une réponse d'erreur ({"error": ..., "status": ...})
+            sans interrompre les autres.
+        """
+        bodies = {name: {"size": size, **query} for name, query in queries.items()}
+        indices = {name: self._search_index(body) for name, body in bodies.items()}
+        results: Dict[str, Any] = {}
+        keys = {}
+        for name, body in bodies.items():
+            if indices[name] is None:
+                # Aucun index mensuel sur la période
+                results[name] = self._empty_response(body)
+            elif self.query_cache.enabled:
+                keys[name] = self.query_cache.key(indices[name], body)
+                results[name] = self.query_cache.get(keys[name])
+            else:
+                results[name] = None
+        
+        missing = [name for name, result in results.items() if result is None]
+        if missing:
+            searches: List[Dict[str, Any]] = []
+            for name in missing:
+                header: Dict[str, Any] = {"index": indices[name]}
+                if bodies[name]["size"] == 0:
+                    header["request_cache"] = True
+                searches.extend([header, bodies[name]])
+            try:
+                responses = self.client.msearch(searches=searches)["responses"]
+            except Exception as e:
+                print(f"❌ Erreur lors de la recherche multiple: {e}")
+                raise
+            for name, response in zip(missing, responses):
+                results[name] = response
+                if "error" in response:
+                    print(f"⚠ Requête '{name}' en échec: {response['error']}")
+                elif name in keys:
+                    self.query_cache.put(keys[name], response)
+        return results
+    
+    def iter_all(
+        self,
+        query: Optional[Dict[str, Any]] = None,
+        fields: Optional[List[str]] = None,
+        page_size: int = 1000,
+        slices: int = 1,
+        keep_alive: str = "2m"
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Parcourt tous les documents de l'index (point-in-time + search_after).
+        
+        Le point-in-time fige une vue cohérente de l'index pendant tout le
+        parcours (les écritures concurrentes n'y apparaissent pas) ; la
+        pagination par search_after sur `_shard_doc` a un coût constant par
+        page, contrairement à `from`. Avec `slices` > 1, le parcours est
+        découpé en tranches lues en parallèle ; au plus 2 x `slices` pages sont
+        en attente, la mémoire reste bornée. Le cache local n'est pas utilisé.
+        
+        Usage:
+            for doc in es_client.iter_all(fields=["id", "title"], slices=4):
+                ...
+        
+        Args:
+            query: Requête DSL (clause "query" seule ; défaut : tous les documents)
+            fields: Champs de _source à retourner (défaut : document complet)
+            page_size: Nombre de documents par requête
+            slices: Nombre de tranches lues en parallèle
+            keep_alive: Durée de vie du point-in-time entre deux pages
+            
+        Yields:
+            _source des documents (ordre non garanti avec plusieurs tranches)
+        """
+        pit_id = self.client.open_point_in_time(index=self.index_name, keep_alive=keep_alive)["id"]
+        try:
+            if slices <= 1:
+                for page in self._iter_pit_pages(pit_id, query, fields, page_size, keep_alive):
+                    yield from page
+                return
+            
+            pages: "queue.Queue[Any]" = queue.Queue(maxsize=slices * 2)
+            stop = threading.Event()
+            done = object()
+            
+            def offer(item: Any) -> bool:
+                # put() interruptible : le consommateur peut abandonner le parcours
+                while not stop.is_set():
+                    try:
+                        pages.put(item, timeout=0.5)
+                        return True
+                    except queue.Full:
+                        continue
+                return False
+            
+            def read_slice(slice_id: int) -> None:
+                try:
+                    for page in self._iter_pit_pages(
+                        pit_id, query, fields, page_size, keep_alive, {"id": slice_id, "max": slices}
+                    ):
+                        if not offer(page):
+                            return
+                    offer(done)
+                except Exception as e:
+                    offer(e)
+            
+            with ThreadPoolExecutor(max_workers=slices, thread_name_prefix="es-slice") as executor:
+                for slice_id in range(slices):
+                    executor.submit(read_slice, slice_id)
+                try:
+                    finished = 0
+                    while finished < slices:
+                        item = pages.get()
+                        if item is done:
+                            finished += 1
+                        elif isinstance(item, Exception):
+                            raise item
+                        else:
+                            yield from item
+                finally:
+                    stop.set()
+        finally:
+            self.client.close_point_in_time(id=pit_id)
+    
+    def _iter_pit_pages(
+        self,
+        pit_id: str,
+        query: Optional[Dict[str, Any]],
+        fields: Optional[List[str]],
+        page_size: int,
+        keep_alive: str,
+        slice_: Optional[Dict[str, int]] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Pages successives (listes de _source) d'un point-in-time, éventuellement d'une seule tranche."""
+        body: Dict[str, Any] = {
+            "size": page_size,
+            "query": query or {"match_all": {}},
+            "pit": {"id": pit_id, "keep_alive": keep_alive},
+            "sort": [{"_shard_doc": "asc"}],
+            "track_total_hits": False,
+        }
+        if fields is not None:
+            body["_source"] = fields
+        if slice_ is not None:
+            body["slice"] = slice_
+        while True:
+            response = self.client.search(body=body)
+            hits = response["hits"]["hits"]
+            if not hits:
+                return
+            yield [hit.get("_source", {}) for hit in hits]
+            if len(hits) < page_size:
+                return
+            body["search_after"] = hits[-1]["sort"]
+            # L'identifiant du point-in-time peut évoluer d'une réponse à l'autre
+            body["pit"]["id"] = response.get("pit_id", body["pit"]["id"])
+    
+    def iter_composite(
+        self,
+        sources: Any,
+        query: Optional[Dict[str, Any]] = None,
+        aggs: Optional[Dict[str, Any]] = None,
+        page_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Parcourt tous les buckets d'une agrégation composite, page par page (after_key).
+        
+        Contrairement à une agrégation terms de grande taille, chaque requête
+        ne construit que `page_size` buckets : les distributions complètes sur
+        des champs à forte cardinalité (entreprises, compétences, communes)
+        restent peu coûteuses pour le cluster, et les comptes sont exacts.
+        
+        Usage:
+            for bucket in es_client.iter_composite(["rome_code", "location_department"]):
+                bucket["key"]["rome_code"], bucket["key"]["location_department"], bucket["doc_count"]
+        
+        Args:
+            sources: Champs de regroupement : liste de noms de champs, dict
+                     {nom: champ}, ou liste de sources composites complètes
+                     (ex: [{"mois": {"date_histogram": {...}}}])
+            query: Clause "query" DSL restreignant les documents (optionnel)
+            aggs: Sous-agrégations calculées pour chaque bucket (optionnel)
+            page_size: Nombre de buckets par requête
+            
+        Yields:
+            Buckets {"key": {source: valeur}, "doc_count": n, ...sous-agrégations}
+        """
+        if isinstance(sources, dict):
+            sources = [{name: {"terms": {"field": field}}} for name, field in sources.items()]
+        else:
+            sources = [
+                {source: {"terms": {"field": source}}} if isinstance(source, str) else source
+                for source in sources
+            ]
+        composite: Dict[str, Any] = {"size": page_size, "sources": sources}
+        body: Dict[str, Any] = {"size": 0, "aggs": {"facet": {"composite": composite}}}
+        if aggs:
+            body["aggs"]["facet"]["aggs"] = aggs
+        if query:
+            body["query"] = query
+        
+        while True:
+            result = self.client.search(index=self.index_name, body=body, request_cache=True)
+            facet = result["aggregations"]["facet"]
+            yield from facet["buckets"]
+            # Page vide ou sans after_key : tous les buckets ont été lus
+            if not facet["buckets"] or "after_key" not in facet:
+                return
+            composite["after"] = facet["after_key"]
+    
     def count(self) -> int:
         """
         Compte le nombre de documents dans l'index.
@@ -351,19 +1466,131 @@ class ElasticsearchClient:
         except Exception:
             return 0
     
-    def delete_index(self) -> bool:
+    def delete_index(self, hashes: Optional[ContentHashStore] = None) -> bool:
         """
         Supprime l'index.
         
+        Args:
+            hashes: Empreintes du sidecar, vidées avec l'index (à sauvegarder par l'appelant)
+        
         Returns:
             True si la suppression a réussi
         """
         if self.client.indices.exists(index=self.index_name):
-            self.client.indices.delete(index=self.index_name)
+            # Derrière un alias : supprimer les index physiques (versions actives)
+            self.client.indices.delete(index=self.alias_targets() or self.index_name)
+            self.query_cache.invalidate(self.index_name)
+            if hashes is not None:
+                hashes.clear()
             print(f"✓ Index '{self.index_name}' supprimé")
             return True
         return False
     
+    def alias_targets(self) -> List[str]:
+        """
+        Index physiques derrière l'alias `index_name`.
+        
+        Returns:
+            Noms triés ([] si `index_name` n'est pas un alias)
+        """
+        if not self.client.indices.exists_alias(name=self.index_name):
+            return []
+        return sorted(self.client.indices.get_alias(name=self.index_name).keys())
+    
+    def list_versions(self) -> List[str]:
+        """
+        Index versionnés `<index_name>-<AAAAMMJJHHMMSS>` existants, du plus ancien au plus récent.
+        """
+        pattern = re.compile(rf"^{re.escape(self.index_name)}-\d{{14}}$")
+        indices = self.client.indices.get_alias(index=f"{self.index_name}-*")
+        return sorted(name for name in indices if pattern.match(name))
+    
+    def create_versioned_index(self) -> str:
+        """
+        Crée un nouvel index physique horodaté, hors de l'alias de lecture.
+        
+        Les requêtes continuent d'interroger la version active pendant que la
+        nouvelle est construite ; elle n'est exposée que par swap_alias().
+        
+        Returns:
+            Nom de l'index créé (ex: jobmarket_v3-20260118093000)
+        """
+        name = f"{self.index_name}-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        self.client.indices.create(index=name, body=self.index_definition())
+        print(f"✓ Index versionné '{name}' créé")
+        return name
+    
+    def validate_index(self, index: str, min_ratio: float = 0.9) -> Tuple[bool, str]:
+        """
+        Vérifie qu'une version reconstruite peut remplacer la version active.
+        
+        Args:
+            index: Index physique à valider
+            min_ratio: Nombre minimal de documents, relatif à la version active
+            
+        Returns:
+            (valide, explication)
+        """
+        self.client.indices.refresh(index=index)
+        new_count = self.client.count(index=index)["count"]
+        if not new_count:
+            return False, f"'{index}' est vide"
+        
+        current_count = self.count() if self.client.indices.exists(index=self.index_name) else 0
+        if current_count and new_count < current_count * min_ratio:
+            return False, (
+                f"'{index}' contient {new_count:,} documents, "
+                f"moins de {min_ratio:.0%} de la version active ({current_count:,})"
+            )
+        
+        # L'index doit répondre à une requête
+        self.client.search(index=index, size=1, query={"match_all": {}})
+        return True, f"{new_count:,} documents (version active : {current_count:,})"
+    
+    def swap_alias(self, new_index: str) -> List[str]:
+        """
+        Bascule atomiquement l'alias `index_name` vers `new_index`.
+        
+        Un ancien index physique portant le nom de l'alias (installation
+        antérieure aux index versionnés) est supprimé dans la même opération.
+        
+        Returns:
+            Index précédemment derrière l'alias
+        """
+        previous = self.alias_targets()
+        actions = [{"remove": {"index": index, "alias": self.index_name}} for index in previous if index != new_index]
+        if not previous and self.client.indices.exists(index=self.index_name):
+            actions.append({"remove_index": {"index": self.index_name}})
+        actions.append({"add": {"index": new_index, "alias": self.index_name, "is_write_index": True}})
+        self.client.indices.update_aliases(actions=actions)
+        self.query_cache.invalidate(self.index_name)
+        print(f"✓ Alias '{self.index_name}' → '{new_index}'")
+        return previous
+    
+    def garbage_collect_versions(self, keep: int = 1, hashes: Optional[ContentHashStore] = None) -> List[str]:
+        """
+        Supprime les anciennes versions inactives (hors alias).
+        
+        Le sidecar d'empreintes décrit la version active : il est conservé,
+        sauf si l'alias ne désigne plus aucune version (il est alors vidé).
+        
+        Args:
+            keep: Nombre de versions inactives récentes conservées (retour arrière)
+            hashes: Empreintes du sidecar (à sauvegarder par l'appelant)
+            
+        Returns:
+            Index supprimés
+        """
+        active = set(self.alias_targets())
+        inactive = [name for name in self.list_versions() if name not in active]
+        obsolete = inactive[:-keep] if keep > 0 else inactive
+        for name in obsolete:
+            self.client.indices.delete(index=name)
+            print(f"🗑  Ancienne version '{name}' supprimée")
+        if hashes is not None and not active and not self.client.indices.exists(index=self.index_name):
+            hashes.clear()
+        return obsolete
+    
     def get_stats(self) -> Dict[str, Any]:
         """
         Retourne des statistiques sur l'index.
@@ -374,6 +1601,8 @@ class ElasticsearchClient:
         stats = self.client.indices.stats(index=self.index_name)
         return {
             "total_documents": self.count(),
-            "size_in_bytes": stats["indices"][self.index_name]["total"]["store"]["size_in_bytes"],
-            "index_name": self.index_name
+            # "_all" : somme des index physiques (alias ou index simple)
+            "size_in_bytes": stats["_all"]["total"]["store"]["size_in_bytes"],
+            "index_name": self.index_name,
+            "query_cache": self.query_cache.stats()
         }
@@ -0,0 +1,125 @@
+"""
+Export des documents indexés vers des fichiers JSONL ou Parquet.
+
+Les documents sont écrits au fil de l'eau (typiquement depuis
+ElasticsearchClient.iter_all) : la mémoire utilisée ne dépend pas de la
+taille de l'index. Le fichier final n'apparaît qu'une fois l'export terminé ;
+un export interrompu (PIT expiré, erreur du cluster) ne laisse pas de fichier
+temporaire.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+# Types Elasticsearch scalaires -> types Parquet (les autres champs sont en JSON)
+_NUMERIC_TYPES = {
+    "float": "float64", "double": "float64", "half_float": "float64", "scaled_float": "float64",
+    "long": "int64", "integer": "int64", "short": "int64", "byte": "int64",
+    "boolean": "bool",
+}
+
+
+def export_jsonl(docs: Iterable[Dict[str, Any]], path: Path) -> int:
+    """
+    Écrit les documents en JSONL (un document par ligne, contenu intégral).
+
+    Returns:
+        Nombre de documents écrits
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    count = 0
+    try:
+        with tmp_path.open("w", encoding="utf-8", newline="") as f:
+            for doc in docs:
+                json.dump(doc, f, ensure_ascii=False)
+                f.write("\n")
+                count += 1
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, path)
+    return count
+
+
+def parquet_columns(properties: Dict[str, Any], fields: Optional[List[str]] = None) -> Dict[str, str]:
+    """
+    Colonnes Parquet déduites du mapping de l'index.
+
+    Les champs numériques et booléens gardent leur type ; les autres
+    (keyword, text, date...) sont des chaînes. Les valeurs non scalaires
+    (listes, objets, nested, geo_point) sont sérialisées en JSON.
+
+    Args:
+        properties: mappings.properties de l'index
+        fields: Champs exportés (défaut : tous les champs du mapping)
+
+    Returns:
+        {champ: "float64" | "int64" | "bool" | "string"}
+    """
+    names = fields or list(properties)
+    return {name: _NUMERIC_TYPES.get(properties.get(name, {}).get("type"), "string") for name in names}
+
+
+def _parquet_value(value: Any, column_type: str) -> Any:
+    if value is None or column_type != "string":
+        return value
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+def export_parquet(
+    docs: Iterable[Dict[str, Any]],
+    path: Path,
+    properties: Dict[str, Any],
+    fields: Optional[List[str]] = None,
+    row_group_size: int = 10_000
+) -> int:
+    """
+    Écrit les documents en Parquet, par groupes de `row_group_size` lignes.
+
+    Le schéma suit le mapping (parquet_columns) : il est identique d'un
+    export à l'autre, quel que soit le contenu des premiers documents. Les
+    champs absents du mapping (ou de `fields`) ne sont pas exportés.
+
+    Returns:
+        Nombre de documents écrits
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError(
+            "Le package 'pyarrow' n'est pas installé. "
+            "Installez-le avec: pip install pyarrow>=14.0.0"
+        )
+
+    columns = parquet_columns(properties, fields)
+    schema = pa.schema([(name, pa.type_for_alias(column_type)) for name, column_type in columns.items()])
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+
+    count = 0
+    rows: List[Dict[str, Any]] = []
+    try:
+        with pq.ParquetWriter(tmp_path, schema, compression="zstd") as writer:
+            for doc in docs:
+                rows.append({name: _parquet_value(doc.get(name), column_type) for name, column_type in columns.items()})
+                if len(rows) >= row_group_size:
+                    writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                    count += len(rows)
+                    rows = []
+            if rows:
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                count += len(rows)
+    except BaseException:
+        # Export interrompu (itérateur ou écriture) : pas de fichier partiel
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, path)
+    return count
@@ -0,0 +1,123 @@
+"""
+Documents d'offres et calculs communs aux stockages (Elasticsearch, SQLite).
+
+Ce module ne dépend d'aucun client : le stockage SQLite embarqué l'utilise
+sans le package elasticsearch.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from .content_hashes import document_hash
+
+# Percentiles salariaux calculés par défaut (salary_benchmark)
+SALARY_PERCENTS = (10, 25, 50, 75, 90)
+
+
+def prepare_document(offer: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Prépare un document pour l'indexation (conversion des coordonnées GPS, dates, etc.).
+
+    Args:
+        offer: Offre d'emploi brute
+
+    Returns:
+        Document prêt pour l'indexation
+    """
+    doc = offer.copy()
+
+    # Corriger company_name si c'est un objet (bug du normalizer)
+    if isinstance(doc.get("company_name"), dict):
+        # Extraire le nom ou la description
+        company_info = doc["company_name"]
+        doc["company_name"] = company_info.get("nom") or company_info.get("description", "")[:200] or None
+
+    # Convertir les coordonnées GPS en format geo_point
+    if offer.get("location_latitude") and offer.get("location_longitude"):
+        doc["location_coordinates"] = {
+            "lat": offer["location_latitude"],
+            "lon": offer["location_longitude"]
+        }
+        # Supprimer les champs séparés (optionnel, pour éviter la duplication)
+        doc.pop("location_latitude", None)
+        doc.pop("location_longitude", None)
+
+    # S'assurer que les dates sont au bon format
+    for date_field in ["published_at", "updated_at", "collected_at"]:
+        if doc.get(date_field):
+            # Elasticsearch accepte ISO 8601
+            if isinstance(doc[date_field], str):
+                try:
+                    # Valider le format de date
+                    datetime.fromisoformat(doc[date_field].replace("Z", "+00:00"))
+                except ValueError:
+                    doc[date_field] = None
+
+    # Empreinte du document final (réindexation incrémentale)
+    doc["content_hash"] = document_hash(doc)
+
+    return doc
+
+
+class SalaryBenchmarkMixin:
+    """Repères salariaux pour tout client exposant search(body) au format de réponse Elasticsearch."""
+    
+    def salary_benchmark(
+        self,
+        by: Optional[str] = None,
+        percents: Sequence[float] = SALARY_PERCENTS,
+        ranks: Sequence[float] = (),
+        query: Optional[Dict[str, Any]] = None,
+        size: int = 50,
+        field: str = "salary_annual_min"
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Repères salariaux (percentiles, rangs) en une seule agrégation.
+        
+        Les percentiles sont calculés par le stockage (TDigest sous
+        Elasticsearch, exacts sous SQLite) sur le salaire annuel normalisé :
+        pas de rapatriement des salaires ni de boucle côté client, et des
+        montants comparables quelle que soit l'unité d'origine.
+        
+        Usage:
+            client.salary_benchmark(by="rome_code", ranks=[40000])
+            # {"M1805": {"offers": 812, "avg": 41250.0, "percentiles": {50.0: 40000.0, ...},
+            #            "ranks": {40000.0: 48.7}}, ...}
+        
+        Args:
+            by: Champ de ventilation (ex: rome_code, location_region,
+                experience_level) ; None = ensemble des offres ("_all")
+            percents: Percentiles à calculer
+            ranks: Salaires annuels dont on veut le rang percentile
+                   (part des offres en dessous, en %)
+            query: Clause "query" DSL restreignant les offres (optionnel)
+            size: Nombre maximal de groupes (les plus fournis)
+            field: Champ salarial analysé
+            
+        Returns:
+            Par groupe : nombre d'offres avec salaire, moyenne, percentiles
+            {percent: montant} et rangs {montant: percent}
+        """
+        metrics: Dict[str, Any] = {
+            "stats": {"stats": {"field": field}},
+            "percentiles": {"percentiles": {"field": field, "percents": list(percents)}},
+        }
+        if ranks:
+            metrics["ranks"] = {"percentile_ranks": {"field": field, "values": list(ranks)}}
+        filters: List[Dict[str, Any]] = [{"exists": {"field": field}}]
+        if query:
+            filters.append(query)
+        body: Dict[str, Any] = {"size": 0, "query": {"bool": {"filter": filters}}}
+        body["aggs"] = {"groups": {"terms": {"field": by, "size": size}, "aggs": metrics}} if by else metrics
+        
+        aggregations = self.search(body)["aggregations"]
+        buckets = aggregations["groups"]["buckets"] if by else [dict(aggregations, key="_all")]
+        return {
+            bucket["key"]: {
+                "offers": bucket["stats"]["count"],
+                "avg": bucket["stats"]["avg"],
+                "percentiles": {float(p): v for p, v in bucket["percentiles"]["values"].items()},
+                "ranks": {float(r): v for r, v in bucket.get("ranks", {}).get("values", {}).items()},
+            }
+            for bucket in buckets
+        }
@@ -0,0 +1,121 @@
+"""
+Cache local des résultats de recherche Elasticsearch (LRU + TTL).
+
+Les tableaux de bord rejouent sans cesse les mêmes agrégations (`size: 0`) :
+le résultat est conservé côté client, indexé par la requête DSL canonique
+(clés triées) et l'index interrogé. Toute écriture du client sur un index
+invalide les entrées qui le concernent ; le TTL borne l'obsolescence face aux
+écritures d'autres processus.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+def canonical_query(query: Dict[str, Any]) -> str:
+    """Sérialisation stable d'une requête DSL (indépendante de l'ordre des clés)."""
+    return json.dumps(query, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _related(cached: str, written: str) -> bool:
+    """
+    Vrai si une écriture sur `written` peut modifier un résultat lu sur `cached`.
+
+    Les index versionnés et les partitions mensuelles sont nommés
+    `<alias>-<suffixe>` : une écriture sur `jobmarket_v3-2026.01` invalide les
+    lectures de l'alias `jobmarket_v3`, et inversement.
+    """
+    return cached == written or cached.startswith(written + "-") or written.startswith(cached + "-")
+
+
+class QueryCache:
+    """Cache LRU à durée de vie limitée, partagé entre threads."""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 60.0):
+        """
+        Args:
+            max_entries: Nombre maximal de résultats conservés (0 = cache désactivé)
+            ttl: Durée de vie d'une entrée (secondes)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def key(index: str, query: Dict[str, Any]) -> Tuple[str, str]:
+        return index, canonical_query(query)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Résultat en cache, ou None (absent ou expiré).
+
+        Le résultat retourné est partagé : il ne doit pas être modifié.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, index: Optional[str] = None) -> int:
+        """
+        Supprime les entrées lues sur `index` ou sur un index lié (None = tout).
+
+        Returns:
+            Nombre d'entrées supprimées
+        """
+        with self._lock:
+            if index is None:
+                stale = list(self._entries)
+            else:
+                stale = [
+                    key for key in self._entries
+                    if any(_related(part, index) for part in key[0].split(","))
+                ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs d'utilisation (taux de succès, évictions, invalidations)."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,229 @@
+"""
+Index de synthèse quotidienne du marché (rollup).
+
+Les questions de tendance (offres par jour, par code ROME, département et
+type de contrat, statistiques salariales) sont pré-agrégées dans un petit
+index `<index>_daily` : un document par (jour, code ROME, département,
+contrat). Les tableaux de bord interrogent quelques milliers de documents de
+synthèse au lieu d'agréger les millions d'offres brutes.
+
+Après chaque indexation, seuls les jours de publication des offres lues sont
+recalculés. Les fonctions sur les jours (offer_day, record_days, day_ranges)
+ne dépendent pas du package elasticsearch.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from .elasticsearch import ElasticsearchClient
+
+# Dimensions d'un document de synthèse (champs keyword de l'index des offres)
+ROLLUP_DIMENSIONS = ["rome_code", "location_department", "contract_type"]
+# Champs numériques résumés (nombre, somme, min, max) pour chaque document :
+# salaires annuels normalisés, comparables quelle que soit l'unité d'origine
+ROLLUP_METRICS = ["salary_annual_min", "salary_annual_max"]
+
+
+def offer_day(offer: Dict[str, Any]) -> Optional[str]:
+    """
+    Jour de publication (AAAA-MM-JJ, UTC comme les buckets Elasticsearch).
+
+    Returns:
+        None si la date est absente ou invalide
+    """
+    value = offer.get("published_at")
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        published = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if published.tzinfo is not None:
+        published = published.astimezone(timezone.utc)
+    return published.date().isoformat()
+
+
+def record_days(offers: Iterable[Dict[str, Any]], days: Set[str]) -> Iterator[Dict[str, Any]]:
+    """Transmet les offres en relevant au passage leurs jours de publication dans `days`."""
+    for offer in offers:
+        day = offer_day(offer)
+        if day:
+            days.add(day)
+        yield offer
+
+
+def day_ranges(days: Iterable[str]) -> List[Tuple[str, str]]:
+    """
+    Regroupe des jours en intervalles contigus [début, fin[.
+
+    Une requête sur 300 jours consécutifs reste une seule clause range.
+    """
+    ranges: List[Tuple[str, str]] = []
+    start = end = None
+    for day in sorted({date.fromisoformat(d) for d in days}):
+        if end is not None and day == end:
+            end = day + timedelta(days=1)
+            continue
+        if start is not None:
+            ranges.append((start.isoformat(), end.isoformat()))
+        start, end = day, day + timedelta(days=1)
+    if start is not None:
+        ranges.append((start.isoformat(), end.isoformat()))
+    return ranges
+
+
+def _days_query(field: str, days: Optional[Iterable[str]]) -> Optional[Dict[str, Any]]:
+    if days is None:
+        return None
+    return {
+        "bool": {
+            "should": [{"range": {field: {"gte": start, "lt": end}}} for start, end in day_ranges(days)],
+            "minimum_should_match": 1
+        }
+    }
+
+
+class DailyRollup:
+    """Calcul incrémental et lecture de l'index de synthèse quotidienne."""
+
+    def __init__(self, es_client: "ElasticsearchClient", rollup_index: Optional[str] = None):
+        """
+        Args:
+            es_client: Client de l'index des offres (index ou alias de lecture)
+            rollup_index: Index de synthèse (défaut: <index>_daily)
+        """
+        self.es = es_client
+        self.client = es_client.client
+        self.rollup_index = rollup_index or f"{es_client.index_name}_daily"
+
+    def index_definition(self) -> Dict[str, Any]:
+        """Réglages et mapping des documents de synthèse."""
+        properties: Dict[str, Any] = {
+            "day": {"type": "date", "format": "yyyy-MM-dd"},
+            "offers": {"type": "integer"},
+            "computed_at": {"type": "date"},
+        }
+        for dimension in ROLLUP_DIMENSIONS:
+            properties[dimension] = {"type": "keyword"}
+        for metric in ROLLUP_METRICS:
+            properties[f"{metric}_count"] = {"type": "integer"}
+            for stat in ("sum", "min", "max"):
+                properties[f"{metric}_{stat}"] = {"type": "float"}
+        return {
+            "settings": {"number_of_shards": 1, "number_of_replicas": 0},
+            "mappings": {"dynamic": "strict", "properties": properties}
+        }
+
+    def _summaries(self, days: Optional[Iterable[str]], computed_at: str) -> Iterator[Dict[str, Any]]:
+        """Documents de synthèse des jours demandés (None = tous), via une agrégation composite."""
+        sources: List[Dict[str, Any]] = [
+            {"day": {"date_histogram": {"field": "published_at", "calendar_interval": "day", "format": "yyyy-MM-dd"}}}
+        ]
+        sources += [{d: {"terms": {"field": d, "missing_bucket": True}}} for d in ROLLUP_DIMENSIONS]
+        aggs = {metric: {"stats": {"field": metric}} for metric in ROLLUP_METRICS}
+
+        for bucket in self.es.iter_composite(sources, query=_days_query("published_at", days), aggs=aggs):
+            key = bucket["key"]
+            doc: Dict[str, Any] = {
+                "day": key["day"],
+                "offers": bucket["doc_count"],
+                "computed_at": computed_at,
+            }
+            for dimension in ROLLUP_DIMENSIONS:
+                doc[dimension] = key[dimension]
+            for metric in ROLLUP_METRICS:
+                stats = bucket[metric]
+                doc[f"{metric}_count"] = stats["count"]
+                doc[f"{metric}_sum"] = stats["sum"] if stats["count"] else None
+                doc[f"{metric}_min"] = stats["min"]
+                doc[f"{metric}_max"] = stats["max"]
+            yield {
+                "_index": self.rollup_index,
+                "_id": "|".join([key["day"]] + [key[d] or "" for d in ROLLUP_DIMENSIONS]),
+                "_source": doc
+            }
+
+    def update(self, days: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        Recalcule les documents de synthèse des jours `days` (None = tous les jours).
+
+        Les documents sont réécrits (identifiant déterministe), puis ceux des
+        mêmes jours qui n'ont pas été recalculés (combinaison disparue) sont
+        supprimés : l'index de synthèse n'est jamais vide entre-temps.
+
+        Returns:
+            {"days": jours recalculés (0 = tous), "documents": écrits, "deleted": supprimés}
+        """
+        from elasticsearch import helpers
+
+        days = sorted(set(days)) if days is not None else None
+        if days is not None and not days:
+            return {"days": 0, "documents": 0, "deleted": 0}
+
+        if not self.client.indices.exists(index=self.rollup_index):
+            self.client.indices.create(index=self.rollup_index, body=self.index_definition())
+            print(f"✓ Index de synthèse '{self.rollup_index}' créé")
+
+        # Les dernières offres indexées doivent être visibles par l'agrégation
+        self.client.indices.refresh(index=self.es.index_name)
+        computed_at = datetime.now(timezone.utc).isoformat()
+        written, _ = helpers.bulk(self.client, self._summaries(days, computed_at))
+        self.client.indices.refresh(index=self.rollup_index)
+
+        stale: Dict[str, Any] = {"bool": {"filter": [{"range": {"computed_at": {"lt": computed_at}}}]}}
+        if days is not None:
+            stale["bool"]["filter"].append(_days_query("day", days))
+        deleted = self.client.delete_by_query(
+            index=self.rollup_index, query=stale, conflicts="proceed", refresh=True
+        )["deleted"]
+        self.es.query_cache.invalidate(self.rollup_index)
+        return {"days": len(days) if days is not None else 0, "documents": written, "deleted": deleted}
+
+    def daily_series(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Série quotidienne (nombre d'offres, salaire annuel minimum moyen) lue dans l'index de synthèse.
+
+        Args:
+            start: Premier jour inclus (AAAA-MM-JJ)
+            end: Dernier jour inclus
+            filters: Valeurs imposées par dimension (ex: {"rome_code": "M1805"})
+
+        Returns:
+            [{"day", "offers", "salary_annual_min_avg"}] par jour croissant
+        """
+        clauses: List[Dict[str, Any]] = [{"term": {field: value}} for field, value in (filters or {}).items()]
+        date_range = {key: value for key, value in (("gte", start), ("lte", end)) if value}
+        if date_range:
+            clauses.append({"range": {"day": date_range}})
+        query = {
+            "size": 0,
+            "query": {"bool": {"filter": clauses}},
+            "aggs": {
+                "days": {
+                    "date_histogram": {"field": "day", "calendar_interval": "day", "format": "yyyy-MM-dd"},
+                    "aggs": {
+                        "offers": {"sum": {"field": "offers"}},
+                        "salary_sum": {"sum": {"field": "salary_annual_min_sum"}},
+                        "salary_count": {"sum": {"field": "salary_annual_min_count"}},
+                    }
+                }
+            }
+        }
+        result = self.es.with_index(self.rollup_index).search(query)
+        return [
+            {
+                "day": bucket["key_as_string"],
+                "offers": int(bucket["offers"]["value"]),
+                "salary_annual_min_avg": (
+                    bucket["salary_sum"]["value"] / bucket["salary_count"]["value"]
+                    if bucket["salary_count"]["value"] else None
+                ),
+            }
+            for bucket in result["aggregations"]["days"]["buckets"]
+        ]
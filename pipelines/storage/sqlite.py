@@ -0,0 +1,710 @@
+"""
+Stockage embarqué SQLite (FTS5) pour les offres d'emploi.
+
+Alternative locale à Elasticsearch pour les tests, la CI et l'analyse sur
+poste : un fichier SQLite, aucun service à démarrer. `SQLiteClient` expose la
+même interface que `ElasticsearchClient` (create_index, bulk_index_offers,
+search, count, get_stats, salary_benchmark) sans dépendre du package
+elasticsearch, et interprète le sous-ensemble du DSL Elasticsearch
+utilisé par le projet :
+
+- requêtes : match_all, match, multi_match (plein texte FTS5 sur le titre,
+  l'entreprise et la description, score BM25), term, terms, range, exists,
+  ids, bool (must / filter / should / must_not) ;
+- sort, search_after, from / size, _source ;
+- agrégations (imbricables) : terms, date_histogram, avg, sum, min, max,
+  value_count, cardinality, stats, percentiles, percentile_ranks.
+
+Les champs filtrés et agrégés par les tableaux de bord sont des colonnes
+indexées ; les autres sont lus dans le document JSON (json_extract).
+"""
+
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+from bisect import bisect_right
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .backends import UnsupportedQuery
+from .content_hashes import ContentHashStore
+from .offers import SalaryBenchmarkMixin, prepare_document
+from .query_cache import QueryCache
+
+DEFAULT_SQLITE_PATH = "data/jobmarket_v3.sqlite"
+
+# Colonnes extraites du document (les autres champs restent dans le JSON)
+COLUMNS = {
+    "source": "TEXT",
+    "title": "TEXT",
+    "company_name": "TEXT",
+    "description": "TEXT",
+    "rome_code": "TEXT",
+    "contract_type": "TEXT",
+    "location_city": "TEXT",
+    "location_department": "TEXT",
+    "location_region": "TEXT",
+    "experience_level": "TEXT",
+    "published_at": "TEXT",
+    "salary_annual_min": "REAL",
+    "salary_annual_max": "REAL",
+}
+# Colonnes avec index B-tree (filtres, agrégations, tri des tableaux de bord)
+INDEXED_COLUMNS = [
+    "rome_code", "contract_type", "location_city", "location_department", "location_region",
+    "experience_level", "published_at", "salary_annual_min",
+]
+# Colonnes de l'index plein texte, dans l'ordre des poids de bm25()
+TEXT_COLUMNS = ["title", "company_name", "description"]
+# Listes de valeurs : un filtre term porte sur l'un des éléments
+ARRAY_FIELDS = {"skills", "soft_skills", "salary_benefits", "work_context", "permits_required"}
+
+# Longueur du préfixe ISO de published_at par intervalle de date_histogram
+_INTERVALS = {"year": 4, "1y": 4, "month": 7, "1M": 7, "day": 10, "1d": 10}
+_RANGE_OPERATORS = {"gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+_METRICS = {"avg", "sum", "min", "max", "value_count", "cardinality", "stats", "percentiles", "percentile_ranks"}
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_FIELD = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+
+
+def _listify(value: Any) -> List[Any]:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _utc(value: Any) -> Optional[str]:
+    """Date ISO ramenée en UTC (AAAA-MM-JJTHH:MM:SSZ) : comparaisons et découpage par jour cohérents."""
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc)
+    return parsed.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _percentile(values: List[float], percent: float) -> Optional[float]:
+    """Percentile exact par interpolation linéaire (valeurs triées)."""
+    if not values:
+        return None
+    position = (len(values) - 1) * percent / 100
+    low = math.floor(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+class _Translator:
+    """Traduit une requête DSL en clause WHERE / expression de score SQLite (paramètres nommés)."""
+
+    def __init__(self, table: str):
+        self.table = table
+        self.fts = f"{table}_fts"
+        self.params: Dict[str, Any] = {}
+        self.scores: List[str] = []
+
+    def param(self, value: Any) -> str:
+        name = f"p{len(self.params)}"
+        self.params[name] = value
+        return f":{name}"
+
+    @staticmethod
+    def field(field: str) -> str:
+        """Expression SQL d'un champ : colonne indexée ou lecture dans le JSON."""
+        if field.endswith(".keyword"):
+            field = field[:-len(".keyword")]
+        if not _FIELD.match(field):
+            raise ValueError(f"Nom de champ invalide: {field!r}")
+        if field in COLUMNS or field == "id":
+            return f"o.{field}"
+        if field == "_id":
+            return "o.id"
+        return f"json_extract(o.doc, '$.{field}')"
+
+    def terms(self, field: str, values: List[Any]) -> str:
+        placeholders = ", ".join(self.param(v) for v in values) or "NULL"
+        if field in ARRAY_FIELDS:
+            return f"EXISTS (SELECT 1 FROM json_each(o.doc, '$.{field}') WHERE value IN ({placeholders}))"
+        return f"{self.field(field)} IN ({placeholders})"
+
+    def text(self, query: str, fields: List[str], operator: str, scoring: bool) -> str:
+        weights = {}
+        for spec in fields:
+            name, _, boost = spec.partition("^")
+            if name in TEXT_COLUMNS:
+                weights[name] = float(boost or 1)
+        if not weights:
+            raise ValueError(f"Recherche plein texte possible sur {', '.join(TEXT_COLUMNS)} uniquement")
+        tokens = re.findall(r"\w+", query.lower())
+        if not tokens:
+            return "1"
+        joiner = " AND " if operator.lower() == "and" else " OR "
+        match = self.param("{" + " ".join(weights) + "} : (" + joiner.join(f'"{t}"' for t in tokens) + ")")
+        if scoring:
+            # Score BM25 calculé en une requête FTS, joint aux offres (s0, s1...)
+            bm25_weights = ", ".join(str(weights.get(column, 0.0)) for column in TEXT_COLUMNS)
+            self.scores.append(
+                f"SELECT rowid, -bm25({self.fts}, {bm25_weights}) AS score FROM {self.fts} WHERE {self.fts} MATCH {match}"
+            )
+        return f"o.seq IN (SELECT rowid FROM {self.fts} WHERE {self.fts} MATCH {match})"
+
+    def clause(self, query: Optional[Dict[str, Any]], scoring: bool = True) -> str:
+        if not query:
+            return "1"
+        if len(query) != 1:
+            raise ValueError(f"Clause DSL invalide: {query}")
+        kind, spec = next(iter(query.items()))
+
+        if kind == "match_all":
+            return "1"
+        if kind == "bool":
+            return self.boolean(spec, scoring)
+        if kind == "multi_match":
+            return self.text(spec["query"], spec.get("fields", TEXT_COLUMNS), spec.get("operator", "or"), scoring)
+        if kind == "match":
+            field, value = next(iter(spec.items()))
+            options = value if isinstance(value, dict) else {"query": value}
+            if field in TEXT_COLUMNS:
+                return self.text(str(options["query"]), [field], options.get("operator", "or"), scoring)
+            return self.terms(field, [options["query"]])
+        if kind == "term":
+            field, value = next(iter(spec.items()))
+            return self.terms(field, [value["value"] if isinstance(value, dict) else value])
+        if kind == "terms":
+            field, values = next(iter(spec.items()))
+            return self.terms(field, list(values))
+        if kind == "ids":
+            return self.terms("id", list(spec["values"]))
+        if kind == "exists":
+            field = spec["field"]
+            if field in ARRAY_FIELDS:
+                return f"json_array_length(o.doc, '$.{field}') > 0"
+            return f"{self.field(field)} IS NOT NULL"
+        if kind == "range":
+            field, bounds = next(iter(spec.items()))
+            expression = self.field(field)
+            conditions = []
+            for op, value in bounds.items():
+                if op not in _RANGE_OPERATORS:
+                    continue
+                if field == "published_at":
+                    value = _utc(value) or value
+                conditions.append(f"{expression} {_RANGE_OPERATORS[op]} {self.param(value)}")
+            return " AND ".join(conditions) or "1"
+        raise UnsupportedQuery(f"Requête non supportée par le stockage SQLite: {kind}")
+
+    def boolean(self, spec: Dict[str, Any], scoring: bool) -> str:
+        parts = [self.clause(c, scoring) for c in _listify(spec.get("must"))]
+        parts += [self.clause(c, False) for c in _listify(spec.get("filter"))]
+        parts += [f"NOT ({self.clause(c, False)})" for c in _listify(spec.get("must_not"))]
+        should = [self.clause(c, scoring) for c in _listify(spec.get("should"))]
+        # Comme Elasticsearch : les should sont facultatifs à côté de must / filter
+        required = int(spec.get("minimum_should_match", 0 if parts else 1))
+        if should and required == 1:
+            parts.append(" OR ".join(f"({s})" for s in should))
+        elif should and required > 1:
+            parts.append(f"({' + '.join(f'({s})' for s in should)}) >= {required}")
+        return " AND ".join(f"({p})" for p in parts) or "1"
+
+    def score(self) -> str:
+        return " + ".join(f"COALESCE(s{i}.score, 0)" for i in range(len(self.scores))) or "1.0"
+
+    def scored_source(self) -> Tuple[str, str]:
+        """(clause WITH, FROM avec jointure des scores) pour la requête des résultats."""
+        if not self.scores:
+            return "", f"{self.table} AS o"
+        ctes = ", ".join(f"s{i} AS ({sql})" for i, sql in enumerate(self.scores))
+        joins = "".join(f" LEFT JOIN s{i} ON s{i}.rowid = o.seq" for i in range(len(self.scores)))
+        return f"WITH {ctes} ", f"{self.table} AS o{joins}"
+
+
+class SQLiteClient(SalaryBenchmarkMixin):
+    """Client de stockage embarqué (fichier SQLite), interface de ElasticsearchClient."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        index_name: Optional[str] = None,
+        cache_entries: int = 256,
+        cache_ttl: float = 60.0
+    ):
+        """
+        Ouvre (ou crée) la base SQLite.
+
+        Args:
+            path: Fichier de la base (défaut: depuis SQLITE_PATH env var,
+                  ":memory:" pour une base en mémoire)
+            index_name: Nom de la table des offres (défaut: depuis ES_INDEX env var)
+            cache_entries: Taille du cache local des résultats de recherche (0 = désactivé)
+            cache_ttl: Durée de vie d'un résultat en cache (secondes)
+        """
+        self.path = path or os.getenv("SQLITE_PATH", DEFAULT_SQLITE_PATH)
+        self.index_name = index_name or os.getenv("ES_INDEX", "jobmarket_v3")
+        if not _IDENTIFIER.match(self.index_name):
+            raise ValueError(f"Nom d'index invalide pour SQLite: {self.index_name!r}")
+        self.host = f"sqlite:///{self.path}"
+        self.partitioning = None
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # Connexion partagée entre threads (service API) : accès sérialisés par le verrou
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self.query_cache = QueryCache(max_entries=cache_entries, ttl=cache_ttl)
+        try:
+            self.conn.execute("CREATE VIRTUAL TABLE temp.fts5_check USING fts5(x)")
+            self.conn.execute("DROP TABLE temp.fts5_check")
+        except sqlite3.OperationalError:
+            raise RuntimeError(
+                f"SQLite {sqlite3.sqlite_version} est compilé sans FTS5 : "
+                "utilisez STORAGE_BACKEND=elasticsearch ou une version de Python récente."
+            )
+        if self.path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+        print(f"✓ Base SQLite ouverte ({self.path})")
+
+    def _exists(self) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (self.index_name,)
+        ).fetchone()
+        return row is not None
+
+    def create_index(self, force: bool = False) -> bool:
+        """
+        Crée la table des offres, ses index et l'index plein texte FTS5.
+
+        Args:
+            force: Si True, supprime la table existante avant de la recréer
+
+        Returns:
+            True si la table a été créée, False si elle existait déjà
+        """
+        t = self.index_name
+        with self._lock:
+            if self._exists():
+                if not force:
+                    print(f"✓ La table '{t}' existe déjà")
+                    return False
+                print(f"⚠ Suppression de la table existante '{t}'...")
+                self.delete_index()
+
+            columns = ", ".join(f"{name} {sql_type}" for name, sql_type in COLUMNS.items())
+            text = ", ".join(TEXT_COLUMNS)
+            new_text = ", ".join(f"new.{c}" for c in TEXT_COLUMNS)
+            old_text = ", ".join(f"old.{c}" for c in TEXT_COLUMNS)
+            with self.conn:
+                self.conn.execute(
+                    f"CREATE TABLE {t} (seq INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE, "
+                    f"{columns}, content_hash TEXT, doc TEXT NOT NULL)"
+                )
+                for column in INDEXED_COLUMNS:
+                    self.conn.execute(f"CREATE INDEX {t}_{column} ON {t}({column})")
+                # Index plein texte adossé à la table (external content), tenu à jour par triggers
+                self.conn.execute(
+                    f"CREATE VIRTUAL TABLE {t}_fts USING fts5({text}, content='{t}', content_rowid='seq', "
+                    "tokenize='unicode61 remove_diacritics 2')"
+                )
+                self.conn.executescript(f"""
+                    CREATE TRIGGER {t}_ai AFTER INSERT ON {t} BEGIN
+                        INSERT INTO {t}_fts(rowid, {text}) VALUES (new.seq, {new_text});
+                    END;
+                    CREATE TRIGGER {t}_ad AFTER DELETE ON {t} BEGIN
+                        INSERT INTO {t}_fts({t}_fts, rowid, {text}) VALUES ('delete', old.seq, {old_text});
+                    END;
+                    CREATE TRIGGER {t}_au AFTER UPDATE ON {t} BEGIN
+                        INSERT INTO {t}_fts({t}_fts, rowid, {text}) VALUES ('delete', old.seq, {old_text});
+                        INSERT INTO {t}_fts(rowid, {text}) VALUES (new.seq, {new_text});
+                    END;
+                """)
+        print(f"✓ Table '{t}' créée avec succès")
+        return True
+
+    @staticmethod
+    def _row(offer: Dict[str, Any]) -> Dict[str, Any]:
+        """Ligne à écrire : colonnes extraites + document complet en JSON."""
+        doc = prepare_document(offer)
+        row = {name: doc.get(name) for name in COLUMNS}
+        row["published_at"] = _utc(doc.get("published_at"))
+        row["id"] = str(offer["id"])
+        row["content_hash"] = doc["content_hash"]
+        row["doc"] = json.dumps(doc, ensure_ascii=False, default=str)
+        return row
+
+    def _upsert_sql(self) -> str:
+        names = ["id"] + list(COLUMNS) + ["content_hash", "doc"]
+        updates = ", ".join(f"{name} = excluded.{name}" for name in names[1:])
+        return (
+            f"INSERT INTO {self.index_name} ({', '.join(names)}) "
+            f"VALUES ({', '.join(':' + name for name in names)}) "
+            f"ON CONFLICT(id) DO UPDATE SET {updates}"
+        )
+
+    def index_offer(self, offer: Dict[str, Any]) -> bool:
+        """
+        Indexe une offre d'emploi unique.
+
+        Returns:
+            True si l'indexation a réussi
+        """
+        try:
+            with self._lock, self.conn:
+                self.conn.execute(self._upsert_sql(), self._row(offer))
+            self.query_cache.invalidate(self.index_name)
+            return True
+        except Exception as e:
+            print(f"❌ Erreur lors de l'indexation de l'offre {offer.get('id')}: {e}")
+            return False
+
+    def bulk_index_offers(
+        self,
+        offers: Iterable[Dict[str, Any]],
+        batch_size: Optional[int] = None,
+        verbose: bool = False,
+        chunk_bytes: Optional[int] = None,
+        target_latency: float = 1.0,
+        max_retries: int = 0,
+        hashes: Optional[ContentHashStore] = None
+    ) -> Dict[str, int]:
+        """
+        Indexe plusieurs offres, par transactions de `batch_size` lignes.
+
+        Signature et statistiques identiques à ElasticsearchClient.bulk_index_offers
+        (chunk_bytes, target_latency et max_retries n'ont pas d'effet ici).
+
+        Args:
+            offers: Itérable d'offres d'emploi (liste ou générateur)
+            batch_size: Nombre de lignes par transaction (défaut: 1000)
+            verbose: Si True, affiche les détails des erreurs
+            hashes: Empreintes des documents déjà indexés (optionnel)
+
+        Returns:
+            Dictionnaire avec le nombre d'offres indexées, doublons, erreurs,
+            inchangées ("unchanged")
+        """
+        result = {"indexed": 0, "duplicates": 0, "errors": 0, "unchanged": 0, "error_details": {}, "total": 0, "rejected": 0, "retries": 0}
+        sql = self._upsert_sql()
+        batch: List[Dict[str, Any]] = []
+
+        def flush() -> None:
+            try:
+                with self._lock, self.conn:
+                    self.conn.executemany(sql, batch)
+                result["indexed"] += len(batch)
+                if hashes is not None:
+                    for row in batch:
+                        hashes.set(row["id"], row["content_hash"])
+            except sqlite3.Error as e:
+                result["errors"] += len(batch)
+                error_type = type(e).__name__
+                result["error_details"][error_type] = result["error_details"].get(error_type, 0) + len(batch)
+                if verbose:
+                    print(f"      ❌ Transaction de {len(batch)} offres annulée: {e}")
+            batch.clear()
+
+        for offer in offers:
+            result["total"] += 1
+            try:
+                row = self._row(offer)
+            except (KeyError, TypeError, ValueError) as e:
+                result["errors"] += 1
+                result["error_details"]["invalid_document"] = result["error_details"].get("invalid_document", 0) + 1
+                if verbose:
+                    print(f"      ❌ Offre invalide {offer.get('id')}: {e}")
+                continue
+            if hashes is not None and hashes.get(row["id"]) == row["content_hash"]:
+                result["unchanged"] += 1
+                continue
+            batch.append(row)
+            if len(batch) >= (batch_size or 1000):
+                flush()
+        if batch:
+            flush()
+
+        self.query_cache.invalidate(self.index_name)
+        result["chunk_bytes"] = chunk_bytes
+        return result
+
+    def search(self, query: Dict[str, Any], size: int = 10) -> Dict[str, Any]:
+        """
+        Effectue une recherche (requête DSL Elasticsearch interprétée en SQL).
+
+        Args:
+            query: Requête Elasticsearch DSL (sous-ensemble décrit en tête du module)
+            size: Nombre de résultats à retourner
+
+        Returns:
+            Résultats au format de réponse Elasticsearch (éventuellement servis
+            depuis le cache local, à ne pas modifier)
+        """
+        if "size" not in query:
+            query["size"] = size
+        key = QueryCache.key(self.index_name, query) if self.query_cache.enabled else None
+        result = self.query_cache.get(key) if key else None
+        if result is None:
+            try:
+                with self._lock:
+                    result = self._search(query)
+            except Exception as e:
+                print(f"❌ Erreur lors de la recherche: {e}")
+                raise
+            if key:
+                self.query_cache.put(key, result)
+        return result
+
+    def _search(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        translator = _Translator(self.index_name)
+        where = translator.clause(body.get("query"))
+        score = translator.score()
+        params = translator.params
+        table = f"{self.index_name} AS o"
+
+        total = self.conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}", params).fetchone()[0]
+        response: Dict[str, Any] = {
+            "hits": {"total": {"value": total, "relation": "eq"}, "max_score": None, "hits": []}
+        }
+
+        size = int(body.get("size", 10))
+        if size > 0:
+            keys = self._sort_keys(body.get("sort"), score)
+            page_where = where
+            if body.get("search_after") is not None:
+                page_where = f"({where}) AND ({self._after(translator, keys, body['search_after'])})"
+            if keys:
+                order = ", ".join(f"{expr} IS NULL, {expr} {'DESC' if desc else 'ASC'}" for expr, desc in keys)
+            else:
+                order = f"{score} DESC, o.seq" if translator.scores else "o.seq"
+            sort_columns = "".join(f", {expr}" for expr, _ in keys)
+            with_scores, source = translator.scored_source()
+            rows = self.conn.execute(
+                f"{with_scores}SELECT o.id, o.doc, {score}{sort_columns} FROM {source} WHERE {page_where} "
+                f"ORDER BY {order} LIMIT {size} OFFSET {int(body.get('from', 0))}",
+                translator.params
+            ).fetchall()
+            response["hits"]["hits"] = [self._hit(row, keys, body.get("_source", True)) for row in rows]
+            if rows and not keys:
+                response["hits"]["max_score"] = max(row[2] for row in rows)
+
+        if body.get("aggs") or body.get("aggregations"):
+            response["aggregations"] = self._aggregate(
+                body.get("aggs") or body["aggregations"], where, translator
+            )
+        return response
+
+    @staticmethod
+    def _sort_keys(sort: Any, score: str) -> List[Tuple[str, bool]]:
+        """(expression SQL, décroissant) par critère de tri ; valeurs manquantes en dernier."""
+        keys = []
+        for item in _listify(sort):
+            if isinstance(item, str):
+                name, order = item, "desc" if item == "_score" else "asc"
+            else:
+                name, options = next(iter(item.items()))
+                order = options if isinstance(options, str) else options.get("order", "asc")
+            expression = score if name == "_score" else _Translator.field(name)
+            keys.append((expression, order == "desc"))
+        return keys
+
+    @staticmethod
+    def _after(translator: _Translator, keys: List[Tuple[str, bool]], values: List[Any]) -> str:
+        """Condition "strictement après `values`" dans l'ordre de tri (pagination search_after)."""
+        if len(values) != len(keys):
+            raise ValueError("search_after doit contenir une valeur par critère de tri")
+        alternatives = []
+        for i, ((expression, desc), value) in enumerate(zip(keys, values)):
+            if value is None:
+                # Valeurs manquantes triées en dernier : rien après sur ce critère
+                continue
+            placeholder = translator.param(value)
+            equal = [f"{e} IS {translator.param(v)}" for (e, _), v in zip(keys[:i], values[:i])]
+            after = f"({expression} {'<' if desc else '>'} {placeholder} OR {expression} IS NULL)"
+            alternatives.append(" AND ".join(equal + [after]))
+        return " OR ".join(f"({a})" for a in alternatives) or "0"
+
+    def _hit(self, row: Tuple[Any, ...], keys: List[Tuple[str, bool]], source: Any) -> Dict[str, Any]:
+        doc = json.loads(row[1])
+        if source is False:
+            doc = None
+        elif source is not True:
+            includes = source.get("includes") if isinstance(source, dict) else _listify(source)
+            excludes = set(source.get("excludes", [])) if isinstance(source, dict) else set()
+            doc = {k: v for k, v in doc.items() if (not includes or k in includes) and k not in excludes}
+        hit: Dict[str, Any] = {"_index": self.index_name, "_id": row[0], "_score": None if keys else row[2]}
+        if doc is not None:
+            hit["_source"] = doc
+        if keys:
+            hit["sort"] = list(row[3:])
+        return hit
+
+    def _aggregate(self, aggs: Dict[str, Any], where: str, translator: _Translator) -> Dict[str, Any]:
+        results = {}
+        for name, spec in aggs.items():
+            kind = next(k for k in spec if k not in ("aggs", "aggregations", "meta"))
+            options = spec[kind]
+            sub = spec.get("aggs") or spec.get("aggregations") or {}
+            if kind == "terms":
+                results[name] = self._terms(options, sub, where, translator)
+            elif kind == "date_histogram":
+                results[name] = self._date_histogram(options, sub, where, translator)
+            elif kind in _METRICS:
+                results[name] = self._metric(kind, options, where, translator)
+            else:
+                raise UnsupportedQuery(f"Agrégation non supportée par le stockage SQLite: {kind}")
+        return results
+
+    def _terms(self, options: Dict[str, Any], sub: Dict[str, Any], where: str, translator: _Translator) -> Dict[str, Any]:
+        field = options["field"]
+        if field in ARRAY_FIELDS:
+            source, key = f"{self.index_name} AS o, json_each(o.doc, '$.{field}') AS j", "j.value"
+        else:
+            source, key = f"{self.index_name} AS o", translator.field(field)
+        order_spec = options.get("order", {"_count": "desc"})
+        order_by, direction = next(iter(order_spec.items())) if isinstance(order_spec, dict) else ("_count", "desc")
+        order = f"n {direction.upper()}, k" if order_by == "_count" else f"k {direction.upper()}"
+        rows = self.conn.execute(
+            f"SELECT {key} AS k, COUNT(*) AS n FROM {source} WHERE ({where}) AND {key} IS NOT NULL "
+            f"GROUP BY k ORDER BY {order} LIMIT {int(options.get('size', 10))}",
+            translator.params
+        ).fetchall()
+        with_value = self.conn.execute(
+            f"SELECT COUNT(*) FROM {source} WHERE ({where}) AND {key} IS NOT NULL", translator.params
+        ).fetchone()[0]
+        buckets = []
+        for value, count in rows:
+            bucket: Dict[str, Any] = {"key": value, "doc_count": count}
+            if sub:
+                bucket.update(self._aggregate(sub, f"({where}) AND {translator.terms(field, [value])}", translator))
+            buckets.append(bucket)
+        return {
+            "doc_count_error_upper_bound": 0,
+            "sum_other_doc_count": with_value - sum(count for _, count in rows),
+            "buckets": buckets,
+        }
+
+    def _date_histogram(self, options: Dict[str, Any], sub: Dict[str, Any], where: str, translator: _Translator) -> Dict[str, Any]:
+        interval = options.get("calendar_interval") or options.get("interval")
+        if options["field"] != "published_at" or interval not in _INTERVALS:
+            raise UnsupportedQuery("date_histogram supporté sur published_at par jour, mois ou année uniquement")
+        key = f"substr(o.published_at, 1, {_INTERVALS[interval]})"
+        rows = self.conn.execute(
+            f"SELECT {key} AS k, COUNT(*) FROM {self.index_name} AS o WHERE ({where}) AND k IS NOT NULL "
+            "GROUP BY k ORDER BY k",
+            translator.params
+        ).fetchall()
+        buckets = []
+        for value, count in rows:
+            day = (value + "-01-01")[:10]
+            bucket: Dict[str, Any] = {
+                "key_as_string": day,
+                "key": int(datetime.fromisoformat(day).replace(tzinfo=timezone.utc).timestamp() * 1000),
+                "doc_count": count,
+            }
+            if sub:
+                bucket.update(self._aggregate(sub, f"({where}) AND {key} = {translator.param(value)}", translator))
+            buckets.append(bucket)
+        return {"buckets": buckets}
+
+    def _metric(self, kind: str, options: Dict[str, Any], where: str, translator: _Translator) -> Dict[str, Any]:
+        expression = translator.field(options["field"])
+        table = f"{self.index_name} AS o"
+
+        def scalar(function: str) -> Any:
+            return self.conn.execute(f"SELECT {function} FROM {table} WHERE {where}", translator.params).fetchone()[0]
+
+        if kind == "stats":
+            count, low, high, avg, total = self.conn.execute(
+                f"SELECT COUNT({expression}), MIN({expression}), MAX({expression}), AVG({expression}), "
+                f"TOTAL({expression}) FROM {table} WHERE {where}",
+                translator.params
+            ).fetchone()
+            return {"count": count, "min": low, "max": high, "avg": avg, "sum": total}
+        if kind in ("percentiles", "percentile_ranks"):
+            values = [row[0] for row in self.conn.execute(
+                f"SELECT {expression} AS v FROM {table} WHERE ({where}) AND v IS NOT NULL ORDER BY v",
+                translator.params
+            )]
+            if kind == "percentiles":
+                percents = options.get("percents", [1, 5, 25, 50, 75, 95, 99])
+                return {"values": {str(float(p)): _percentile(values, p) for p in percents}}
+            return {"values": {
+                str(float(v)): (bisect_right(values, v) / len(values) * 100 if values else None)
+                for v in options["values"]
+            }}
+        function = {
+            "avg": f"AVG({expression})",
+            "sum": f"TOTAL({expression})",
+            "min": f"MIN({expression})",
+            "max": f"MAX({expression})",
+            "value_count": f"COUNT({expression})",
+            "cardinality": f"COUNT(DISTINCT {expression})",
+        }[kind]
+        return {"value": scalar(function)}
+
+    def iter_documents(self) -> Iterator[Dict[str, Any]]:
+        """Parcourt tous les documents stockés (ordre d'insertion)."""
+        with self._lock:
+            rows = self.conn.execute(f"SELECT doc FROM {self.index_name} ORDER BY seq").fetchall()
+        for (doc,) in rows:
+            yield json.loads(doc)
+
+    def count(self) -> int:
+        """
+        Compte le nombre de documents dans la table.
+
+        Returns:
+            Nombre de documents
+        """
+        try:
+            with self._lock:
+                return self.conn.execute(f"SELECT COUNT(*) FROM {self.index_name}").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def delete_index(self, hashes: Optional[ContentHashStore] = None) -> bool:
+        """
+        Supprime la table des offres et son index plein texte.
+
+        Args:
+            hashes: Empreintes du sidecar, vidées avec la table (à sauvegarder par l'appelant)
+
+        Returns:
+            True si la suppression a réussi
+        """
+        with self._lock:
+            if not self._exists():
+                return False
+            with self.conn:
+                self.conn.execute(f"DROP TABLE IF EXISTS {self.index_name}_fts")
+                self.conn.execute(f"DROP TABLE {self.index_name}")
+        self.query_cache.invalidate(self.index_name)
+        if hashes is not None:
+            hashes.clear()
+        print(f"✓ Table '{self.index_name}' supprimée")
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retourne des statistiques sur la base.
+
+        Returns:
+            Dictionnaire de statistiques
+        """
+        with self._lock:
+            page_count = self.conn.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self.conn.execute("PRAGMA page_size").fetchone()[0]
+        return {
+            "total_documents": self.count(),
+            "size_in_bytes": page_count * page_size,
+            "index_name": self.index_name,
+            "query_cache": self.query_cache.stats()
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
@@ -5,11 +5,20 @@ Analyse interactive d'un champ au choix dans les offres normalisées France Trav
 Ce script affiche un menu interactif permettant de choisir un champ à analyser.
 """
 
+import sys
 import json
 from pathlib import Path
-from collections import Counter
 from typing import Dict, List, Any, Optional
 
+# Ajouter la racine du projet au PYTHONPATH
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import numpy as np
+
+from pipelines.analytics import OfferTable
+
 
 def load_offers(file_path: Path) -> List[Dict[str, Any]]:
     """Charge les offres depuis un fichier JSONL."""
@@ -38,6 +47,7 @@ def get_available_fields() -> List[tuple[int, str, str]]:
         ("location_department", "Département"),
         ("location_region", "Région"),
         ("location_commune_code", "Code INSEE commune"),
+        ("location_postal_code", "Code postal"),
         ("contract_type", "Type de contrat"),
         ("contract_duration", "Durée du contrat"),
         ("contract_nature", "Nature du contrat"),
@@ -107,37 +117,19 @@ def analyze_field(data_dir: Path, field_name: str, field_description: str) -> No
     print(f"   Description: {field_description}")
     print(f"{'=' * 70}\n")
     
-    # Collecte des données avec déduplication
-    all_offers_by_id = {}
-    total_raw_offers = 0
-    
-    for file_path in jsonl_files:
-        offers = load_offers(file_path)
-        total_raw_offers += len(offers)
-        
-        for offer in offers:
-            offer_id = offer.get('id')
-            if offer_id:
-                all_offers_by_id[offer_id] = offer
-    
-    # Analyse du champ sur les offres dédupliquées
-    field_values = []
-    null_count = 0
-    
-    for offer in all_offers_by_id.values():
-        value = get_field_value(offer, field_name)
-        
-        if value is not None and value != "" and value != []:
-            field_values.append(str(value))
-        else:
-            null_count += 1
+    # Collecte des données avec déduplication : le champ est encodé en codes
+    # entiers (dictionnaire partagé) au fil de la lecture, sans garder les offres
+    table = OfferTable.from_jsonl_files(jsonl_files, fields=[field_name], value_getter=get_field_value)
+    column = table.columns[field_name]
+    counts = column.counts()
     
     # Statistiques
-    total_unique_offers = len(all_offers_by_id)
-    total_duplicates = total_raw_offers - total_unique_offers
-    values_with_data = len(field_values)
-    unique_values = len(set(field_values))
-    value_counter = Counter(field_values)
+    total_raw_offers = table.total_raw
+    total_unique_offers = len(table)
+    total_duplicates = table.duplicates
+    null_count = column.null_count()
+    values_with_data = total_unique_offers - null_count
+    unique_values = int((counts > 0).sum())
     
     print(f"📊 Statistiques globales:\n")
     print(f"   Total offres (brutes): {total_raw_offers}")
@@ -148,13 +140,13 @@ def analyze_field(data_dir: Path, field_name: str, field_description: str) -> No
     print(f"   Taux de remplissage: {values_with_data/total_unique_offers*100:.1f}%")
     print(f"   Valeurs uniques: {unique_values}")
     
-    if not field_values:
+    if not values_with_data:
         print(f"\n⚠️  Aucune valeur trouvée pour le champ '{field_name}'")
         return
     
     # Top valeurs
     print(f"\n📈 Top 20 des valeurs les plus fréquentes:\n")
-    for i, (value, count) in enumerate(value_counter.most_common(20), 1):
+    for i, (value, count) in enumerate(column.value_counts(top=20), 1):
         percentage = (count / values_with_data) * 100
         # Tronquer les valeurs trop longues
         display_value = value[:60] + "..." if len(value) > 60 else value
@@ -162,13 +154,13 @@ def analyze_field(data_dir: Path, field_name: str, field_description: str) -> No
         print(f"       {count} offres ({percentage:.1f}%)")
     
     # Valeurs rares
-    rare_values = [val for val, count in value_counter.items() if count <= 2]
+    rare_codes = np.flatnonzero((counts > 0) & (counts <= 2))
+    rare_values = sorted((column.categories[code], int(counts[code])) for code in rare_codes)
     if rare_values:
         print(f"\n📉 Valeurs rares (≤ 2 offres):\n")
         print(f"   Nombre: {len(rare_values)}")
         print(f"\n   Exemples:")
-        for val in sorted(rare_values)[:10]:
-            count = value_counter[val]
+        for val, count in rare_values[:10]:
             display_val = val[:50] + "..." if len(val) > 50 else val
             print(f"      • {display_val} ({count} offre{'s' if count > 1 else ''})")
         if len(rare_values) > 10:
@@ -177,12 +169,15 @@ def analyze_field(data_dir: Path, field_name: str, field_description: str) -> No
     # Distribution pour les champs numériques
     if field_name in ['weekly_hours', 'positions_count', 'salary_min', 'salary_max']:
         try:
-            numeric_values = [float(v) for v in field_values if v]
-            if numeric_values:
+            # Statistiques pondérées par le nombre d'offres de chaque valeur distincte
+            present = counts > 0
+            numeric_values = np.array(column.categories, dtype=float)[present]
+            weights = counts[present]
+            if numeric_values.size:
                 print(f"\n📊 Statistiques numériques:\n")
-                print(f"   Minimum: {min(numeric_values)}")
-                print(f"   Maximum: {max(numeric_values)}")
-                print(f"   Moyenne: {sum(numeric_values)/len(numeric_values):.2f}")
+                print(f"   Minimum: {numeric_values.min()}")
+                print(f"   Maximum: {numeric_values.max()}")
+                print(f"   Moyenne: {np.average(numeric_values, weights=weights):.2f}")
         except (ValueError, TypeError):
             pass
     
@@ -125,7 +125,7 @@ def example_3_geographic_distribution():
     # Grouper par département
     by_dept = {}
     for offer in with_gps:
-        dept = offer.location_department[:2] if offer.location_department else "??"
+        dept = offer.location_department or "??"
         if dept not in by_dept:
             by_dept[dept] = {"lats": [], "lons": [], "count": 0}
         
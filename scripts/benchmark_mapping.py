@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Benchmark de latence des requêtes : mapping optimisé vs mapping d'origine.
+
+Deux index temporaires sont créés avec les mêmes offres :
+- "baseline"  : mapping d'origine (nested non typés, pas
+                d'eager_global_ordinals, norms/doc_values par défaut) ;
+- "optimized" : mapping courant de ElasticsearchClient.index_definition().
+
+Les deux index sont fusionnés en un segment, puis chaque requête du jeu de
+test est exécutée plusieurs fois (cache de requêtes désactivé). Le script
+affiche la latence médiane et p95 (`took` côté serveur) et le gain.
+
+Usage:
+    python scripts/benchmark_mapping.py
+    python scripts/benchmark_mapping.py --limit 20000 --repeat 50 --keep
+"""
+
+import sys
+import copy
+import time
+import argparse
+import statistics
+from pathlib import Path
+from typing import Any, Dict, List
+from dotenv import load_dotenv
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipelines.storage.elasticsearch import ElasticsearchClient
+from index_to_elasticsearch import get_normalized_files, iter_jsonl_file
+
+
+def baseline_definition(definition: Dict[str, Any]) -> Dict[str, Any]:
+    """Mapping d'origine reconstruit à partir du mapping optimisé."""
+    baseline = copy.deepcopy(definition)
+    
+    def strip(properties: Dict[str, Any]) -> None:
+        for name, field in properties.items():
+            for option in ("eager_global_ordinals", "norms", "doc_values"):
+                field.pop(option, None)
+            if field.get("type") == "nested":
+                properties[name] = {"type": "nested"}
+            elif "properties" in field:
+                strip(field["properties"])
+    
+    strip(baseline["mappings"]["properties"])
+    return baseline
+
+
+def benchmark_queries() -> Dict[str, Dict[str, Any]]:
+    """Jeu de requêtes représentatif des dashboards et de l'API."""
+    return {
+        "offres récentes (tri date)": {
+            "size": 20,
+            "track_total_hits": False,
+            "sort": [{"published_at": "desc"}],
+            "query": {"range": {"published_at": {"gte": "now-30d"}}}
+        },
+        "top compétences": {
+            "size": 0,
+            "aggs": {"skills": {"terms": {"field": "skills", "size": 50}}}
+        },
+        "ROME x ville": {
+            "size": 0,
+            "aggs": {
+                "rome": {
+                    "terms": {"field": "rome_code", "size": 20},
+                    "aggs": {"cities": {"terms": {"field": "location_city", "size": 10}}}
+                }
+            }
+        },
+        "compétence exigée (nested)": {
+            "size": 10,
+            "query": {
+                "nested": {
+                    "path": "skills_required",
+                    "query": {
+                        "bool": {
+                            "must": [{"match": {"skills_required.label": "python"}}],
+                            # match et non term : `level` est un keyword dans le mapping
+                            # optimisé mais un text analysé ("e") dans le baseline
+                            "filter": [{"match": {"skills_required.level": "E"}}]
+                        }
+                    }
+                }
+            }
+        },
+        "histogramme mensuel": {
+            "size": 0,
+            "aggs": {"months": {"date_histogram": {"field": "published_at", "calendar_interval": "month"}}}
+        },
+    }
+
+
+def load_index(es_client: ElasticsearchClient, index: str, definition: Dict[str, Any], offers: List[Dict[str, Any]]) -> float:
+    """Crée et remplit un index temporaire, retourne la durée d'indexation (s)."""
+    if es_client.client.indices.exists(index=index):
+        es_client.client.indices.delete(index=index)
+    es_client.client.indices.create(index=index, body=definition)
+    target = es_client.with_index(index)
+    started = time.perf_counter()
+    with target.bulk_load(forcemerge_segments=1):
+        target.bulk_index_offers(offers)
+    return time.perf_counter() - started
+
+
+def run_query(es_client: ElasticsearchClient, index: str, body: Dict[str, Any], repeat: int) -> List[int]:
+    """Exécute une requête `repeat` fois, retourne les durées serveur (ms)."""
+    # Première exécution hors mesure (chargement des structures à froid)
+    es_client.client.search(index=index, body=body, request_cache=False)
+    return [
+        es_client.client.search(index=index, body=body, request_cache=False)["took"]
+        for _ in range(repeat)
+    ]
+
+
+def p95(values: List[int]) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+def main():
+    """Point d'entrée principal du script."""
+    parser = argparse.ArgumentParser(description="Compare la latence des requêtes entre deux mappings")
+    parser.add_argument("--source", type=str, default="francetravail", help="Source des données")
+    parser.add_argument("--data-dir", type=Path, default=Path("./data"), help="Répertoire racine des données")
+    parser.add_argument("--limit", type=int, default=None, help="Nombre maximal d'offres chargées")
+    parser.add_argument("--repeat", type=int, default=30, help="Exécutions par requête (défaut: 30)")
+    parser.add_argument("--keep", action="store_true", help="Conserve les index temporaires")
+    args = parser.parse_args()
+    
+    env_path = Path(__file__).parent.parent / "config" / ".env"
+    if env_path.exists():
+        load_dotenv(env_path)
+    
+    try:
+        es_client = ElasticsearchClient()
+    except Exception as e:
+        print(f"❌ Impossible de se connecter à Elasticsearch: {e}")
+        sys.exit(1)
+    
+    files = get_normalized_files(args.source, args.data_dir)
+    if not files:
+        sys.exit(1)
+    offers: Dict[str, Dict[str, Any]] = {}
+    for file_path in files:
+        for offer in iter_jsonl_file(file_path):
+            offers[offer["id"]] = offer
+            if args.limit and len(offers) >= args.limit:
+                break
+        if args.limit and len(offers) >= args.limit:
+            break
+    sample = list(offers.values())
+    print(f"✓ {len(sample):,} offres chargées depuis {len(files)} fichier(s)")
+    
+    definition = es_client.index_definition()
+    variants = {
+        "baseline": (f"{es_client.index_name}-bench-baseline", baseline_definition(definition)),
+        "optimized": (f"{es_client.index_name}-bench-optimized", definition),
+    }
+    
+    print(f"\n🚀 Indexation des deux variantes...")
+    for label, (index, index_definition) in variants.items():
+        seconds = load_index(es_client, index, index_definition, sample)
+        print(f"   {label:<10} : {seconds:.1f}s")
+    
+    print(f"\n⏱️  Latence serveur ({args.repeat} exécutions, médiane / p95 en ms) :")
+    print(f"   {'Requête':<30} {'baseline':>15} {'optimized':>15} {'gain':>8}")
+    for name, body in benchmark_queries().items():
+        if "query" in body:
+            # Une comparaison n'a de sens que si les deux index renvoient les mêmes offres
+            counts = {label: es_client.client.count(index=index, query=body["query"])["count"] for label, (index, _) in variants.items()}
+            if counts["baseline"] != counts["optimized"]:
+                print(f"   ⚠️  {name} : {counts['baseline']:,} résultats (baseline) vs {counts['optimized']:,} (optimized)")
+        timings = {label: run_query(es_client, index, body, args.repeat) for label, (index, _) in variants.items()}
+        base, opt = statistics.median(timings["baseline"]), statistics.median(timings["optimized"])
+        gain = (1 - opt / base) * 100 if base else 0.0
+        print(f"   {name:<30} {base:>7.1f} / {p95(timings['baseline']):>5.0f} "
+              f"{opt:>7.1f} / {p95(timings['optimized']):>5.0f} {gain:>7.0f}%")
+    
+    if not args.keep:
+        for index, _ in variants.values():
+            es_client.client.indices.delete(index=index)
+        print(f"\n🗑  Index temporaires supprimés")
+
+
+if __name__ == "__main__":
+    main()
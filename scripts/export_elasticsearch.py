@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Export du contenu de l'index Elasticsearch vers un fichier JSONL ou Parquet.
+
+L'index est parcouru avec un point-in-time (vue figée pendant l'export) et
+search_after, en tranches parallèles : sauvegardes, analyses hors ligne de ce
+qui est réellement indexé, migrations entre versions d'index.
+
+Usage:
+    python scripts/export_elasticsearch.py --output data/exports/jobmarket_v3.jsonl
+    python scripts/export_elasticsearch.py --output data/exports/offres.parquet --slices 4
+    python scripts/export_elasticsearch.py --output data/exports/cdi.jsonl --query '{"term": {"contract_type": "CDI"}}'
+    python scripts/export_elasticsearch.py --output data/exports/titres.parquet --fields id,title,published_at
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator
+from dotenv import load_dotenv
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipelines.storage.elasticsearch import ElasticsearchClient
+from pipelines.storage.export import export_jsonl, export_parquet
+
+
+def with_progress(docs: Iterable[Dict[str, Any]], every: int = 50_000) -> Iterator[Dict[str, Any]]:
+    """Affiche la progression de l'export tous les `every` documents."""
+    started = time.perf_counter()
+    for count, doc in enumerate(docs, 1):
+        if count % every == 0:
+            elapsed = time.perf_counter() - started
+            print(f"   → {count:,} documents ({count / elapsed:,.0f} docs/s)")
+        yield doc
+
+
+def main():
+    """Point d'entrée principal du script."""
+    parser = argparse.ArgumentParser(description="Exporte les documents de l'index Elasticsearch")
+    parser.add_argument("--output", type=Path, required=True, help="Fichier de sortie (.jsonl ou .parquet)")
+    parser.add_argument(
+        "--format",
+        choices=["jsonl", "parquet"],
+        help="Format de sortie (défaut: d'après l'extension du fichier)"
+    )
+    parser.add_argument("--index", type=str, help="Index ou alias à exporter (défaut: ES_INDEX)")
+    parser.add_argument("--query", type=str, help="Clause \"query\" DSL en JSON (défaut: tous les documents)")
+    parser.add_argument("--fields", type=str, help="Champs exportés, séparés par des virgules (défaut: tous)")
+    parser.add_argument("--slices", type=int, default=2, help="Tranches lues en parallèle (défaut: 2)")
+    parser.add_argument("--page-size", type=int, default=1000, help="Documents par requête (défaut: 1000)")
+    args = parser.parse_args()
+
+    output_format = args.format or ("parquet" if args.output.suffix == ".parquet" else "jsonl")
+    query = json.loads(args.query) if args.query else None
+    fields = [f.strip() for f in args.fields.split(",") if f.strip()] if args.fields else None
+
+    env_path = Path(__file__).parent.parent / "config" / ".env"
+    if env_path.exists():
+        load_dotenv(env_path)
+
+    try:
+        print("🔌 Connexion à Elasticsearch...")
+        es_client = ElasticsearchClient(index_name=args.index, connections_per_node=max(10, args.slices))
+    except Exception as e:
+        print(f"\n❌ Impossible de se connecter à Elasticsearch: {e}")
+        sys.exit(1)
+
+    print(f"\n📤 Export de '{es_client.index_name}' vers {args.output} ({output_format}, {args.slices} tranche(s))")
+    started = time.perf_counter()
+    docs = with_progress(es_client.iter_all(query, fields, page_size=args.page_size, slices=args.slices))
+    if output_format == "parquet":
+        properties = es_client.index_definition()["mappings"]["properties"]
+        count = export_parquet(docs, args.output, properties, fields)
+    else:
+        count = export_jsonl(docs, args.output)
+    elapsed = time.perf_counter() - started
+
+    size_mb = args.output.stat().st_size / 1024 / 1024
+    print(f"\n✅ {count:,} documents exportés en {elapsed:.1f}s ({size_mb:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
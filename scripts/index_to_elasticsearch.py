@@ -6,20 +6,38 @@ Usage:
     python scripts/index_to_elasticsearch.py --source francetravail
     python scripts/index_to_elasticsearch.py --source francetravail --file offers_kw_data_engineer.jsonl
     python scripts/index_to_elasticsearch.py --source francetravail --force
+    python scripts/index_to_elasticsearch.py --source francetravail --force --forcemerge 1
+    python scripts/index_to_elasticsearch.py --source francetravail --workers 4
+    python scripts/index_to_elasticsearch.py --source francetravail --chunk-mb 10 --target-latency 2
+    python scripts/index_to_elasticsearch.py --source francetravail --full-scan
+    python scripts/index_to_elasticsearch.py --source francetravail --partitioned
+    python scripts/index_to_elasticsearch.py --source francetravail --no-rollup
+    STORAGE_BACKEND=sqlite python scripts/index_to_elasticsearch.py --source francetravail
 """
 
 import os
 import sys
 import json
+import hashlib
+import time
 import argparse
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any, Iterator, Optional, Set
 from dotenv import load_dotenv
 
 # Ajouter le répertoire parent au PYTHONPATH
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from pipelines.storage.elasticsearch import ElasticsearchClient
+from pipelines.storage.backends import storage_backend
+from pipelines.storage.content_hashes import ContentHashStore
+from pipelines.storage.rollups import record_days
+
+if TYPE_CHECKING:
+    from pipelines.storage.elasticsearch import ElasticsearchClient
+
+# Taille des blocs (début de fichier, fin de la partie indexée) comparés pour
+# détecter un fichier réécrit plutôt que complété
+LEDGER_SAMPLE_BYTES = 64 * 1024
 
 
 def load_jsonl_file(file_path: Path) -> List[Dict[str, Any]]:
@@ -32,18 +50,96 @@ def load_jsonl_file(file_path: Path) -> List[Dict[str, Any]]:
     Returns:
         Liste d'offres d'emploi
     """
-    offers = []
-    with open(file_path, "r", encoding="utf-8") as f:
-        for line_num, line in enumerate(f, 1):
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                offer = json.loads(line)
-                offers.append(offer)
-            except json.JSONDecodeError as e:
-                print(f"⚠ Erreur ligne {line_num} dans {file_path.name}: {e}")
-    return offers
+    return list(iter_jsonl_file(file_path))
+
+
+def iter_jsonl_file(file_path: Path, start: int = 0, position: Optional[Dict[str, int]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Lit un fichier JSONL offre par offre (mémoire constante).
+    
+    Seules les lignes complètes (terminées par un saut de ligne) sont lues :
+    une ligne en cours d'écriture par le collecteur sera lue au passage suivant.
+    
+    Args:
+        file_path: Chemin vers le fichier JSONL
+        start: Position (octets) de début de lecture, en début de ligne
+        position: Dictionnaire où tenir à jour "offset", la position après
+                  la dernière ligne complète lue
+        
+    Yields:
+        Offres d'emploi
+    """
+    offset = start
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        for line_num, raw_line in enumerate(f, 1):
+            if not raw_line.endswith(b"\n"):
+                break
+            offset += len(raw_line)
+            line = raw_line.decode("utf-8").strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    print(f"⚠ Erreur ligne {line_num} dans {file_path.name}: {e}")
+            if position is not None:
+                position["offset"] = offset
+
+
+def _block_checksum(f, start: int, end: int) -> str:
+    f.seek(start)
+    return hashlib.sha1(f.read(end - start)).hexdigest()
+
+
+def file_fingerprint(file_path: Path, offset: int) -> Dict[str, Any]:
+    """
+    Entrée du registre d'indexation pour un fichier lu jusqu'à `offset`.
+    
+    Returns:
+        Position indexée, inode et empreintes du début du fichier et du bloc
+        précédant la position (un fichier complété garde les mêmes, un fichier
+        réécrit - remplacement atomique, troncature, modification - non)
+    """
+    with open(file_path, "rb") as f:
+        return {
+            "offset": offset,
+            "inode": os.fstat(f.fileno()).st_ino,
+            "head": _block_checksum(f, 0, min(offset, LEDGER_SAMPLE_BYTES)),
+            "tail": _block_checksum(f, max(0, offset - LEDGER_SAMPLE_BYTES), offset),
+        }
+
+
+def resume_offset(file_path: Path, entry: Optional[Dict[str, Any]]) -> int:
+    """
+    Position à partir de laquelle reprendre la lecture d'un fichier.
+    
+    Returns:
+        Position enregistrée si le fichier n'a été que complété depuis,
+        0 s'il est nouveau ou a été réécrit
+    """
+    if not entry:
+        return 0
+    stat = file_path.stat()
+    if stat.st_ino != entry.get("inode") or stat.st_size < entry["offset"]:
+        return 0
+    fingerprint = file_fingerprint(file_path, entry["offset"])
+    if fingerprint["head"] != entry.get("head") or fingerprint["tail"] != entry.get("tail"):
+        return 0
+    return entry["offset"]
+
+
+def load_ledger(ledger_path: Path) -> Dict[str, Dict[str, Any]]:
+    if not ledger_path.exists():
+        return {}
+    try:
+        return json.loads(ledger_path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {}
+
+
+def save_ledger(ledger_path: Path, ledger: Dict[str, Dict[str, Any]]) -> None:
+    ledger_path.parent.mkdir(parents=True, exist_ok=True)
+    ledger_path.write_text(json.dumps(ledger, indent=2, sort_keys=True), encoding="utf-8")
 
 
 def get_normalized_files(source: str, data_dir: Path, specific_file: str = None) -> List[Path]:
@@ -78,10 +174,16 @@ def get_normalized_files(source: str, data_dir: Path, specific_file: str = None)
 
 
 def index_files(
-    es_client: ElasticsearchClient,
+    es_client: "ElasticsearchClient",
     files: List[Path],
-    batch_size: int = 500,
-    verbose: bool = False
+    batch_size: Optional[int] = None,
+    verbose: bool = False,
+    workers: int = 1,
+    chunk_bytes: Optional[int] = None,
+    target_latency: float = 1.0,
+    hashes: Optional[ContentHashStore] = None,
+    ledger: Optional[Dict[str, Dict[str, Any]]] = None,
+    days: Optional[Set[str]] = None
 ) -> Dict[str, int]:
     """
     Indexe tous les fichiers dans Elasticsearch.
@@ -89,43 +191,85 @@ def index_files(
     Args:
         es_client: Client Elasticsearch
         files: Liste des fichiers à indexer
-        batch_size: Taille des batches d'indexation
+        batch_size: Nombre maximal de documents par requête bulk (optionnel)
         verbose: Si True, affiche les détails des erreurs
+        workers: Nombre de requêtes bulk en vol (> 1 : les fichiers sont
+                 enchaînés et leurs chunks répartis sur un pool de threads)
+        chunk_bytes: Taille initiale des requêtes bulk (ajustée selon la latence ;
+                     défaut: celle du client)
+        target_latency: Latence visée par requête bulk (secondes)
+        hashes: Empreintes des offres déjà indexées (seules les offres
+                nouvelles ou modifiées sont envoyées)
+        ledger: Registre {fichier: position indexée} ; seuls les octets ajoutés
+                depuis le passage précédent sont lus, il est mis à jour en place
+        days: Ensemble complété avec les jours de publication des offres lues
+              (jours à recalculer dans l'index de synthèse)
         
     Returns:
         Statistiques d'indexation
     """
+    if workers > 1:
+        return index_files_parallel(
+            es_client, files, batch_size=batch_size, verbose=verbose, workers=workers,
+            chunk_bytes=chunk_bytes, target_latency=target_latency, hashes=hashes, ledger=ledger, days=days
+        )
+    
     total_stats = {
         "total_offers": 0,
         "indexed": 0,
         "duplicates": 0,
         "errors": 0,
+        "unchanged": 0,
         "files_processed": 0,
+        "files_skipped": 0,
+        "rejected": 0,
         "error_details": {}
     }
     
     for file_path in files:
-        print(f"\n📄 Traitement de {file_path.name}...")
-        
-        offers = load_jsonl_file(file_path)
-        if not offers:
-            print(f"⚠ Aucune offre trouvée dans {file_path.name}")
+        start = resume_offset(file_path, ledger.get(file_path.name)) if ledger is not None else 0
+        if start and start == file_path.stat().st_size:
+            total_stats["files_skipped"] += 1
             continue
         
-        print(f"   → {len(offers)} offres chargées")
+        print(f"\n📄 Traitement de {file_path.name}...")
+        if start:
+            print(f"   ↪ Reprise à l'octet {start:,} (données ajoutées uniquement)")
         
-        # Indexer en batch
-        stats = es_client.bulk_index_offers(offers, batch_size=batch_size, verbose=verbose)
+        # Indexer en streaming : le fichier est lu au fil de l'envoi des batches
+        position = {"offset": start}
+        offers = iter_jsonl_file(file_path, start, position)
+        if days is not None:
+            offers = record_days(offers, days)
+        stats = es_client.bulk_index_offers(
+            offers, batch_size=batch_size, verbose=verbose,
+            chunk_bytes=chunk_bytes, target_latency=target_latency, hashes=hashes
+        )
+        # N'avancer la position qu'après une indexation sans erreur
+        if ledger is not None and not stats["errors"]:
+            ledger[file_path.name] = file_fingerprint(file_path, position["offset"])
+        if not stats["total"]:
+            print(f"⚠ Aucune nouvelle offre dans {file_path.name}")
+            continue
         
+        print(f"   → {stats['total']} offres lues")
         if stats['duplicates'] > 0:
             print(f"   ✓ {stats['indexed']} indexées, {stats['duplicates']} doublons, {stats['errors']} erreurs")
         else:
             print(f"   ✓ {stats['indexed']} indexées, {stats['errors']} erreurs")
+        if stats['unchanged'] > 0:
+            print(f"   ↷ {stats['unchanged']} inchangées (non renvoyées)")
+        if stats['rejected'] > 0:
+            print(f"   ⏳ {stats['rejected']} rejets (429) renvoyés, requêtes finales ~{stats['chunk_bytes'] / 1024 / 1024:.1f} MB")
+        # Conserver la taille ajustée pour le fichier suivant
+        chunk_bytes = stats["chunk_bytes"]
         
-        total_stats["total_offers"] += len(offers)
+        total_stats["total_offers"] += stats["total"]
         total_stats["indexed"] += stats["indexed"]
         total_stats["duplicates"] += stats.get("duplicates", 0)
         total_stats["errors"] += stats["errors"]
+        total_stats["unchanged"] += stats["unchanged"]
+        total_stats["rejected"] += stats["rejected"]
         total_stats["files_processed"] += 1
         
         # Accumuler les types d'erreurs
@@ -135,6 +279,117 @@ def index_files(
     return total_stats
 
 
+def index_files_parallel(
+    es_client: "ElasticsearchClient",
+    files: List[Path],
+    batch_size: Optional[int] = None,
+    verbose: bool = False,
+    workers: int = 4,
+    chunk_bytes: Optional[int] = None,
+    target_latency: float = 1.0,
+    hashes: Optional[ContentHashStore] = None,
+    ledger: Optional[Dict[str, Dict[str, Any]]] = None,
+    days: Optional[Set[str]] = None
+) -> Dict[str, int]:
+    """
+    Indexe tous les fichiers avec plusieurs requêtes bulk en parallèle.
+    
+    Les fichiers sont lus à la suite en streaming ; les chunks de tous les
+    fichiers sont répartis sur `workers` threads. Affiche le débit et la
+    latence moyenne de chaque worker.
+    
+    Returns:
+        Statistiques d'indexation
+    """
+    files_processed = 0
+    files_skipped = 0
+    positions: Dict[str, Dict[str, int]] = {}
+    
+    def all_offers() -> Iterator[Dict[str, Any]]:
+        nonlocal files_processed, files_skipped
+        for file_path in files:
+            start = resume_offset(file_path, ledger.get(file_path.name)) if ledger is not None else 0
+            if start and start == file_path.stat().st_size:
+                files_skipped += 1
+                continue
+            print(f"📄 Lecture de {file_path.name}" + (f" à partir de l'octet {start:,}..." if start else "..."))
+            positions[file_path.name] = {"offset": start}
+            offers = iter_jsonl_file(file_path, start, positions[file_path.name])
+            yield from (record_days(offers, days) if days is not None else offers)
+            files_processed += 1
+    
+    started = time.perf_counter()
+    stats = es_client.parallel_bulk_index_offers(
+        all_offers(), workers=workers, batch_size=batch_size, verbose=verbose,
+        chunk_bytes=chunk_bytes, target_latency=target_latency, hashes=hashes
+    )
+    elapsed = time.perf_counter() - started
+    
+    print(f"\n⚙️  Débit par worker ({workers} threads, {elapsed:.1f}s au total) :")
+    for name, worker in stats["workers"].items():
+        print(f"   {name:<12} : {worker['chunks']:4d} requêtes, {worker['docs']:,} docs, "
+              f"{worker['docs_per_s']:,.0f} docs/s, latence moy. {worker['avg_latency_ms']:.0f} ms")
+    if elapsed > 0:
+        print(f"   Débit global : {stats['total'] / elapsed:,.0f} docs/s")
+    print(f"   Taille finale des requêtes : ~{stats['chunk_bytes'] / 1024 / 1024:.1f} MB")
+    
+    # Erreurs non attribuables à un fichier : positions avancées seulement si aucune
+    if ledger is not None and not stats["errors"]:
+        for file_path in files:
+            if file_path.name in positions:
+                ledger[file_path.name] = file_fingerprint(file_path, positions[file_path.name]["offset"])
+    
+    return {
+        "total_offers": stats["total"],
+        "indexed": stats["indexed"],
+        "duplicates": stats["duplicates"],
+        "errors": stats["errors"],
+        "unchanged": stats["unchanged"],
+        "rejected": stats["rejected"],
+        "files_processed": files_processed,
+        "files_skipped": files_skipped,
+        "error_details": stats["error_details"]
+    }
+
+
+def index_to_sqlite(args: argparse.Namespace) -> None:
+    """
+    Indexation dans la base SQLite embarquée (STORAGE_BACKEND=sqlite).
+    
+    Pas de versions d'index, de partitions ni de synthèse quotidienne : la
+    table est mise à jour en place (--force la recrée) et seules les offres
+    nouvelles ou modifiées sont réécrites (empreintes de contenu).
+    """
+    from pipelines.storage.sqlite import SQLiteClient
+    
+    try:
+        client = SQLiteClient()
+    except Exception as e:
+        print(f"\n❌ Impossible d'ouvrir la base SQLite: {e}")
+        sys.exit(1)
+    
+    files = get_normalized_files(args.source, args.data_dir, args.file)
+    if not files:
+        print("❌ Aucun fichier à indexer")
+        sys.exit(1)
+    
+    rebuilt = client.create_index(force=args.force)
+    hashes = ContentHashStore(args.data_dir / "state" / f"sqlite_content_hashes_{client.index_name}.json")
+    if rebuilt or args.resend_all:
+        hashes.clear()
+    
+    print(f"\n🚀 Indexation de {len(files)} fichier(s) dans {client.path}...")
+    started = time.perf_counter()
+    stats = index_files(client, files, batch_size=args.batch_size, verbose=args.verbose, hashes=hashes)
+    hashes.save()
+    
+    index_stats = client.get_stats()
+    print(f"\n✅ {stats['indexed']:,} offres indexées, {stats['unchanged']:,} inchangées, "
+          f"{stats['errors']:,} erreurs en {time.perf_counter() - started:.1f}s")
+    print(f"   Table '{index_stats['index_name']}' : {index_stats['total_documents']:,} documents, "
+          f"{index_stats['size_in_bytes'] / 1024 / 1024:.2f} MB")
+
+
 def main():
     """Point d'entrée principal du script."""
     parser = argparse.ArgumentParser(
@@ -160,13 +415,74 @@ def main():
     parser.add_argument(
         "--force",
         action="store_true",
-        help="Recrée l'index (supprime les données existantes)"
+        help="Reconstruit l'index dans une nouvelle version puis bascule l'alias"
+    )
+    parser.add_argument(
+        "--partitioned",
+        action="store_true",
+        help="Un index par mois de publication (<index>-AAAA.MM), lus via l'alias <index> (incompatible avec --force)"
+    )
+    parser.add_argument(
+        "--min-ratio",
+        type=float,
+        default=0.9,
+        help="Reconstruction : documents minimum, relatifs à la version active (défaut: 0.9)"
+    )
+    parser.add_argument(
+        "--keep-versions",
+        type=int,
+        default=1,
+        help="Reconstruction : anciennes versions conservées pour retour arrière (défaut: 1)"
     )
     parser.add_argument(
         "--batch-size",
         type=int,
-        default=500,
-        help="Taille des batches d'indexation"
+        default=None,
+        help="Nombre maximal de documents par requête bulk (défaut: pas de limite)"
+    )
+    parser.add_argument(
+        "--chunk-mb",
+        type=float,
+        default=None,
+        help="Taille initiale des requêtes bulk en MB, ajustée selon la latence (défaut: 5)"
+    )
+    parser.add_argument(
+        "--target-latency",
+        type=float,
+        default=1.0,
+        help="Latence visée par requête bulk en secondes (défaut: 1.0)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Nombre de requêtes bulk en parallèle (défaut: 1)"
+    )
+    parser.add_argument(
+        "--bulk-load",
+        action="store_true",
+        help="Mode chargement massif (refresh désactivé, 0 réplica) ; activé d'office avec --force"
+    )
+    parser.add_argument(
+        "--forcemerge",
+        type=int,
+        metavar="SEGMENTS",
+        help="Force-merge l'index en fin de chargement massif (ex: 1)"
+    )
+    parser.add_argument(
+        "--resend-all",
+        action="store_true",
+        help="Renvoie toutes les offres, même inchangées (reconstruit les empreintes)"
+    )
+    parser.add_argument(
+        "--full-scan",
+        action="store_true",
+        help="Relit les fichiers en entier (ignore le registre des positions indexées)"
+    )
+    parser.add_argument(
+        "--no-rollup",
+        action="store_true",
+        help="Ne met pas à jour l'index de synthèse quotidienne (<index>_daily)"
     )
     parser.add_argument(
         "--verbose",
@@ -184,22 +500,32 @@ def main():
     else:
         print(f"⚠ Fichier .env non trouvé ({env_path}). Utilisation des valeurs par défaut.")
     
+    if storage_backend() == "sqlite":
+        index_to_sqlite(args)
+        return
+    
+    # Client Elasticsearch importé seulement pour ce stockage
+    from pipelines.storage.elasticsearch import ElasticsearchClient
+    from pipelines.storage.rollups import DailyRollup
+    
     # Initialiser le client Elasticsearch
     try:
         print(f"\n🔌 Connexion à Elasticsearch...")
-        es_client = ElasticsearchClient()
+        es_client = ElasticsearchClient(
+            connections_per_node=max(10, args.workers),
+            partitioning="monthly" if args.partitioned else None
+        )
     except Exception as e:
         print(f"\n❌ Impossible de se connecter à Elasticsearch: {e}")
         print("\nAssurez-vous que Elasticsearch est démarré:")
         print("   docker-compose up -d")
         sys.exit(1)
     
-    # Créer l'index
-    print(f"\n📑 Configuration de l'index...")
-    try:
-        es_client.create_index(force=args.force)
-    except Exception as e:
-        print(f"❌ Erreur lors de la configuration de l'index: {e}")
+    if es_client.partitioning and args.force:
+        # Pas de version reconstruite à basculer : --force viderait seulement
+        # les empreintes et le registre, sans reconstruire les index mensuels
+        print("\n❌ --force n'est pas disponible avec le partitionnement mensuel")
+        print("   Utilisez --resend-all pour renvoyer toutes les offres dans les index mensuels")
         sys.exit(1)
     
     # Récupérer les fichiers à indexer
@@ -212,24 +538,101 @@ def main():
     
     print(f"✓ {len(files)} fichier(s) trouvé(s)")
     
+    # Configurer l'index : une reconstruction se fait dans une nouvelle version
+    # physique, l'alias de lecture continue de servir l'ancienne entre-temps
+    print(f"\n📑 Configuration de l'index...")
+    try:
+        if es_client.partitioning:
+            # Index mensuels créés à la première écriture depuis le template
+            es_client.put_partition_template()
+            rebuild = False
+            target_client = es_client
+        else:
+            rebuild = args.force or not es_client.client.indices.exists(index=es_client.index_name)
+        if rebuild:
+            new_index = es_client.create_versioned_index()
+            target_client = es_client.with_index(new_index)
+        elif not es_client.partitioning:
+            print(f"✓ L'index '{es_client.index_name}' existe déjà")
+            target_client = es_client
+    except Exception as e:
+        print(f"❌ Erreur lors de la configuration de l'index: {e}")
+        sys.exit(1)
+    
+    # Empreintes des offres déjà indexées (sidecar local)
+    hashes = ContentHashStore(args.data_dir / "state" / f"es_content_hashes_{es_client.index_name}.json")
+    # Registre des positions déjà indexées par fichier
+    ledger_path = args.data_dir / "state" / f"es_index_ledger_{es_client.index_name}.json"
+    ledger = load_ledger(ledger_path)
+    resend = rebuild or args.resend_all or args.force
+    if resend or args.full_scan:
+        ledger = {}
+    if resend:
+        hashes.clear()
+    elif not len(hashes) and es_client.count() > 0:
+        print(f"\n🔎 Sidecar d'empreintes absent, lecture depuis l'index...")
+        print(f"✓ {es_client.load_content_hashes(hashes):,} empreintes chargées")
+    
     # Indexer les fichiers
     print(f"\n🚀 Indexation en cours...")
-    stats = index_files(es_client, files, batch_size=args.batch_size, verbose=args.verbose)
+    index_kwargs = dict(
+        batch_size=args.batch_size, verbose=args.verbose, workers=args.workers,
+        chunk_bytes=int(args.chunk_mb * 1024 * 1024) if args.chunk_mb else None, target_latency=args.target_latency,
+        hashes=hashes, ledger=ledger, days=set()
+    )
+    if args.bulk_load or rebuild or args.forcemerge:
+        # Reconstruction complète : réglages d'écriture, un seul refresh à la fin
+        with target_client.bulk_load(forcemerge_segments=args.forcemerge):
+            stats = index_files(target_client, files, **index_kwargs)
+    else:
+        stats = index_files(target_client, files, **index_kwargs)
+        # Forcer le refresh de l'index pour que les stats soient à jour
+        es_client.client.indices.refresh(index=es_client.index_name, ignore_unavailable=True, allow_no_indices=True)
+    
+    if rebuild:
+        # Exposer la nouvelle version seulement si elle est complète
+        valid, reason = es_client.validate_index(new_index, min_ratio=args.min_ratio)
+        if not valid:
+            print(f"\n❌ Nouvelle version rejetée : {reason}")
+            print(f"   L'alias '{es_client.index_name}' reste inchangé, '{new_index}' est supprimé")
+            es_client.client.indices.delete(index=new_index)
+            sys.exit(1)
+        print(f"\n✓ Nouvelle version validée : {reason}")
+        es_client.swap_alias(new_index)
+        es_client.garbage_collect_versions(keep=args.keep_versions, hashes=hashes)
+    
+    if not args.no_rollup:
+        # Seuls les jours des offres lues sont recalculés (tous après une reconstruction)
+        days = None if rebuild else index_kwargs["days"]
+        print(f"\n📅 Mise à jour de la synthèse quotidienne" + (f" ({len(days)} jour(s))..." if days is not None else " (tous les jours)..."))
+        try:
+            rollup = DailyRollup(es_client).update(days)
+            print(f"✓ {rollup['documents']:,} documents de synthèse écrits, {rollup['deleted']:,} obsolètes supprimés")
+        except Exception as e:
+            print(f"⚠ Synthèse quotidienne non mise à jour: {e}")
     
-    # Forcer le refresh de l'index pour que les stats soient à jour
-    es_client.client.indices.refresh(index=es_client.index_name)
+    hashes.save()
+    if not args.file:
+        # Oublier les fichiers disparus
+        ledger = {name: entry for name, entry in ledger.items() if (files[0].parent / name).exists()}
+    save_ledger(ledger_path, ledger)
     
     # Afficher le résumé
     print(f"\n{'='*60}")
     print(f"📊 RÉSUMÉ DE L'INDEXATION")
     print(f"{'='*60}")
     print(f"Fichiers traités    : {stats['files_processed']}")
+    if stats['files_skipped'] > 0:
+        print(f"Fichiers inchangés  : {stats['files_skipped']}")
     print(f"Offres totales      : {stats['total_offers']}")
     print(f"Offres indexées     : {stats['indexed']}")
     print(f"Doublons ignorés    : {stats['duplicates']}")
+    print(f"Offres inchangées   : {stats['unchanged']}")
     print(f"Erreurs             : {stats['errors']}")
+    if stats['rejected'] > 0:
+        print(f"Rejets 429 renvoyés : {stats['rejected']}")
     if stats['total_offers'] > 0:
-        success_rate = (stats['indexed'] / stats['total_offers']) * 100
+        success_rate = ((stats['indexed'] + stats['unchanged']) / stats['total_offers']) * 100
         print(f"Taux de succès      : {success_rate:.1f}%")
     
     # Afficher le détail des types d'erreurs s'il y en a
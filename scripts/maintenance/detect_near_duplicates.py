@@ -0,0 +1,134 @@
+"""
+Script de détection des quasi-doublons (MinHash + LSH) dans les offres normalisées.
+
+Les offres republiées sous un nouvel identifiant ou diffusées par plusieurs
+agences avec une description quasi identique sont regroupées : chaque offre
+reçoit un champ `duplicate_group` (identifiant du premier membre du groupe).
+
+L'index LSH est persisté dans data/state/ (near_duplicates_<source>.json et
+.npz) : une nouvelle exécution ne calcule
+que les signatures des offres nouvelles ou dont le texte a changé et les
+compare aux buckets existants.
+Les fichiers normalisés ne sont réécrits que si un `duplicate_group` change.
+
+Usage:
+    python scripts/maintenance/detect_near_duplicates.py
+    python scripts/maintenance/detect_near_duplicates.py --reset --threshold 0.85
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+# Ajouter le répertoire racine au PYTHONPATH
+root_dir = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_dir))
+
+from pipelines.analytics.near_duplicates import NearDuplicateIndex
+
+
+def iter_offers(file_path: Path):
+    with file_path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def apply_groups(file_path: Path, index: NearDuplicateIndex) -> int:
+    """
+    Renseigne `duplicate_group` dans un fichier normalisé.
+
+    Returns:
+        Nombre d'offres dont le groupe a changé (0 = fichier non réécrit)
+    """
+    offers = list(iter_offers(file_path))
+    changed = 0
+    for offer in offers:
+        group = index.group_of(offer.get("id"))
+        if offer.get("duplicate_group") != group:
+            offer["duplicate_group"] = group
+            changed += 1
+    if not changed:
+        return 0
+
+    tmp_path = file_path.with_suffix(file_path.suffix + ".tmp")
+    with tmp_path.open("w", encoding="utf-8", newline="") as f:
+        for offer in offers:
+            json.dump(offer, f, ensure_ascii=False)
+            f.write("\n")
+    os.replace(tmp_path, file_path)
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Détecte les quasi-doublons d'offres (MinHash + LSH)")
+    parser.add_argument("--source", type=str, default="francetravail", help="Source des données")
+    parser.add_argument("--data-dir", type=Path, default=root_dir / "data", help="Répertoire racine des données")
+    parser.add_argument("--threshold", type=float, default=0.8, help="Similarité minimale (Jaccard estimé)")
+    parser.add_argument("--reset", action="store_true", help="Reconstruit l'index depuis zéro")
+    args = parser.parse_args()
+
+    normalized_dir = args.data_dir / "normalized" / args.source
+    state_path = args.data_dir / "state" / f"near_duplicates_{args.source}.json"
+    legacy_path = state_path.with_suffix(".pkl")
+
+    files = sorted(f for f in normalized_dir.glob("*.jsonl") if f.is_file())
+    if not files:
+        print(f"❌ Aucun fichier JSONL trouvé dans {normalized_dir}")
+        sys.exit(1)
+
+    if state_path.exists() and not args.reset:
+        index = NearDuplicateIndex.load(state_path)
+        index.threshold = args.threshold
+        print(f"✓ Index existant chargé : {len(index):,} offres")
+    else:
+        index = NearDuplicateIndex(threshold=args.threshold)
+        print(f"✓ Nouvel index (seuil {args.threshold})")
+        if legacy_path.exists() and not args.reset:
+            # Ancien état sérialisé par pickle : jamais rechargé, reconstruit une fois
+            print(f"   (ancien état {legacy_path.name} ignoré, index reconstruit)")
+
+    started = time.perf_counter()
+    added = 0
+    for file_path in files:
+        new = index.add(iter_offers(file_path))
+        added += new
+        if new:
+            print(f"   → {file_path.name} : {new:,} offres nouvelles ou modifiées")
+    elapsed = time.perf_counter() - started
+
+    updated = 0
+    for file_path in files:
+        changed = apply_groups(file_path, index)
+        if changed:
+            updated += 1
+            print(f"   ✓ {file_path.name} : {changed:,} groupes mis à jour")
+
+    index.save(state_path)
+    legacy_path.unlink(missing_ok=True)
+
+    clusters = index.clusters()
+    in_clusters = sum(len(c) for c in clusters)
+
+    print(f"\n{'='*60}")
+    print(f"📊 QUASI-DOUBLONS")
+    print(f"{'='*60}")
+    print(f"Offres indexées          : {len(index):,} (+{added:,} en {elapsed:.1f}s)")
+    print(f"Groupes (≥ 2 offres)     : {len(clusters):,}")
+    print(f"Offres dans un groupe    : {in_clusters:,}")
+    print(f"Offres distinctes        : {len(index) - in_clusters + len(clusters):,}")
+    print(f"Fichiers réécrits        : {updated}")
+
+    for cluster in clusters[:5]:
+        print(f"\n   • {len(cluster)} offres : {', '.join(cluster[:5])}{' ...' if len(cluster) > 5 else ''}")
+
+
+if __name__ == "__main__":
+    main()
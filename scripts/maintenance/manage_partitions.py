@@ -0,0 +1,91 @@
+"""
+Gestion des index mensuels Elasticsearch (partitionnement sur published_at).
+
+Les offres sont réparties dans un index par mois de publication
+(`<ES_INDEX>-AAAA.MM`), tous lus via l'alias `<ES_INDEX>`. Ce script :
+
+- template  : crée / met à jour le template des index mensuels ;
+- rollover  : prépare l'index du mois courant et des mois suivants ;
+- retention : supprime les mois trop anciens et fige (écriture bloquée,
+              un seul segment) les mois qui ne reçoivent plus d'offres ; les
+              offres supprimées sont retirées du sidecar d'empreintes de
+              scripts/index_to_elasticsearch.py ;
+- list      : affiche les index mensuels et leur nombre de documents.
+
+Usage:
+    python scripts/maintenance/manage_partitions.py rollover --months-ahead 1
+    python scripts/maintenance/manage_partitions.py retention --keep-months 24 --readonly-after 3
+    python scripts/maintenance/manage_partitions.py list
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Ajouter le répertoire racine au PYTHONPATH
+root_dir = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_dir))
+
+from pipelines.storage.content_hashes import ContentHashStore
+from pipelines.storage.elasticsearch import ElasticsearchClient
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gère les index mensuels Elasticsearch")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("template", help="Crée ou met à jour le template des index mensuels")
+
+    rollover = subparsers.add_parser("rollover", help="Prépare les index des mois à venir")
+    rollover.add_argument("--months-ahead", type=int, default=1, help="Mois suivants à préparer (défaut: 1)")
+
+    retention = subparsers.add_parser("retention", help="Applique la politique de rétention")
+    retention.add_argument("--keep-months", type=int, default=24, help="Mois conservés (défaut: 24)")
+    retention.add_argument("--readonly-after", type=int, default=3, help="Âge (mois) à partir duquel un index est figé (défaut: 3)")
+    retention.add_argument("--data-dir", type=Path, default=Path("./data"), help="Répertoire racine des données (sidecar d'empreintes)")
+
+    subparsers.add_parser("list", help="Liste les index mensuels")
+    args = parser.parse_args()
+
+    env_path = root_dir / "config" / ".env"
+    if env_path.exists():
+        load_dotenv(env_path)
+
+    try:
+        es_client = ElasticsearchClient(partitioning="monthly")
+    except Exception as e:
+        print(f"❌ Impossible de se connecter à Elasticsearch: {e}")
+        sys.exit(1)
+
+    if args.command == "template":
+        es_client.put_partition_template()
+
+    elif args.command == "rollover":
+        created = es_client.rollover_partitions(months_ahead=args.months_ahead)
+        if not created:
+            print("✓ Index des mois à venir déjà prêts")
+
+    elif args.command == "retention":
+        # Même sidecar que scripts/index_to_elasticsearch.py
+        hashes = ContentHashStore(args.data_dir / "state" / f"es_content_hashes_{es_client.index_name}.json")
+        result = es_client.apply_retention(
+            keep_months=args.keep_months, readonly_after_months=args.readonly_after, hashes=hashes
+        )
+        hashes.save()
+        print(f"\n✓ {len(result['deleted'])} index supprimés, {len(result['frozen'])} index figés")
+
+    elif args.command == "list":
+        partitions = es_client.list_partitions()
+        if not partitions:
+            print(f"⚠ Aucun index mensuel '{es_client.index_name}-AAAA.MM'")
+            return
+        print(f"\n📅 Index mensuels de '{es_client.index_name}' :")
+        for name in partitions:
+            count = es_client.client.count(index=name)["count"]
+            print(f"   {name:<30} {count:>10,} offres")
+
+
+if __name__ == "__main__":
+    main()
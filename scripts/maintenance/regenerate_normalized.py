@@ -2,90 +2,464 @@
 Script pour régénérer les fichiers normalisés sans le champ raw.
 Élimine la duplication entre data/raw/ et data/normalized/.
 
+La régénération est incrémentale : chaque offre normalisée porte la version
+du mapping (`mapping_version`) et l'empreinte de son contenu brut (`raw_hash`).
+Seules les offres dont le brut ou le mapping a changé sont re-mappées, et seuls
+les fichiers normalisés affectés sont réécrits.
+
+Avec --workers N, les fichiers raw sont découpés en tranches d'octets (alignées
+sur les fins de ligne) normalisées en parallèle par un pool de processus ; les
+tranches sont réécrites dans l'ordre au fur et à mesure de leur arrivée.
+
 Usage:
     python scripts/maintenance/regenerate_normalized.py
+    python scripts/maintenance/regenerate_normalized.py --full
+    python scripts/maintenance/regenerate_normalized.py --workers 16
 """
+import argparse
+import hashlib
 import json
+import os
 import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
 from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 
 # Ajouter le répertoire racine au PYTHONPATH
 root_dir = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(root_dir))
 
-from pipelines.ingest.normalizer import normalize_offer
+from pipelines.ingest.memo import cache_stats
+from pipelines.ingest.normalizer import mapping_version, normalize_offer, raw_content_hash
+from pipelines.ingest.sources.francetravail.mapping import warm_parser_caches
+
+SOURCE = "francetravail"
+
+# Manifeste par fichier : empreinte du fichier raw + version du mapping appliquée
+MANIFEST_NAME = "_regeneration_manifest.json"
+
+# Taille cible d'une tranche de fichier raw confiée à un worker
+DEFAULT_SHARD_BYTES = 8 * 1024 * 1024
+
+# Empreintes des offres déjà à jour, par fichier raw (posées une fois par
+# processus par _init_worker, et non renvoyées avec chaque tranche)
+_current_hashes: Dict[str, FrozenSet[str]] = {}
+
+
+def file_checksum(path: Path) -> str:
+    """Empreinte SHA-1 du contenu d'un fichier (lecture par blocs)."""
+    digest = hashlib.sha1()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(normalized_dir: Path) -> Dict[str, Dict[str, str]]:
+    manifest_path = normalized_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {}
+    try:
+        return json.loads(manifest_path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {}
+
+
+def save_manifest(normalized_dir: Path, manifest: Dict[str, Dict[str, str]]) -> None:
+    normalized_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = normalized_dir / MANIFEST_NAME
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def read_jsonl(path: Path, label: str = "") -> List[Dict[str, Any]]:
+    """Lit un fichier JSONL en ignorant les lignes invalides."""
+    rows = []
+    with path.open("r", encoding="utf-8") as f:
+        for line_num, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                print(f"   ⚠️  Erreur ligne {line_num}{label}: {e}")
+    return rows
+
+
+def current_raw_hashes(normalized_path: Path, version: str) -> FrozenSet[str]:
+    """Empreintes brutes des offres d'un fichier normalisé déjà mappées avec `version`."""
+    hashes = set()
+    with normalized_path.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # signalée à la relecture par read_jsonl
+            if rec.get("raw_hash") and rec.get("mapping_version") == version:
+                hashes.add(rec["raw_hash"])
+    return frozenset(hashes)
+
+
+def _init_worker(current_hashes: Dict[str, FrozenSet[str]]) -> None:
+    """Initialiseur du pool : empreintes à jour de tous les fichiers à régénérer."""
+    global _current_hashes
+    _current_hashes = current_hashes
+
+
+def compute_shards(path: Path, shard_bytes: int = DEFAULT_SHARD_BYTES) -> List[Tuple[int, int]]:
+    """
+    Découpe un fichier JSONL en plages d'octets [start, end) alignées sur les fins de ligne.
+
+    Returns:
+        Liste ordonnée de plages couvrant tout le fichier
+    """
+    size = path.stat().st_size
+    shards = []
+    start = 0
+    with path.open("rb") as f:
+        while start < size:
+            target = start + shard_bytes
+            if target >= size:
+                end = size
+            else:
+                f.seek(target)
+                f.readline()  # avancer jusqu'à la fin de la ligne courante
+                end = f.tell()
+            shards.append((start, end))
+            start = end
+    return shards
+
+
+def normalize_shard(raw_path: str, start: int, end: int) -> Dict[str, Any]:
+    """
+    Normalise une plage d'octets d'un fichier raw (exécuté dans un worker).
+
+    Les offres dont l'empreinte figure dans les empreintes à jour du fichier
+    (voir _init_worker) ne sont pas re-mappées, seule leur empreinte est renvoyée.
+
+    Returns:
+        Dictionnaire avec les lignes ordonnées [(raw_hash, offre normalisée ou None)],
+        le nombre d'erreurs, les lignes JSON invalides [(ligne dans la tranche,
+        message)], les offres en échec de normalisation [(ligne dans la
+        tranche, id, message)], le nombre de lignes de la tranche et les
+        mesures du worker (pid, offres, secondes)
+    """
+    started = time.perf_counter()
+    current_hashes = _current_hashes.get(Path(raw_path).name, frozenset())
+    with open(raw_path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    raw_offers = []
+    offer_lines = []
+    errors = 0
+    invalid: List[Tuple[int, str]] = []
+    failed: List[Tuple[int, Optional[str], str]] = []
+    for line_num, line in enumerate(data.split(b"\n"), 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            raw_offers.append(json.loads(line))
+            offer_lines.append(line_num)
+        except json.JSONDecodeError as e:
+            errors += 1
+            invalid.append((line_num, str(e)))
+
+    hashes = [raw_content_hash(offer) for offer in raw_offers]
+    stale = [offer for offer, h in zip(raw_offers, hashes) if h not in current_hashes]
+    if stale:
+        warm_parser_caches(stale)
+
+    rows: List[Tuple[str, Optional[Dict[str, Any]]]] = []
+    for offer, raw_hash, line_num in zip(raw_offers, hashes, offer_lines):
+        if raw_hash in current_hashes:
+            rows.append((raw_hash, None))
+            continue
+        try:
+            rows.append((raw_hash, normalize_offer(offer, SOURCE).to_dict()))
+        except Exception as e:
+            errors += 1
+            failed.append((line_num, offer.get("id") if isinstance(offer, dict) else None, str(e)))
+
+    return {
+        "rows": rows,
+        "errors": errors,
+        "invalid": invalid,
+        "failed": failed,
+        "lines": data.count(b"\n"),
+        "pid": os.getpid(),
+        "offers": len(raw_offers),
+        "bytes": end - start,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+class PartitionWriter:
+    """
+    Écrit un fichier normalisé à partir de tranches reçues dans le désordre.
+
+    Les tranches sont écrites dans l'ordre du fichier raw dès que la suivante
+    est disponible ; le fichier final remplace l'ancien uniquement si son
+    contenu a changé.
+    """
+
+    def __init__(self, raw_path: Path, normalized_path: Path, shard_count: int, existing: List[Dict[str, Any]], current_version: str):
+        self.raw_path = raw_path
+        self.normalized_path = normalized_path
+        self.shard_count = shard_count
+        self.existing_hashes = [rec.get("raw_hash") for rec in existing]
+        self.existing_by_hash = {
+            rec["raw_hash"]: rec
+            for rec in existing
+            if rec.get("raw_hash") and rec.get("mapping_version") == current_version
+        }
+        self.existing_by_id = {rec.get("id"): rec for rec in existing}
+        self.stats = {"total": 0, "reused": 0, "remapped": 0, "errors": 0, "rewritten": 0}
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._next = 0
+        self._lines = 0  # lignes du fichier raw avant la prochaine tranche
+        self._written_hashes: List[str] = []
+        self._tmp_path = normalized_path.with_suffix(normalized_path.suffix + ".tmp")
+        self._handle = None
+
+    @property
+    def done(self) -> bool:
+        return self._next == self.shard_count
+
+    def add(self, index: int, result: Dict[str, Any]) -> None:
+        """Reçoit le résultat d'une tranche et écrit toutes les tranches consécutives prêtes."""
+        self._pending[index] = result
+        while self._next in self._pending:
+            self._write(self._pending.pop(self._next))
+            self._next += 1
+
+    def _write(self, result: Dict[str, Any]) -> None:
+        if self._handle is None:
+            self.normalized_path.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = self._tmp_path.open("w", encoding="utf-8", newline="")
+        self.stats["errors"] += result["errors"]
+        for line_num, message in result["invalid"]:
+            print(f"   ⚠️  Erreur ligne {self._lines + line_num} ({self.raw_path.name}): {message}")
+        for line_num, offer_id, message in result["failed"]:
+            print(f"   ⚠️  Erreur de normalisation ligne {self._lines + line_num} "
+                  f"({self.raw_path.name}, offre {offer_id}): {message}")
+        self._lines += result["lines"]
+        for raw_hash, normalized in result["rows"]:
+            self.stats["total"] += 1
+            if normalized is None:
+                normalized = self.existing_by_hash[raw_hash]
+                self.stats["reused"] += 1
+            else:
+                # Conserver la date de collecte d'origine de l'offre
+                previous = self.existing_by_id.get(normalized["id"])
+                if previous and previous.get("collected_at"):
+                    normalized["collected_at"] = previous["collected_at"]
+                self.stats["remapped"] += 1
+            self._written_hashes.append(raw_hash)
+            json.dump(normalized, self._handle, ensure_ascii=False)
+            self._handle.write("\n")
+
+    def finalize(self) -> Dict[str, int]:
+        """Remplace le fichier normalisé si nécessaire et affiche le bilan de la partition."""
+        if self._handle is not None:
+            self._handle.close()
+        print(f"\n🔄 {self.raw_path.name} : {self.stats['reused']} offres à jour, "
+              f"{self.stats['remapped']} re-mappées, {self.stats['errors']} erreurs")
 
+        unchanged = (
+            self.stats["remapped"] == 0
+            and self.normalized_path.exists()
+            and self._written_hashes == self.existing_hashes
+        )
+        if unchanged:
+            self._tmp_path.unlink(missing_ok=True)
+            print(f"   ✓ Fichier normalisé inchangé : {self.normalized_path.name}")
+            return self.stats
+
+        if self._handle is None:
+            self.normalized_path.parent.mkdir(parents=True, exist_ok=True)
+            self._tmp_path.write_text("", encoding="utf-8")
+        os.replace(self._tmp_path, self.normalized_path)
+        self.stats["rewritten"] = 1
+
+        # Calculer la réduction de taille
+        raw_size = self.raw_path.stat().st_size
+        normalized_size = self.normalized_path.stat().st_size
+        reduction_pct = (1 - normalized_size / raw_size) * 100 if raw_size > 0 else 0
+
+        print(f"   ✓ Fichier normalisé sauvegardé : {self.normalized_path.name}")
+        print(f"   📊 Taille brute     : {raw_size:,} octets")
+        print(f"   📊 Taille normalisée: {normalized_size:,} octets")
+        print(f"   📊 Réduction        : {reduction_pct:.1f}%")
+        return self.stats
+
+
+def _record_worker(worker_stats: Dict[int, Dict[str, float]], result: Dict[str, Any]) -> None:
+    entry = worker_stats.setdefault(result["pid"], {"shards": 0, "offers": 0, "bytes": 0, "seconds": 0.0})
+    entry["shards"] += 1
+    entry["offers"] += result["offers"]
+    entry["bytes"] += result["bytes"]
+    entry["seconds"] += result["seconds"]
+
+
+def regenerate_normalized_files(full: bool = False, workers: int = 1, shard_bytes: int = DEFAULT_SHARD_BYTES):
+    """
+    Régénère les fichiers normalisés à partir des fichiers raw.
+
+    Args:
+        full: Si True, ignore les offres et le manifeste existants et re-mappe tout
+        workers: Nombre de processus de normalisation (1 = dans le processus courant)
+        shard_bytes: Taille cible des tranches de fichier raw confiées aux workers
+    """
+    raw_dir = root_dir / "data" / "raw" / SOURCE
+    normalized_dir = root_dir / "data" / "normalized" / SOURCE
 
-def regenerate_normalized_files():
-    """Régénère tous les fichiers normalisés à partir des fichiers raw."""
-    
-    raw_dir = root_dir / "data" / "raw" / "francetravail"
-    normalized_dir = root_dir / "data" / "normalized" / "francetravail"
-    
     if not raw_dir.exists():
         print(f"❌ Aucun dossier raw trouvé : {raw_dir}")
         return
-    
-    raw_files = list(raw_dir.glob("*.jsonl"))
+
+    raw_files = sorted(raw_dir.glob("*.jsonl"))
     if not raw_files:
         print(f"❌ Aucun fichier JSONL trouvé dans {raw_dir}")
         return
-    
+
     print(f"📁 Fichiers raw trouvés : {len(raw_files)}")
-    
+    if full:
+        print(f"   Mode : régénération complète")
+    if workers > 1:
+        print(f"   Mode : parallèle ({workers} workers, tranches de {shard_bytes / 1024 / 1024:.0f} Mo)")
+
+    current_version = mapping_version(SOURCE)
+    manifest = {} if full else load_manifest(normalized_dir)
+    totals = {"total": 0, "reused": 0, "remapped": 0, "errors": 0, "rewritten": 0, "skipped_files": 0}
+    worker_stats: Dict[int, Dict[str, float]] = {}
+    checksums: Dict[str, str] = {}
+    started = time.perf_counter()
+
+    def complete(writer: PartitionWriter) -> None:
+        for key, value in writer.finalize().items():
+            totals[key] += value
+        manifest[writer.raw_path.name] = {
+            "raw_checksum": checksums[writer.raw_path.name],
+            "mapping_version": current_version,
+        }
+        save_manifest(normalized_dir, manifest)
+
+    def handle(writer: PartitionWriter, index: int, result: Dict[str, Any]) -> None:
+        _record_worker(worker_stats, result)
+        writer.add(index, result)
+        if writer.done:
+            complete(writer)
+
+    # Fichiers à régénérer et empreintes de leurs offres déjà à jour
+    pending: List[Path] = []
+    current_hashes: Dict[str, FrozenSet[str]] = {}
     for raw_path in raw_files:
-        print(f"\n🔄 Traitement de {raw_path.name}...")
-        
-        # Lire les offres brutes
-        raw_offers = []
-        with raw_path.open("r", encoding="utf-8") as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    offer = json.loads(line)
-                    raw_offers.append(offer)
-                except json.JSONDecodeError as e:
-                    print(f"   ⚠️  Erreur ligne {line_num}: {e}")
-        
-        print(f"   ✓ {len(raw_offers)} offres brutes lues")
-        
-        # Normaliser sans le champ raw
-        normalized_offers = []
-        for offer in raw_offers:
-            try:
-                normalized = normalize_offer(offer, "francetravail")
-                normalized_offers.append(normalized.to_dict())
-            except Exception as e:
-                print(f"   ⚠️  Erreur de normalisation: {e}")
-                continue
-        
-        print(f"   ✓ {len(normalized_offers)} offres normalisées")
-        
-        # Écrire le fichier normalisé
         normalized_path = normalized_dir / raw_path.name
-        normalized_dir.mkdir(parents=True, exist_ok=True)
-        
-        with normalized_path.open("w", encoding="utf-8", newline="") as f:
-            for offer in normalized_offers:
-                json.dump(offer, f, ensure_ascii=False)
-                f.write("\n")
-        
-        # Calculer la réduction de taille
-        raw_size = raw_path.stat().st_size
-        normalized_size = normalized_path.stat().st_size
-        reduction_pct = (1 - normalized_size / raw_size) * 100 if raw_size > 0 else 0
-        
-        print(f"   ✓ Fichier normalisé sauvegardé : {normalized_path.name}")
-        print(f"   📊 Taille brute     : {raw_size:,} octets")
-        print(f"   📊 Taille normalisée: {normalized_size:,} octets")
-        print(f"   📊 Réduction        : {reduction_pct:.1f}%")
-    
+        checksum = file_checksum(raw_path)
+        entry = manifest.get(raw_path.name, {})
+
+        # Fichier raw identique et même version de mapping : rien à faire
+        if (
+            normalized_path.exists()
+            and entry.get("raw_checksum") == checksum
+            and entry.get("mapping_version") == current_version
+        ):
+            totals["skipped_files"] += 1
+            continue
+        checksums[raw_path.name] = checksum
+        pending.append(raw_path)
+        if not full and normalized_path.exists():
+            current_hashes[raw_path.name] = current_raw_hashes(normalized_path, current_version)
+
+    # Empreintes transmises une seule fois à chaque processus (pas à chaque tranche)
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(current_hashes,))
+    else:
+        executor = None
+        _init_worker(current_hashes)
+    in_flight: Dict[Future, Tuple[PartitionWriter, int]] = {}
+    try:
+        for raw_path in pending:
+            normalized_path = normalized_dir / raw_path.name
+            existing = read_jsonl(normalized_path, label=" (normalisé)") if raw_path.name in current_hashes else []
+            shards = compute_shards(raw_path, shard_bytes)
+            writer = PartitionWriter(raw_path, normalized_path, len(shards), existing, current_version)
+            if not shards:
+                complete(writer)
+                continue
+
+            for index, (start, end) in enumerate(shards):
+                if executor is None:
+                    handle(writer, index, normalize_shard(str(raw_path), start, end))
+                    continue
+                # Borner le nombre de tranches en vol pour limiter la mémoire
+                while len(in_flight) >= workers * 2:
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        handle(*in_flight.pop(future), future.result())
+                future = executor.submit(normalize_shard, str(raw_path), start, end)
+                in_flight[future] = (writer, index)
+
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                handle(*in_flight.pop(future), future.result())
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+
+    print(f"\n{'='*60}")
+    print(f"📊 RÉSUMÉ (mapping v{current_version})")
+    print(f"{'='*60}")
+    print(f"Fichiers inchangés (ignorés) : {totals['skipped_files']}")
+    print(f"Fichiers réécrits            : {totals['rewritten']}")
+    print(f"Offres à jour (réutilisées)  : {totals['reused']}")
+    print(f"Offres re-mappées            : {totals['remapped']}")
+    print(f"Erreurs de normalisation     : {totals['errors']}")
+    print(f"Durée totale                 : {elapsed:.1f}s")
+
+    if worker_stats:
+        print(f"\n⚙️  Débit par worker :")
+        for pid, stats in sorted(worker_stats.items()):
+            rate = stats["offers"] / stats["seconds"] if stats["seconds"] else 0.0
+            print(f"   PID {pid:<8} : {stats['shards']:3d} tranches, {stats['offers']:,} offres, "
+                  f"{stats['bytes'] / 1024 / 1024:.1f} Mo, {rate:,.0f} offres/s")
+
+    if executor is None:
+        print(f"\n📊 Caches des parseurs :")
+        for name, stats in cache_stats().items():
+            print(f"   {name:16s}: {stats['hits']:,} hits / {stats['misses']:,} misses "
+                  f"({stats['hit_rate']*100:.1f}%), {stats['primed']:,} pré-calculées, {stats['size']} entrées")
+
     print(f"\n✅ Régénération terminée !")
     print(f"\n💡 Le champ 'raw' a été supprimé des fichiers normalisés.")
     print(f"   Les données complètes restent disponibles dans data/raw/")
 
 
 if __name__ == "__main__":
-    regenerate_normalized_files()
+    parser = argparse.ArgumentParser(description="Régénère les fichiers normalisés depuis data/raw/")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-mappe toutes les offres, même celles déjà à jour"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Nombre de processus de normalisation (défaut: 1, utiliser os.cpu_count() pour tous les cœurs)"
+    )
+    parser.add_argument(
+        "--shard-mb",
+        type=int,
+        default=DEFAULT_SHARD_BYTES // (1024 * 1024),
+        help="Taille des tranches de fichier raw confiées aux workers, en Mo"
+    )
+    args = parser.parse_args()
+
+    regenerate_normalized_files(full=args.full, workers=args.workers, shard_bytes=args.shard_mb * 1024 * 1024)
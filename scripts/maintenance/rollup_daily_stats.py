@@ -0,0 +1,68 @@
+"""
+Recalcul de l'index de synthèse quotidienne (`<ES_INDEX>_daily`).
+
+L'indexation (`index_to_elasticsearch.py`) met à jour la synthèse des seuls
+jours de publication des offres lues. Ce script la recalcule entièrement ou
+sur une période : après une indexation faite avec --no-rollup, une mise à jour
+en échec, ou une modification de dates de publication déjà indexées.
+
+Usage:
+    python scripts/maintenance/rollup_daily_stats.py
+    python scripts/maintenance/rollup_daily_stats.py --since 2026-01-01
+    python scripts/maintenance/rollup_daily_stats.py --series --rome-code M1805
+"""
+
+import argparse
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Ajouter le répertoire racine au PYTHONPATH
+root_dir = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_dir))
+
+from pipelines.storage.elasticsearch import ElasticsearchClient
+from pipelines.storage.rollups import DailyRollup
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalcule la synthèse quotidienne des offres")
+    parser.add_argument("--since", type=date.fromisoformat, help="Premier jour recalculé (défaut: tous les jours)")
+    parser.add_argument("--series", action="store_true", help="Affiche la série quotidienne au lieu de recalculer")
+    parser.add_argument("--rome-code", type=str, help="Filtre de la série sur un code ROME")
+    args = parser.parse_args()
+
+    env_path = root_dir / "config" / ".env"
+    if env_path.exists():
+        load_dotenv(env_path)
+
+    try:
+        es_client = ElasticsearchClient()
+    except Exception as e:
+        print(f"❌ Impossible de se connecter à Elasticsearch: {e}")
+        sys.exit(1)
+
+    rollup = DailyRollup(es_client)
+
+    if args.series:
+        filters = {"rome_code": args.rome_code} if args.rome_code else None
+        series = rollup.daily_series(start=args.since.isoformat() if args.since else None, filters=filters)
+        print(f"\n{'Jour':<12} {'Offres':>8} {'Salaire annuel min. moyen':>27}")
+        print("-" * 49)
+        for point in series:
+            salary = f"{point['salary_annual_min_avg']:,.0f} €" if point["salary_annual_min_avg"] is not None else "-"
+            print(f"{point['day']:<12} {point['offers']:>8} {salary:>27}")
+        return
+
+    days = None
+    if args.since:
+        days = [(args.since + timedelta(days=n)).isoformat() for n in range((date.today() - args.since).days + 1)]
+    print(f"📅 Recalcul de '{rollup.rollup_index}' ({f'{len(days)} jour(s)' if days else 'tous les jours'})...")
+    result = rollup.update(days)
+    print(f"✓ {result['documents']:,} documents de synthèse écrits, {result['deleted']:,} obsolètes supprimés")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,10 @@ Usage:
     python scripts/query_elasticsearch.py
 """
 
+import heapq
 import sys
 from pathlib import Path
+from typing import Any, Dict
 from dotenv import load_dotenv
 
 # Ajouter le répertoire parent au PYTHONPATH
@@ -16,21 +18,113 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from pipelines.storage.elasticsearch import ElasticsearchClient
 
 
-def example_full_text_search(es_client: ElasticsearchClient):
-    """Exemple 1 : Recherche full-text sur le titre."""
-    print("\n" + "="*60)
-    print("1. RECHERCHE FULL-TEXT : 'data engineer'")
-    print("="*60)
-    
-    query = {
+# Requêtes des exemples, envoyées ensemble en une seule requête _msearch
+EXAMPLE_QUERIES: Dict[str, Dict[str, Any]] = {
+    "full_text": {
+        "size": 5,
         "query": {
             "match": {
                 "title": "data engineer"
             }
         }
-    }
+    },
+    "filtered": {
+        "size": 5,
+        "query": {
+            "bool": {
+                "must": [
+                    {"term": {"contract_type": "CDI"}},
+                    {"term": {"location_city": "Paris"}}
+                ]
+            }
+        }
+    },
+    "salary_range": {
+        "size": 5,
+        "query": {
+            "bool": {
+                "must": [
+                    {"exists": {"field": "salary_annual_min"}},
+                    {"range": {"salary_annual_min": {"gte": 40000}}}
+                ]
+            }
+        },
+        "sort": [
+            {"salary_annual_min": {"order": "desc"}}
+        ]
+    },
+    "top_skills": {
+        "size": 0,
+        "aggs": {
+            "top_skills": {
+                "terms": {
+                    "field": "skills",
+                    "size": 10
+                }
+            }
+        }
+    },
+    "contract_types": {
+        "size": 0,
+        "aggs": {
+            "contract_types": {
+                "terms": {
+                    "field": "contract_type",
+                    "size": 10
+                }
+            }
+        }
+    },
+    "top_cities": {
+        "size": 0,
+        "aggs": {
+            "top_cities": {
+                "terms": {
+                    "field": "location_city",
+                    "size": 10
+                }
+            }
+        }
+    },
+    "experience_levels": {
+        "size": 0,
+        "aggs": {
+            "experience_levels": {
+                "terms": {
+                    "field": "experience_level",
+                    "size": 10
+                }
+            }
+        }
+    },
+    "salary_stats": {
+        "size": 0,
+        "query": {
+            "exists": {"field": "salary_annual_min"}
+        },
+        "aggs": {
+            "salary_stats": {
+                "stats": {
+                    "field": "salary_annual_min"
+                }
+            },
+            "salary_percentiles": {
+                "percentiles": {
+                    "field": "salary_annual_min",
+                    "percents": [10, 50, 90]
+                }
+            }
+        }
+    },
+}
+
+
+def example_full_text_search(results: Dict[str, Any]):
+    """Exemple 1 : Recherche full-text sur le titre."""
+    print("\n" + "="*60)
+    print("1. RECHERCHE FULL-TEXT : 'data engineer'")
+    print("="*60)
     
-    results = es_client.search(query, size=5)
     total = results["hits"]["total"]["value"]
     print(f"\nRésultats trouvés : {total}")
     
@@ -42,24 +136,12 @@ def example_full_text_search(es_client: ElasticsearchClient):
         print(f"  Contrat: {source.get('contract_type', 'N/A')}")
 
 
-def example_filtered_search(es_client: ElasticsearchClient):
+def example_filtered_search(results: Dict[str, Any]):
     """Exemple 2 : Filtrage par critères multiples."""
     print("\n" + "="*60)
     print("2. FILTRAGE : CDI à Paris")
     print("="*60)
     
-    query = {
-        "query": {
-            "bool": {
-                "must": [
-                    {"term": {"contract_type": "CDI"}},
-                    {"term": {"location_city": "Paris"}}
-                ]
-            }
-        }
-    }
-    
-    results = es_client.search(query, size=5)
     total = results["hits"]["total"]["value"]
     print(f"\nOffres CDI à Paris : {total}")
     
@@ -69,58 +151,30 @@ def example_filtered_search(es_client: ElasticsearchClient):
         print(f"  Entreprise: {source.get('company_name', 'N/A')}")
 
 
-def example_salary_range(es_client: ElasticsearchClient):
+def example_salary_range(results: Dict[str, Any]):
     """Exemple 3 : Filtrage par fourchette salariale."""
     print("\n" + "="*60)
     print("3. SALAIRES : > 40 000 €/an")
     print("="*60)
     
-    query = {
-        "query": {
-            "bool": {
-                "must": [
-                    {"exists": {"field": "salary_min"}},
-                    {"range": {"salary_min": {"gte": 40000}}}
-                ]
-            }
-        },
-        "sort": [
-            {"salary_min": {"order": "desc"}}
-        ]
-    }
-    
-    results = es_client.search(query, size=5)
     total = results["hits"]["total"]["value"]
     print(f"\nOffres avec salaire ≥ 40 000 € : {total}")
     
     for hit in results["hits"]["hits"]:
         source = hit["_source"]
-        salary_min = source.get("salary_min", 0)
-        salary_max = source.get("salary_max", 0)
+        salary_min = source.get("salary_annual_min") or 0
+        salary_max = source.get("salary_annual_max") or 0
         print(f"\n- {source['title']}")
-        print(f"  Salaire: {salary_min:,.0f} € - {salary_max:,.0f} €")
+        print(f"  Salaire: {salary_min:,.0f} € - {salary_max:,.0f} € brut/an")
         print(f"  Lieu: {source.get('location_city', 'N/A')}")
 
 
-def example_aggregation_skills(es_client: ElasticsearchClient):
+def example_aggregation_skills(results: Dict[str, Any]):
     """Exemple 4 : Top 10 des compétences."""
     print("\n" + "="*60)
     print("4. TOP 10 DES COMPÉTENCES")
     print("="*60)
     
-    query = {
-        "size": 0,
-        "aggs": {
-            "top_skills": {
-                "terms": {
-                    "field": "skills",
-                    "size": 10
-                }
-            }
-        }
-    }
-    
-    results = es_client.search(query)
     buckets = results["aggregations"]["top_skills"]["buckets"]
     
     print(f"\n{'Rang':<6} {'Compétence':<30} {'Offres':<10}")
@@ -130,25 +184,12 @@ def example_aggregation_skills(es_client: ElasticsearchClient):
         print(f"{i:<6} {bucket['key']:<30} {bucket['doc_count']:<10}")
 
 
-def example_aggregation_contract_types(es_client: ElasticsearchClient):
+def example_aggregation_contract_types(results: Dict[str, Any]):
     """Exemple 5 : Répartition par type de contrat."""
     print("\n" + "="*60)
     print("5. RÉPARTITION PAR TYPE DE CONTRAT")
     print("="*60)
     
-    query = {
-        "size": 0,
-        "aggs": {
-            "contract_types": {
-                "terms": {
-                    "field": "contract_type",
-                    "size": 10
-                }
-            }
-        }
-    }
-    
-    results = es_client.search(query)
     buckets = results["aggregations"]["contract_types"]["buckets"]
     total = sum(b["doc_count"] for b in buckets)
     
@@ -160,25 +201,12 @@ def example_aggregation_contract_types(es_client: ElasticsearchClient):
         print(f"{bucket['key']:<20} {bucket['doc_count']:<10} {percentage:>6.1f}%")
 
 
-def example_aggregation_locations(es_client: ElasticsearchClient):
+def example_aggregation_locations(results: Dict[str, Any]):
     """Exemple 6 : Top 10 des villes."""
     print("\n" + "="*60)
     print("6. TOP 10 DES VILLES")
     print("="*60)
     
-    query = {
-        "size": 0,
-        "aggs": {
-            "top_cities": {
-                "terms": {
-                    "field": "location_city",
-                    "size": 10
-                }
-            }
-        }
-    }
-    
-    results = es_client.search(query)
     buckets = results["aggregations"]["top_cities"]["buckets"]
     
     print(f"\n{'Rang':<6} {'Ville':<30} {'Offres':<10}")
@@ -188,25 +216,12 @@ def example_aggregation_locations(es_client: ElasticsearchClient):
         print(f"{i:<6} {bucket['key']:<30} {bucket['doc_count']:<10}")
 
 
-def example_aggregation_experience(es_client: ElasticsearchClient):
+def example_aggregation_experience(results: Dict[str, Any]):
     """Exemple 7 : Répartition par niveau d'expérience."""
     print("\n" + "="*60)
     print("7. RÉPARTITION PAR NIVEAU D'EXPÉRIENCE")
     print("="*60)
     
-    query = {
-        "size": 0,
-        "aggs": {
-            "experience_levels": {
-                "terms": {
-                    "field": "experience_level",
-                    "size": 10
-                }
-            }
-        }
-    }
-    
-    results = es_client.search(query)
     buckets = results["aggregations"]["experience_levels"]["buckets"]
     
     print(f"\n{'Niveau':<20} {'Offres':<10}")
@@ -217,36 +232,68 @@ def example_aggregation_experience(es_client: ElasticsearchClient):
         print(f"{level:<20} {bucket['doc_count']:<10}")
 
 
-def example_stats_salary(es_client: ElasticsearchClient):
-    """Exemple 8 : Statistiques sur les salaires."""
+def example_stats_salary(results: Dict[str, Any]):
+    """Exemple 8 : Statistiques sur les salaires (annuels bruts, toutes unités ramenées à l'année)."""
     print("\n" + "="*60)
-    print("8. STATISTIQUES SALARIALES")
+    print("8. STATISTIQUES SALARIALES (€ BRUT / AN)")
     print("="*60)
     
-    query = {
-        "size": 0,
-        "query": {
-            "exists": {"field": "salary_min"}
-        },
-        "aggs": {
-            "salary_stats": {
-                "stats": {
-                    "field": "salary_min"
-                }
-            }
-        }
-    }
-    
-    results = es_client.search(query)
     stats = results["aggregations"]["salary_stats"]
+    percentiles = results["aggregations"]["salary_percentiles"]["values"]
     
     print(f"\nOffres avec salaire communiqué : {stats['count']}")
     print(f"Salaire minimum : {stats['min']:,.0f} €")
+    print(f"1er décile      : {percentiles['10.0']:,.0f} €")
     print(f"Salaire moyen   : {stats['avg']:,.0f} €")
-    print(f"Salaire médian  : (à calculer avec percentiles)")
+    print(f"Salaire médian  : {percentiles['50.0']:,.0f} €")
+    print(f"9e décile       : {percentiles['90.0']:,.0f} €")
     print(f"Salaire maximum : {stats['max']:,.0f} €")
 
 
+def example_facet_rome_department(es_client: ElasticsearchClient):
+    """Exemple 9 : Distribution complète code ROME × département (agrégation composite)."""
+    print("\n" + "="*60)
+    print("9. DISTRIBUTION COMPLÈTE : CODE ROME × DÉPARTEMENT")
+    print("="*60)
+    
+    # Tous les couples sont parcourus page par page, sans limite de taille
+    total_buckets = 0
+
+    def counted(buckets):
+        nonlocal total_buckets
+        for bucket in buckets:
+            total_buckets += 1
+            yield bucket
+
+    # Tas borné à 10 éléments : pas de tri de la liste à chaque bucket
+    buckets = es_client.iter_composite(["rome_code", "location_department"])
+    top = heapq.nlargest(10, counted(buckets), key=lambda b: b["doc_count"])
+    
+    print(f"\nCouples (code ROME, département) distincts : {total_buckets:,}")
+    print(f"\n{'Code ROME':<12} {'Département':<14} {'Offres':<10}")
+    print("-" * 36)
+    
+    for bucket in top:
+        key = bucket["key"]
+        print(f"{key['rome_code']:<12} {key['location_department']:<14} {bucket['doc_count']:<10}")
+
+
+def example_salary_benchmark(es_client: ElasticsearchClient):
+    """Exemple 10 : Repères salariaux par région (percentiles et rang d'un salaire de 40 000 €)."""
+    print("\n" + "="*60)
+    print("10. REPÈRES SALARIAUX PAR RÉGION (€ BRUT / AN)")
+    print("="*60)
+    
+    benchmark = es_client.salary_benchmark(by="location_region", percents=[25, 50, 75], ranks=[40000], size=10)
+    
+    print(f"\n{'Région':<30} {'Offres':>7} {'P25':>9} {'Médiane':>9} {'P75':>9} {'< 40 k€':>8}")
+    print("-" * 77)
+    
+    for region, row in benchmark.items():
+        p = row["percentiles"]
+        print(f"{region:<30} {row['offers']:>7} {p[25.0]:>9,.0f} {p[50.0]:>9,.0f} {p[75.0]:>9,.0f} {row['ranks'][40000.0]:>7.0f}%")
+
+
 def main():
     """Point d'entrée principal."""
     # Charger les variables d'environnement
@@ -268,15 +315,23 @@ def main():
             print("   python scripts/index_to_elasticsearch.py --source francetravail")
             return
         
-        # Exécuter les exemples
-        example_full_text_search(es_client)
-        example_filtered_search(es_client)
-        example_salary_range(es_client)
-        example_aggregation_skills(es_client)
-        example_aggregation_contract_types(es_client)
-        example_aggregation_locations(es_client)
-        example_aggregation_experience(es_client)
-        example_stats_salary(es_client)
+        # Exécuter les exemples : un seul aller-retour pour les huit requêtes
+        results = es_client.multi_search(EXAMPLE_QUERIES)
+        examples = [
+            ("full_text", example_full_text_search),
+            ("filtered", example_filtered_search),
+            ("salary_range", example_salary_range),
+            ("top_skills", example_aggregation_skills),
+            ("contract_types", example_aggregation_contract_types),
+            ("top_cities", example_aggregation_locations),
+            ("experience_levels", example_aggregation_experience),
+            ("salary_stats", example_stats_salary),
+        ]
+        for name, example in examples:
+            if "error" not in results[name]:
+                example(results[name])
+        example_facet_rome_department(es_client)
+        example_salary_benchmark(es_client)
         
         print("\n" + "="*60)
         print("✅ Exemples terminés !")
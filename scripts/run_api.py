@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Lance le service HTTP de lecture (recherche, facettes, salaires, carte).
+
+Un seul client Elasticsearch (pool de connexions) est partagé par tous les
+threads du serveur ; les réponses sont mises en cache et portent un ETag.
+Avec STORAGE_BACKEND=sqlite, le service lit la base embarquée (SQLITE_PATH).
+
+Usage:
+    python scripts/run_api.py
+    python scripts/run_api.py --port 8080 --connections 32
+    STORAGE_BACKEND=sqlite python scripts/run_api.py
+    curl "http://127.0.0.1:8000/search?q=data+engineer&contract_type=CDI&size=20"
+    curl "http://127.0.0.1:8000/facets?field=contract_type,rome_code"
+    curl "http://127.0.0.1:8000/salary?by=location_region&rank=40000"
+    curl "http://127.0.0.1:8000/geo?zoom=6"
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipelines.api import create_server
+from pipelines.storage.backends import create_storage_client, storage_backend
+
+
+def main():
+    """Point d'entrée principal du script."""
+    parser = argparse.ArgumentParser(description="Service HTTP de lecture des offres")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Adresse d'écoute (défaut: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Port d'écoute (défaut: 8000)")
+    parser.add_argument("--index", type=str, help="Index ou alias interrogé (défaut: ES_INDEX)")
+    parser.add_argument("--connections", type=int, default=20, help="Taille du pool Elasticsearch (défaut: 20, sans effet avec SQLite)")
+    parser.add_argument("--cache-entries", type=int, default=1024, help="Réponses gardées en cache (0 = désactivé)")
+    parser.add_argument("--cache-ttl", type=float, default=30.0, help="Durée de vie du cache en secondes (défaut: 30)")
+    parser.add_argument("--quiet", action="store_true", help="N'affiche pas une ligne par requête")
+    args = parser.parse_args()
+
+    env_path = Path(__file__).parent.parent / "config" / ".env"
+    if env_path.exists():
+        load_dotenv(env_path)
+
+    try:
+        print(f"🔌 Connexion au stockage ({storage_backend()})...")
+        es_client = create_storage_client(index_name=args.index, connections_per_node=args.connections)
+    except Exception as e:
+        print(f"\n❌ Impossible d'ouvrir le stockage: {e}")
+        sys.exit(1)
+
+    server = create_server(
+        es_client,
+        host=args.host,
+        port=args.port,
+        cache_entries=args.cache_entries,
+        cache_ttl=args.cache_ttl,
+        quiet=args.quiet
+    )
+    print(f"\n🚀 API de lecture sur http://{args.host}:{server.server_address[1]} (index '{es_client.index_name}')")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Arrêt du service")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Tests du service HTTP de lecture (curseur, ETag / 304, en-têtes de temps, erreurs).
+
+Le service tourne sur un port libre avec un backend de substitution local.
+"""
+
+import json
+import sys
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+# Ajouter la racine du projet au PYTHONPATH
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+pytest.importorskip("elasticsearch")
+
+from pipelines.api import create_server
+from pipelines.api.service import build_query, decode_cursor, encode_cursor
+
+OFFERS = [
+    {"id": f"{n:03d}", "title": f"Data engineer {n}", "published_at": f"2026-01-{30 - n:02d}"}
+    for n in range(5)
+]
+
+
+class FakeBackend:
+    def __init__(self):
+        self.bodies = []
+        self.error = None
+
+    def search(self, body):
+        if self.error is not None:
+            raise self.error
+        self.bodies.append(body)
+        if "aggs" in body:
+            return {
+                "hits": {"total": {"value": len(OFFERS)}, "hits": []},
+                "aggregations": {"contract_type": {"buckets": [{"key": "CDI", "doc_count": 4}]}},
+            }
+        start = 0
+        if "search_after" in body:
+            start = next(i for i, o in enumerate(OFFERS) if [o["published_at"], o["id"]] == body["search_after"]) + 1
+        page = OFFERS[start:start + body["size"]]
+        return {
+            "hits": {
+                "total": {"value": len(OFFERS)},
+                "hits": [{"_source": o, "sort": [o["published_at"], o["id"]]} for o in page],
+            }
+        }
+
+    def salary_benchmark(self, by=None, ranks=(), query=None, size=20):
+        return {"M1805": {"offers": 3, "avg": 42000.0, "percentiles": {50.0: 40000.0}, "ranks": {40000.0: 48.5}}}
+
+
+@pytest.fixture
+def api():
+    backend = FakeBackend()
+    server = create_server(backend, port=0, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", backend
+    server.shutdown()
+    server.server_close()
+
+
+def get(url, headers=None):
+    request = urllib.request.Request(url, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(["2026-01-30", "000"])) == ["2026-01-30", "000"]
+
+
+def test_build_query_filters():
+    query = build_query({"q": ["data"], "contract_type": ["CDI,CDD"], "published_from": ["2026-01-01"]})
+
+    assert query["bool"]["must"][0]["multi_match"]["query"] == "data"
+    assert {"terms": {"contract_type": ["CDI", "CDD"]}} in query["bool"]["filter"]
+    assert {"range": {"published_at": {"gte": "2026-01-01"}}} in query["bool"]["filter"]
+    assert build_query({}) == {"match_all": {}}
+
+
+def test_search_pages_with_cursor(api):
+    base, _ = api
+    seen = []
+    url = f"{base}/search?size=2"
+    while url:
+        status, _, data = get(url)
+        assert status == 200
+        page = json.loads(data)
+        seen += [offer["id"] for offer in page["offers"]]
+        url = f"{base}/search?size=2&cursor={page['next_cursor']}" if page["next_cursor"] else None
+
+    assert seen == [o["id"] for o in OFFERS]
+
+
+def test_etag_cache_and_timing_headers(api):
+    base, backend = api
+    status, headers, _ = get(f"{base}/facets?field=contract_type")
+    assert status == 200
+    assert headers["X-Cache"] == "MISS"
+    assert "backend;dur=" in headers["Server-Timing"]
+
+    status, headers_again, _ = get(f"{base}/facets?field=contract_type")
+    assert headers_again["X-Cache"] == "HIT"
+    assert headers_again["ETag"] == headers["ETag"]
+    assert len(backend.bodies) == 1
+
+    status, _, data = get(f"{base}/facets?field=contract_type", {"If-None-Match": headers["ETag"]})
+    assert (status, data) == (304, b"")
+
+
+def test_salary_keys_are_json_strings(api):
+    base, _ = api
+    status, _, data = get(f"{base}/salary?by=rome_code&rank=40000")
+
+    assert status == 200
+    assert json.loads(data)["groups"]["M1805"]["percentiles"] == {"50": 40000.0}
+
+
+def test_errors(api):
+    base, _ = api
+    assert get(f"{base}/unknown")[0] == 404
+    assert get(f"{base}/facets?field=password")[0] == 400
+    assert get(f"{base}/search?size=1000")[0] == 400
+    assert get(f"{base}/search?cursor=%%%")[0] == 400
+
+
+def test_invalid_dates_and_cursor_are_rejected(api):
+    base, backend = api
+    assert get(f"{base}/search?published_from=hier")[0] == 400
+    assert get(f"{base}/facets?field=contract_type&published_to=2026-13-01")[0] == 400
+    assert get(f"{base}/search?published_from=2026-02-01&published_to=2026-01-01")[0] == 400
+    assert get(f"{base}/search?published_from=2026-01-01T08:00:00Z")[0] == 200
+    # Curseur décodable mais sans une valeur par critère de tri
+    assert get(f"{base}/search?cursor={encode_cursor(['2026-01-30'])}")[0] == 400
+    assert get(f"{base}/search?cursor={encode_cursor([['x'], '000'])}")[0] == 400
+    assert len(backend.bodies) == 1
+
+
+def test_backend_errors(api):
+    base, backend = api
+    backend.error = ConnectionError("refused")
+    assert get(f"{base}/search?size=3")[0] == 502
+
+    # Erreur du service lui-même : pas une indisponibilité du backend
+    backend.error = KeyError("hits")
+    status, _, data = get(f"{base}/search?size=4")
+    assert status == 500
+    assert json.loads(data) == {"error": "erreur interne"}
+
+
+def test_date_filter_outside_partitions_returns_empty_results():
+    from unittest.mock import MagicMock
+
+    from pipelines.storage.elasticsearch import ElasticsearchClient
+    from pipelines.storage.query_cache import QueryCache
+
+    # Client partitionné par mois dont aucun index ne couvre 2020 : pas de requête au cluster
+    backend = ElasticsearchClient.__new__(ElasticsearchClient)
+    backend.index_name = "jobmarket_v3"
+    backend.partitioning = "monthly"
+    backend.query_cache = QueryCache(max_entries=0)
+    backend.client = MagicMock()
+    backend.client.indices.get_alias.return_value = {"jobmarket_v3-2026.01": {}}
+    server = create_server(backend, port=0, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        dates = "published_from=2020-01-01&published_to=2020-02-01"
+
+        status, _, data = get(f"{base}/facets?field=contract_type,rome_code&{dates}")
+        assert status == 200
+        assert json.loads(data) == {"total": 0, "facets": {"contract_type": [], "rome_code": []}}
+
+        status, _, data = get(f"{base}/salary?by=rome_code&{dates}")
+        assert status == 200 and json.loads(data) == {"groups": {}}
+
+        status, _, data = get(f"{base}/salary?rank=40000&{dates}")
+        assert status == 200
+        assert json.loads(data)["groups"]["_all"]["offers"] == 0
+
+        status, _, data = get(f"{base}/geo?{dates}")
+        assert status == 200 and json.loads(data)["tiles"] == []
+
+        status, _, data = get(f"{base}/search?{dates}")
+        assert status == 200 and json.loads(data)["offers"] == []
+        backend.client.search.assert_not_called()
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,145 @@
+"""
+Tests du client Elasticsearch asynchrone avec un transport simulé (AsyncMock).
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+
+# Ajouter la racine du projet au PYTHONPATH
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+pytest.importorskip("elasticsearch")
+pytest.importorskip("aiohttp")
+
+from pipelines.storage import async_elasticsearch as async_module
+from pipelines.storage.async_elasticsearch import AsyncElasticsearchClient
+from pipelines.storage.elasticsearch import ElasticsearchClient
+
+OFFERS = [
+    {"id": "1", "title": "Data engineer", "published_at": "2026-01-15T10:00:00"},
+    {"id": "2", "title": "Data analyst", "published_at": "2026-02-03T08:00:00"},
+]
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Actions reçues par async_streaming_bulk (toutes acquittées)."""
+    actions = []
+    monkeypatch.delenv("ES_PARTITIONING", raising=False)
+
+    async def fake_streaming_bulk(client, source, **kwargs):
+        async for action in source:
+            actions.append(action)
+            yield True, {"index": {"_id": action["_id"], "status": 201}}
+
+    monkeypatch.setattr(async_module.helpers, "async_streaming_bulk", fake_streaming_bulk)
+    return actions
+
+
+def _sync_client(partitioning=None):
+    client = ElasticsearchClient.__new__(ElasticsearchClient)
+    client.index_name = "jobmarket_v3"
+    client.partitioning = partitioning
+    return client
+
+
+def _index(client, offers):
+    async def run():
+        try:
+            return await client.bulk_index_offers(offers)
+        finally:
+            await client.close()
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("partitioning", [None, "monthly"])
+def test_actions_match_sync_client(sent, partitioning):
+    client = AsyncElasticsearchClient(host="http://localhost:9200", index_name="jobmarket_v3", partitioning=partitioning)
+
+    result = _index(client, OFFERS)
+
+    assert result["indexed"] == 2
+    assert sent == [_sync_client(partitioning)._action(offer) for offer in OFFERS]
+
+
+def test_monthly_partitioning_routes_by_publication_month(sent):
+    client = AsyncElasticsearchClient(index_name="jobmarket_v3", partitioning="monthly")
+
+    async def offers():
+        for offer in OFFERS:
+            yield offer
+
+    _index(client, offers())
+
+    assert [action["_index"] for action in sent] == ["jobmarket_v3-2026.01", "jobmarket_v3-2026.02"]
+
+
+def test_with_index_writes_to_that_index(sent):
+    client = AsyncElasticsearchClient(index_name="jobmarket_v3", partitioning="monthly")
+    clone = client.with_index("jobmarket_v3-20260118093000")
+
+    _index(clone, OFFERS)
+
+    assert {action["_index"] for action in sent} == {"jobmarket_v3-20260118093000"}
+    assert client.partitioning == "monthly" and client.index_name == "jobmarket_v3"
+
+
+def test_search_uses_alias_and_default_size():
+    client = AsyncElasticsearchClient(index_name="jobmarket_v3")
+    transport = client.client
+    client.client = AsyncMock()
+    client.client.search.return_value = {"hits": {"hits": []}}
+
+    async def run():
+        try:
+            return await client.search_concurrent({"a": {"query": {"match_all": {}}}, "b": {"size": 0}})
+        finally:
+            await transport.close()
+
+    results = asyncio.run(run())
+
+    assert set(results) == {"a", "b"}
+    sizes = sorted(call.kwargs["body"]["size"] for call in client.client.search.call_args_list)
+    assert sizes == [0, 10]
+    assert {call.kwargs["index"] for call in client.client.search.call_args_list} == {"jobmarket_v3"}
+
+
+def test_dated_search_prunes_partitions_like_sync_client(monkeypatch):
+    monkeypatch.delenv("ES_PARTITIONING", raising=False)
+    client = AsyncElasticsearchClient(index_name="jobmarket_v3", partitioning="monthly")
+    transport = client.client
+    client.client = AsyncMock()
+    client.client.indices.get_alias.return_value = {
+        "jobmarket_v3-2026.01": {}, "jobmarket_v3-2026.02": {}, "jobmarket_v3-20260118093000": {}
+    }
+    client.client.search.return_value = {"hits": {"hits": []}}
+
+    def dated(start, end):
+        return {
+            "query": {"bool": {"filter": [{"range": {"published_at": {"gte": start, "lte": end}}}]}},
+            "aggs": {"contracts": {"terms": {"field": "contract_type"}}},
+        }
+
+    async def run():
+        try:
+            return await client.search_concurrent({
+                "janvier": dated("2026-01-01", "2026-01-31"),
+                "2020": dated("2020-01-01", "2020-12-31"),
+                "tout": {"query": {"match_all": {}}},
+            })
+        finally:
+            await transport.close()
+
+    results = asyncio.run(run())
+
+    indices = sorted(call.kwargs["index"] for call in client.client.search.call_args_list)
+    assert indices == ["jobmarket_v3", "jobmarket_v3-2026.01"]
+    # Aucun mois sur la période : réponse vide, agrégations comprises, sans requête
+    assert results["2020"]["hits"]["total"]["value"] == 0
+    assert results["2020"]["aggregations"] == {"contracts": {"buckets": []}}
@@ -0,0 +1,174 @@
+"""
+Tests unitaires du découpage des requêtes bulk en octets, du contrôleur adaptatif,
+de la génération paresseuse des actions et de l'agrégation des résultats par worker.
+"""
+
+import json
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+# Ajouter la racine du projet au PYTHONPATH
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+pytest.importorskip("elasticsearch")
+
+from pipelines.storage.content_hashes import ContentHashStore
+from pipelines.storage.elasticsearch import BulkSizeController, _action_size, _byte_chunks
+
+
+def _action(i, size):
+    return {"_index": "test", "_id": str(i), "_source": {"id": str(i), "description": "x" * size}}
+
+
+def test_chunks_are_bounded_by_bytes():
+    controller = BulkSizeController(initial_bytes=10_000, min_bytes=1_000)
+    actions = [_action(i, 50 if i % 2 else 4_000) for i in range(40)]
+    chunks = list(_byte_chunks(actions, controller))
+
+    assert sum(len(c) for c in chunks) == 40
+    for chunk in chunks:
+        assert len(chunk) == 1 or sum(_action_size(a) for a in chunk) <= 10_000
+
+
+def test_max_docs_caps_chunk_length():
+    controller = BulkSizeController(initial_bytes=10**6, min_bytes=1_000)
+    chunks = list(_byte_chunks((_action(i, 10) for i in range(25)), controller, max_docs=10))
+    assert [len(c) for c in chunks] == [10, 10, 5]
+
+
+def test_controller_follows_latency_and_rejections():
+    controller = BulkSizeController(initial_bytes=4_000_000, min_bytes=1_000_000, max_bytes=8_000_000, target_latency=1.0)
+
+    assert controller.observe(0.2) == 5_000_000          # rapide : +25 %
+    assert controller.observe(0.8) == 5_000_000          # dans la cible : inchangé
+    assert controller.observe(2.0) == 2_500_000          # trop lent : réduit proportionnellement
+    assert controller.observe(0.1, rejected=3) == 1_250_000  # rejets 429 : divisé par deux
+    assert controller.observe(0.1, rejected=1) == 1_000_000  # borné au minimum
+
+
+class FakeStreamingBulk:
+    """helpers.streaming_bulk simulé : un résultat par action, selon l'identifiant."""
+
+    def __init__(self, conflicts=(), failures=(), rejected_once=()):
+        self.conflicts = set(conflicts)
+        self.failures = set(failures)
+        self.rejected_once = set(rejected_once)
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, client, actions, **kwargs):
+        with self.lock:
+            self.requests += 1
+        for action in actions:
+            doc_id = action["_id"]
+            if doc_id in self.conflicts:
+                yield False, {"index": {"_id": doc_id, "status": 409, "error": {"type": "version_conflict_engine_exception"}}}
+            elif doc_id in self.failures:
+                yield False, {"index": {"_id": doc_id, "status": 400, "error": {"type": "mapper_parsing_exception", "reason": "x"}}}
+            else:
+                with self.lock:
+                    rejected = doc_id in self.rejected_once
+                    self.rejected_once.discard(doc_id)
+                if rejected:
+                    yield False, {"index": {"_id": doc_id, "status": 429, "error": {"type": "es_rejected_execution_exception"}}}
+                else:
+                    yield True, {"index": {"_id": doc_id, "status": 201}}
+
+
+def _offers(count):
+    return [{"id": f"ft:{n}", "title": f"Offre {n}", "published_at": "2026-01-15T10:00:00"} for n in range(count)]
+
+
+@pytest.fixture
+def es_client(monkeypatch):
+    from pipelines.storage import elasticsearch as es_module
+    from pipelines.storage.query_cache import QueryCache
+
+    client = es_module.ElasticsearchClient.__new__(es_module.ElasticsearchClient)
+    client.index_name = "jobmarket_v3"
+    client.partitioning = None
+    client.query_cache = QueryCache(max_entries=0)
+    client.client = MagicMock()
+    client.bulk = FakeStreamingBulk(conflicts={"ft:3"}, failures={"ft:7", "ft:8"}, rejected_once={"ft:10", "ft:20"})
+    monkeypatch.setattr(es_module.helpers, "streaming_bulk", client.bulk)
+    monkeypatch.setattr(es_module.time, "sleep", lambda seconds: None)
+    return client
+
+
+def test_generate_actions_streams_and_skips_known_offers(es_client):
+    hashes = ContentHashStore()
+    known = es_client._prepare_document(_offers(1)[0])
+    hashes.set("ft:0", known["content_hash"])
+    consumed = []
+
+    def source():
+        for offer in _offers(5) + _offers(3):  # ft:0..2 relus depuis un second fichier
+            consumed.append(offer["id"])
+            yield offer
+
+    result = {"unchanged": 0, "total": 0}
+    actions = es_client._generate_actions(source(), hashes, result)
+
+    # Paresseux : une offre lue par action produite
+    assert next(actions)["_id"] == "ft:1"
+    assert consumed == ["ft:0", "ft:1"]
+    assert [a["_id"] for a in actions] == ["ft:2", "ft:3", "ft:4"]
+    # ft:0 connue, ft:0..2 déjà envoyées pendant ce passage
+    assert result == {"unchanged": 4, "total": 4}
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_bulk_results_are_merged_across_chunks_and_workers(es_client, workers):
+    hashes = ContentHashStore()
+    offers = _offers(60)
+    if workers > 1:
+        stats = es_client.parallel_bulk_index_offers(offers, workers=workers, batch_size=5, hashes=hashes)
+    else:
+        stats = es_client.bulk_index_offers(offers, batch_size=5, hashes=hashes)
+
+    assert stats["total"] == 60
+    assert (stats["indexed"], stats["duplicates"], stats["errors"]) == (57, 1, 2)
+    assert stats["error_details"] == {"mapper_parsing_exception": 2}
+    assert (stats["rejected"], stats["retries"]) == (2, 2)
+    # Empreintes enregistrées pour les seuls documents acquittés
+    assert len(hashes) == 57 and "ft:7" not in hashes and "ft:10" in hashes
+    if workers > 1:
+        assert sum(w["chunks"] for w in stats["workers"].values()) == 12
+        assert sum(w["docs"] for w in stats["workers"].values()) == 60
+        assert len(stats["workers"]) <= workers
+
+    # Second passage : plus rien à envoyer hors échecs
+    requests = es_client.bulk.requests
+    again = es_client.bulk_index_offers(offers, batch_size=5, hashes=hashes)
+    assert (again["unchanged"], again["total"]) == (57, 60)
+    assert es_client.bulk.requests == requests + 1
+
+
+def test_index_files_parallel_merges_stats_across_files(es_client, tmp_path):
+    pytest.importorskip("dotenv")
+    scripts_dir = project_root / "scripts"
+    if str(scripts_dir) not in sys.path:
+        sys.path.insert(0, str(scripts_dir))
+    import index_to_elasticsearch as indexer
+
+    files = []
+    for name, offers in (("a.jsonl", _offers(30)[:20]), ("b.jsonl", _offers(30)[15:])):
+        path = tmp_path / name
+        path.write_text("".join(json.dumps(o) + "\n" for o in offers), encoding="utf-8")
+        files.append(path)
+    ledger = {}
+
+    stats = indexer.index_files(es_client, files, batch_size=4, workers=2, hashes=ContentHashStore(), ledger=ledger)
+
+    # ft:15..19 présentes dans les deux fichiers : envoyées une seule fois
+    assert stats["total_offers"] == 35 and stats["unchanged"] == 5
+    assert (stats["indexed"], stats["duplicates"], stats["errors"]) == (27, 1, 2)
+    assert stats["files_processed"] == 2
+    # Erreurs : positions non avancées
+    assert ledger == {}
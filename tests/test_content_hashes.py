@@ -0,0 +1,68 @@
+"""
+Tests unitaires des empreintes de contenu utilisées pour la réindexation incrémentale.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Ajouter la racine du projet au PYTHONPATH
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+pytest.importorskip("elasticsearch")
+
+from pipelines.storage.content_hashes import ContentHashStore, document_hash
+
+
+def test_document_hash_ignores_key_order_and_own_field():
+    doc = {"id": "1", "title": "Data engineer", "skills": ["python", "sql"]}
+    reordered = {"skills": ["python", "sql"], "title": "Data engineer", "id": "1", "content_hash": "old"}
+
+    assert document_hash(doc) == document_hash(reordered)
+    assert document_hash(doc) != document_hash({**doc, "title": "Data analyst"})
+
+
+def test_document_hash_is_stable_across_normalizations():
+    from pipelines.ingest.normalizer import normalize_offer
+    from pipelines.storage.offers import prepare_document
+
+    raw = {"id": "123ABC", "intitule": "Data engineer", "dateCreation": "2026-01-15T10:00:00Z"}
+    first = prepare_document(normalize_offer(raw, "francetravail").to_dict())
+    time.sleep(0.01)
+    second = prepare_document(normalize_offer(raw, "francetravail").to_dict())
+
+    assert first["collected_at"] != second["collected_at"]
+    assert first["content_hash"] == second["content_hash"]
+    # Même offre rattachée à un groupe de quasi-doublons : contenu inchangé
+    assert document_hash({**first, "duplicate_group": "francetravail:1"}) == first["content_hash"]
+
+
+def test_store_roundtrip_and_dirty_tracking(tmp_path):
+    path = tmp_path / "state" / "hashes.json"
+    store = ContentHashStore(path)
+    store.update([("1", "a"), ("2", "b")])
+    store.save()
+
+    reloaded = ContentHashStore(path)
+    assert len(reloaded) == 2 and reloaded.get("2") == "b"
+
+    mtime = path.stat().st_mtime_ns
+    reloaded.set("1", "a")  # inchangé : pas de réécriture
+    reloaded.save()
+    assert path.stat().st_mtime_ns == mtime
+
+
+def test_discard_forgets_deleted_documents(tmp_path):
+    path = tmp_path / "hashes.json"
+    store = ContentHashStore(path)
+    store.update([("1", "a"), ("2", "b"), ("3", "c")])
+    store.save()
+
+    assert store.discard(["1", "3", "unknown"]) == 2
+    store.save()
+
+    assert ContentHashStore(path)._hashes == {"2": "b"}
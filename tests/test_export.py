@@ -0,0 +1,171 @@
+"""
+Tests unitaires du parcours complet de l'index (point-in-time + search_after)
+et de l'export JSONL / Parquet.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ajouter la racine du projet au PYTHONPATH
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+pytest.importorskip("elasticsearch")
+
+from pipelines.storage.elasticsearch import ElasticsearchClient
+from pipelines.storage.export import export_jsonl, export_parquet, parquet_columns
+
+
+class FakePitClient:
+    """Sous-ensemble de l'API Elasticsearch utilisé par iter_all (documents en mémoire)."""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.open_pits = set()
+
+    def open_point_in_time(self, index, keep_alive):
+        self.open_pits.add("pit-1")
+        return {"id": "pit-1"}
+
+    def close_point_in_time(self, id):
+        self.open_pits.discard(id)
+
+    def search(self, body):
+        assert body["pit"]["id"] in self.open_pits
+        position = body.get("search_after", [-1])[0]
+        slice_ = body.get("slice", {"id": 0, "max": 1})
+        rows = [
+            (i, doc) for i, doc in enumerate(self.docs)
+            if i > position and i % slice_["max"] == slice_["id"]
+        ][:body["size"]]
+        hits = [{"_source": doc, "sort": [i]} for i, doc in rows]
+        return {"pit_id": "pit-1", "hits": {"hits": hits}}
+
+
+def _client(docs):
+    es_client = ElasticsearchClient.__new__(ElasticsearchClient)
+    es_client.index_name = "jobmarket_v3"
+    es_client.client = FakePitClient(docs)
+    return es_client
+
+
+@pytest.mark.parametrize("slices", [1, 3])
+def test_iter_all_reads_every_document_once(slices):
+    docs = [{"id": str(i)} for i in range(2_500)]
+    es_client = _client(docs)
+
+    exported = list(es_client.iter_all(page_size=100, slices=slices))
+
+    assert sorted(int(doc["id"]) for doc in exported) == list(range(2_500))
+    assert not es_client.client.open_pits
+
+
+def test_iter_all_closes_pit_when_abandoned():
+    es_client = _client([{"id": str(i)} for i in range(1_000)])
+    docs = es_client.iter_all(page_size=10, slices=2)
+
+    assert next(docs)["id"] is not None
+    docs.close()
+    assert not es_client.client.open_pits
+
+
+def test_export_jsonl_roundtrip(tmp_path):
+    docs = [{"id": "1", "title": "Data engineer", "skills": ["python"]}, {"id": "2", "title": "Analyste"}]
+    path = tmp_path / "exports" / "offres.jsonl"
+
+    assert export_jsonl(iter(docs), path) == 2
+    with path.open(encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == docs
+
+
+def test_parquet_columns_follow_mapping():
+    properties = {
+        "id": {"type": "keyword"},
+        "salary_min": {"type": "float"},
+        "positions_count": {"type": "integer"},
+        "is_alternance": {"type": "boolean"},
+        "languages": {"type": "nested", "properties": {}},
+    }
+
+    assert parquet_columns(properties) == {
+        "id": "string", "salary_min": "float64", "positions_count": "int64",
+        "is_alternance": "bool", "languages": "string",
+    }
+    assert parquet_columns(properties, ["id", "unknown"]) == {"id": "string", "unknown": "string"}
+
+
+def test_export_parquet_serializes_nested_values(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    properties = {
+        "id": {"type": "keyword"},
+        "salary_min": {"type": "float"},
+        "is_alternance": {"type": "boolean"},
+        "skills": {"type": "keyword"},
+    }
+    docs = [{"id": "1", "salary_min": 42000, "is_alternance": True, "skills": ["python", "sql"]}, {"id": "2"}]
+    path = tmp_path / "offres.parquet"
+
+    assert export_parquet(iter(docs), path, properties, row_group_size=1) == 2
+    rows = pq.read_table(path).to_pylist()
+    assert rows[0] == {"id": "1", "salary_min": 42000.0, "is_alternance": True, "skills": '["python", "sql"]'}
+    assert rows[1] == {"id": "2", "salary_min": None, "is_alternance": None, "skills": None}
+
+
+
+def _interrupted(docs):
+    yield from docs
+    raise RuntimeError("point-in-time expiré")
+
+
+def test_interrupted_export_leaves_no_temporary_file(tmp_path):
+    docs = [{"id": str(n), "salary_min": n} for n in range(5)]
+    path = tmp_path / "offres.jsonl"
+    path.write_text("ancien export\n", encoding="utf-8")
+
+    with pytest.raises(RuntimeError):
+        export_jsonl(_interrupted(docs), path)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["offres.jsonl"]
+    # L'export précédent est conservé
+    assert path.read_text(encoding="utf-8") == "ancien export\n"
+
+    pytest.importorskip("pyarrow")
+    with pytest.raises(RuntimeError):
+        export_parquet(_interrupted(docs), tmp_path / "offres.parquet", {"id": {"type": "keyword"}}, row_group_size=2)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["offres.jsonl"]
+
+class FakeCompositeClient:
+    """Agrégation composite paginée sur des buckets en mémoire."""
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.requests = []
+
+    def search(self, index, body, request_cache=None):
+        self.requests.append(body)
+        composite = body["aggs"]["facet"]["composite"]
+        after = composite.get("after")
+        names = [list(source)[0] for source in composite["sources"]]
+        rows = [k for k in self.keys if after is None or k > tuple(after[n] for n in names)][:composite["size"]]
+        buckets = [{"key": dict(zip(names, k)), "doc_count": 1} for k in rows]
+        facet = {"buckets": buckets}
+        if buckets:
+            facet["after_key"] = buckets[-1]["key"]
+        return {"aggregations": {"facet": facet}}
+
+
+def test_iter_composite_walks_every_page():
+    keys = sorted((f"M{r:04d}", f"{d:02d}") for r in range(30) for d in range(1, 8))
+    es_client = _client([])
+    es_client.client = FakeCompositeClient(keys)
+
+    buckets = list(es_client.iter_composite(["rome_code", "location_department"], page_size=50))
+
+    assert [(b["key"]["rome_code"], b["key"]["location_department"]) for b in buckets] == keys
+    assert len(es_client.client.requests) == 6  # 5 pages (210 buckets) + page vide finale
+    assert es_client.client.requests[0]["aggs"]["facet"]["composite"]["sources"][0] == {
+        "rome_code": {"terms": {"field": "rome_code"}}
+    }
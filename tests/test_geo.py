@@ -0,0 +1,49 @@
+"""
+Tests unitaires du référentiel géographique hors ligne.
+"""
+
+import sys
+from pathlib import Path
+
+# Ajouter la racine du projet au PYTHONPATH
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from pipelines.ingest.geo import DEPARTMENT_REGIONS, REGIONS, lookup_location
+from pipelines.ingest.sources.francetravail.mapping import map_france_travail
+
+
+def test_every_department_has_a_region():
+    assert len(DEPARTMENT_REGIONS) == 101
+    assert all(region in REGIONS for region in DEPARTMENT_REGIONS.values())
+
+
+def test_lookup_by_commune_code():
+    assert lookup_location(commune_code="75056") == ("75", "Île-de-France")
+    assert lookup_location(commune_code="2B033") == ("2B", "Corse")
+    assert lookup_location(commune_code="97411") == ("974", "La Réunion")
+
+
+def test_lookup_by_postal_code():
+    assert lookup_location(postal_code="69003") == ("69", "Auvergne-Rhône-Alpes")
+    assert lookup_location(postal_code="01000") == ("01", "Auvergne-Rhône-Alpes")
+    assert lookup_location(postal_code="20090") == ("2A", "Corse")
+    assert lookup_location(postal_code="20200") == ("2B", "Corse")
+    assert lookup_location(postal_code="97133") == ("977", None)
+    assert lookup_location(postal_code="98000") == (None, None)
+
+
+def test_lookup_falls_back_to_label():
+    assert lookup_location(label="33 - Bordeaux") == ("33", "Nouvelle-Aquitaine")
+    assert lookup_location(label="Paris") == (None, None)
+
+
+def test_mapping_fills_department_and_region():
+    offer = map_france_travail({
+        "id": "1",
+        "lieuTravail": {"libelle": "35 - Rennes", "codePostal": "35000", "commune": "35238"},
+    })
+    assert offer.location_department == "35"
+    assert offer.location_region == "Bretagne"
+    assert offer.location_postal_code == "35000"
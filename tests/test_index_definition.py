@@ -0,0 +1,40 @@
+"""
+Tests des réglages et du mapping de l'index des offres (combinaisons refusées par Elasticsearch).
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ajouter la racine du projet au PYTHONPATH
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+pytest.importorskip("elasticsearch")
+
+from pipelines.storage.elasticsearch import ElasticsearchClient
+
+
+def _nested_fields(properties, prefix=""):
+    for name, field in properties.items():
+        if field.get("type") == "nested":
+            yield prefix + name
+        yield from _nested_fields(field.get("properties", {}), f"{prefix}{name}.")
+
+
+def _index_sort(settings):
+    index = settings.get("index", {})
+    return {key: value for key, value in {**index, **settings}.items() if key.startswith(("sort", "index.sort"))}
+
+
+def test_index_sort_is_never_combined_with_nested_fields():
+    es_client = ElasticsearchClient.__new__(ElasticsearchClient)
+    definition = es_client.index_definition()
+
+    nested = list(_nested_fields(definition["mappings"]["properties"]))
+    sort = _index_sort(definition["settings"])
+
+    # "cannot have nested fields when index sort is activated"
+    assert not (nested and sort), f"tri d'index {sort} incompatible avec les champs nested {nested}"
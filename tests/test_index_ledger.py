@@ -0,0 +1,183 @@
+"""
+Tests du registre des positions indexées (reprise incrémentale des fichiers JSONL).
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+# Ajouter la racine du projet au PYTHONPATH
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+scripts_dir = project_root / "scripts"
+if str(scripts_dir) not in sys.path:
+    sys.path.insert(0, str(scripts_dir))
+
+pytest.importorskip("dotenv")
+pytest.importorskip("elasticsearch")
+
+import index_to_elasticsearch as indexer
+from pipelines.storage import elasticsearch as es_module
+
+
+def _line(offer_id):
+    return (json.dumps({"id": offer_id, "title": f"Offre {offer_id}"}) + "\n").encode("utf-8")
+
+
+class RecordingClient:
+    """Client factice : mémorise les offres reçues par bulk_index_offers."""
+
+    def __init__(self, *args, **kwargs):
+        self.index_name = "jobmarket_v3"
+        self.partitioning = None
+        self.host = "http://localhost:9200"
+        self.client = MagicMock()
+        self.received = []
+
+    def bulk_index_offers(self, offers, **kwargs):
+        batch = list(offers)
+        self.received.extend(offer["id"] for offer in batch)
+        return {
+            "indexed": len(batch), "duplicates": 0, "errors": 0, "unchanged": 0,
+            "total": len(batch), "rejected": 0, "error_details": {}, "chunk_bytes": 1024
+        }
+
+    def count(self):
+        return len(self.received)
+
+    def load_content_hashes(self, store):
+        return 0
+
+    def get_stats(self):
+        return {"index_name": self.index_name, "total_documents": self.count(), "size_in_bytes": 0}
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "normalized" / "francetravail" / "offers.jsonl"
+    path.parent.mkdir(parents=True)
+    path.write_bytes(_line("1") + _line("2"))
+    return path
+
+
+def _index(path, ledger):
+    client = RecordingClient()
+    indexer.index_files(client, [path], ledger=ledger)
+    return client.received
+
+
+def test_resume_reads_only_appended_lines(data_file):
+    ledger = {}
+    assert _index(data_file, ledger) == ["1", "2"]
+    assert ledger["offers.jsonl"]["offset"] == data_file.stat().st_size
+
+    with data_file.open("ab") as f:
+        f.write(_line("3"))
+
+    assert indexer.resume_offset(data_file, ledger["offers.jsonl"]) == len(_line("1") + _line("2"))
+    assert _index(data_file, ledger) == ["3"]
+    # Fichier inchangé depuis : ignoré
+    assert _index(data_file, ledger) == []
+
+
+def test_resume_mid_file_starts_at_line_boundary(data_file):
+    position = {"offset": len(_line("1"))}
+
+    offers = list(indexer.iter_jsonl_file(data_file, position["offset"], position))
+
+    assert [offer["id"] for offer in offers] == ["2"]
+    assert position["offset"] == data_file.stat().st_size
+
+
+def test_truncated_file_restarts_from_zero(data_file):
+    ledger = {}
+    _index(data_file, ledger)
+
+    with data_file.open("r+b") as f:
+        f.truncate(len(_line("1")))
+
+    assert indexer.resume_offset(data_file, ledger["offers.jsonl"]) == 0
+    assert _index(data_file, ledger) == ["1"]
+
+
+def test_rewritten_file_restarts_from_zero(data_file):
+    ledger = {}
+    _index(data_file, ledger)
+
+    # Même taille et même inode, contenu différent
+    with data_file.open("r+b") as f:
+        f.write(_line("9"))
+    with data_file.open("ab") as f:
+        f.write(_line("3"))
+
+    assert indexer.resume_offset(data_file, ledger["offers.jsonl"]) == 0
+    assert _index(data_file, ledger) == ["9", "2", "3"]
+
+
+def test_replaced_file_restarts_from_zero(data_file):
+    ledger = {}
+    _index(data_file, ledger)
+
+    # Remplacement atomique (nouvel inode) par un fichier plus long
+    replacement = data_file.with_suffix(".tmp")
+    replacement.write_bytes(_line("1") + _line("2") + _line("3"))
+    os.replace(replacement, data_file)
+
+    assert indexer.resume_offset(data_file, ledger["offers.jsonl"]) == 0
+
+
+def test_trailing_partial_line_does_not_advance_offset(data_file):
+    complete = data_file.stat().st_size
+    with data_file.open("ab") as f:
+        f.write(b'{"id": "3", "title": "Off')
+
+    ledger = {}
+    assert _index(data_file, ledger) == ["1", "2"]
+    assert ledger["offers.jsonl"]["offset"] == complete
+
+    # Ligne terminée par le collecteur : lue au passage suivant
+    with data_file.open("ab") as f:
+        f.write(b're 3"}\n')
+    assert _index(data_file, ledger) == ["3"]
+
+
+def test_offset_not_advanced_after_errors(data_file):
+    client = RecordingClient()
+    client.bulk_index_offers = lambda offers, **kwargs: {
+        "indexed": 0, "duplicates": 0, "errors": len(list(offers)), "unchanged": 0,
+        "total": 2, "rejected": 0, "error_details": {}, "chunk_bytes": 1024
+    }
+    ledger = {}
+
+    indexer.index_files(client, [data_file], ledger=ledger)
+
+    assert "offers.jsonl" not in ledger
+
+
+@pytest.mark.parametrize("full_scan, expected", [(False, ["3"]), (True, ["1", "2", "3"])])
+def test_full_scan_ignores_ledger(data_file, tmp_path, monkeypatch, full_scan, expected):
+    clients = []
+
+    def make_client(*args, **kwargs):
+        clients.append(RecordingClient())
+        return clients[-1]
+
+    monkeypatch.setattr(es_module, "ElasticsearchClient", make_client)
+    monkeypatch.setenv("STORAGE_BACKEND", "elasticsearch")
+    monkeypatch.delenv("ES_PARTITIONING", raising=False)
+    argv = ["index_to_elasticsearch.py", "--data-dir", str(tmp_path), "--no-rollup"]
+
+    monkeypatch.setattr(sys, "argv", argv)
+    indexer.main()
+    with data_file.open("ab") as f:
+        f.write(_line("3"))
+
+    monkeypatch.setattr(sys, "argv", argv + (["--full-scan"] if full_scan else []))
+    indexer.main()
+
+    assert clients[-1].received == expected
@@ -0,0 +1,206 @@
+"""
+Tests des index versionnés (création, validation, bascule d'alias, nettoyage) sans cluster.
+"""
+
+import contextlib
+import json
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+# Ajouter la racine du projet au PYTHONPATH
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+scripts_dir = project_root / "scripts"
+if str(scripts_dir) not in sys.path:
+    sys.path.insert(0, str(scripts_dir))
+
+pytest.importorskip("dotenv")
+pytest.importorskip("elasticsearch")
+
+import index_to_elasticsearch as indexer
+from pipelines.storage import elasticsearch as es_module
+from pipelines.storage.content_hashes import ContentHashStore
+from pipelines.storage.elasticsearch import ElasticsearchClient
+from pipelines.storage.query_cache import QueryCache
+
+VERSIONS = ["jobmarket_v3-20260101000000", "jobmarket_v3-20260201000000", "jobmarket_v3-20260301000000", "jobmarket_v3-20260401000000"]
+
+
+def _client(alias_targets=(), concrete_index=False, versions=VERSIONS):
+    client = ElasticsearchClient.__new__(ElasticsearchClient)
+    client.index_name = "jobmarket_v3"
+    client.partitioning = None
+    client.query_cache = QueryCache(max_entries=0)
+    client.client = MagicMock()
+    client.client.indices.exists_alias.return_value = bool(alias_targets)
+    client.client.indices.exists.return_value = bool(alias_targets) or concrete_index
+
+    def get_alias(name=None, index=None):
+        if name is not None:
+            return {target: {} for target in alias_targets}
+        # Index versionnés et index mensuels : seuls les premiers sont des versions
+        return {**{v: {} for v in versions}, "jobmarket_v3-2026.01": {}}
+
+    client.client.indices.get_alias.side_effect = get_alias
+    return client
+
+
+def _deleted(client):
+    return [c.kwargs["index"] for c in client.client.indices.delete.call_args_list]
+
+
+def test_swap_from_legacy_concrete_index():
+    client = _client(concrete_index=True)
+
+    previous = client.swap_alias(VERSIONS[-1])
+
+    assert previous == []
+    # Ancien index physique portant le nom de l'alias : supprimé dans la même bascule
+    assert client.client.indices.update_aliases.call_args.kwargs["actions"] == [
+        {"remove_index": {"index": "jobmarket_v3"}},
+        {"add": {"index": VERSIONS[-1], "alias": "jobmarket_v3", "is_write_index": True}},
+    ]
+
+
+def test_swap_between_versions_keeps_previous_index():
+    client = _client(alias_targets=[VERSIONS[0]])
+
+    assert client.swap_alias(VERSIONS[1]) == [VERSIONS[0]]
+    actions = client.client.indices.update_aliases.call_args.kwargs["actions"]
+    assert actions == [
+        {"remove": {"index": VERSIONS[0], "alias": "jobmarket_v3"}},
+        {"add": {"index": VERSIONS[1], "alias": "jobmarket_v3", "is_write_index": True}},
+    ]
+    assert not any("remove_index" in action for action in actions)
+
+
+@pytest.mark.parametrize("new_count, min_ratio, valid", [(85, 0.9, False), (95, 0.9, True), (85, 0.8, True), (0, 0.0, False)])
+def test_validate_index_against_active_version(new_count, min_ratio, valid):
+    client = _client(alias_targets=[VERSIONS[0]])
+    counts = {VERSIONS[1]: new_count, "jobmarket_v3": 100}
+    client.client.count.side_effect = lambda index: {"count": counts[index]}
+
+    ok, reason = client.validate_index(VERSIONS[1], min_ratio=min_ratio)
+
+    assert ok is valid
+    if not valid:
+        assert VERSIONS[1] in reason
+        client.client.search.assert_not_called()
+
+
+@pytest.mark.parametrize("keep, deleted", [(0, VERSIONS[:2] + VERSIONS[3:]), (1, VERSIONS[:2]), (2, VERSIONS[:1]), (5, [])])
+def test_garbage_collect_keeps_recent_inactive_versions(keep, deleted):
+    # Version active au milieu : jamais supprimée, quel que soit `keep`
+    client = _client(alias_targets=[VERSIONS[2]])
+    hashes = ContentHashStore()
+    hashes.set("ft:1", "h1")
+
+    assert client.garbage_collect_versions(keep=keep, hashes=hashes) == deleted
+    assert _deleted(client) == deleted
+    assert VERSIONS[2] not in _deleted(client)
+    assert len(hashes) == 1
+
+
+def test_garbage_collect_clears_hashes_without_active_version():
+    client = _client(alias_targets=[], concrete_index=False)
+    hashes = ContentHashStore()
+    hashes.set("ft:1", "h1")
+
+    client.garbage_collect_versions(keep=1, hashes=hashes)
+
+    assert _deleted(client) == VERSIONS[:3]
+    assert len(hashes) == 0
+
+
+class RebuildClient:
+    """Client factice pour le chemin de reconstruction de index_to_elasticsearch."""
+
+    def __init__(self, valid):
+        self.index_name = "jobmarket_v3"
+        self.partitioning = None
+        self.host = "http://localhost:9200"
+        self.client = MagicMock()
+        self.client.indices.exists.return_value = True
+        self.valid = valid
+        self.calls = []
+        self.received = []
+
+    def create_versioned_index(self):
+        self.calls.append("create")
+        return VERSIONS[-1]
+
+    def with_index(self, index_name):
+        self.calls.append(("with_index", index_name))
+        return self
+
+    @contextlib.contextmanager
+    def bulk_load(self, forcemerge_segments=None):
+        yield
+
+    def bulk_index_offers(self, offers, **kwargs):
+        batch = list(offers)
+        self.received.extend(offer["id"] for offer in batch)
+        return {
+            "indexed": len(batch), "duplicates": 0, "errors": 0, "unchanged": 0,
+            "total": len(batch), "rejected": 0, "error_details": {}, "chunk_bytes": 1024
+        }
+
+    def count(self):
+        return len(self.received)
+
+    def validate_index(self, index, min_ratio=0.9):
+        self.calls.append(("validate", index, min_ratio))
+        return self.valid, "10 documents" if self.valid else "trop peu de documents"
+
+    def swap_alias(self, new_index):
+        self.calls.append(("swap", new_index))
+        return []
+
+    def garbage_collect_versions(self, keep=1, hashes=None):
+        self.calls.append(("gc", keep))
+        return []
+
+    def get_stats(self):
+        return {"index_name": self.index_name, "total_documents": self.count(), "size_in_bytes": 0}
+
+
+def _run_rebuild(tmp_path, monkeypatch, valid):
+    data_file = tmp_path / "normalized" / "francetravail" / "offers.jsonl"
+    data_file.parent.mkdir(parents=True)
+    data_file.write_text(json.dumps({"id": "1", "title": "Data engineer"}) + "\n", encoding="utf-8")
+    client = RebuildClient(valid)
+    monkeypatch.setattr(es_module, "ElasticsearchClient", lambda *args, **kwargs: client)
+    monkeypatch.setenv("STORAGE_BACKEND", "elasticsearch")
+    monkeypatch.delenv("ES_PARTITIONING", raising=False)
+    monkeypatch.setattr(sys, "argv", [
+        "index_to_elasticsearch.py", "--data-dir", str(tmp_path), "--no-rollup",
+        "--force", "--min-ratio", "0.5", "--keep-versions", "2",
+    ])
+    return client
+
+
+def test_rejected_rebuild_deletes_new_version_and_keeps_alias(tmp_path, monkeypatch):
+    client = _run_rebuild(tmp_path, monkeypatch, valid=False)
+
+    with pytest.raises(SystemExit) as exit_info:
+        indexer.main()
+
+    assert exit_info.value.code == 1
+    assert ("validate", VERSIONS[-1], 0.5) in client.calls
+    client.client.indices.delete.assert_called_once_with(index=VERSIONS[-1])
+    assert not any(call[0] in ("swap", "gc") for call in client.calls if isinstance(call, tuple))
+
+
+def test_accepted_rebuild_swaps_alias_then_collects_old_versions(tmp_path, monkeypatch):
+    client = _run_rebuild(tmp_path, monkeypatch, valid=True)
+
+    indexer.main()
+
+    assert client.received == ["1"]
+    steps = [call for call in client.calls if isinstance(call, tuple) and call[0] in ("validate", "swap", "gc")]
+    assert steps == [("validate", VERSIONS[-1], 0.5), ("swap", VERSIONS[-1]), ("gc", 2)]
+    client.client.indices.delete.assert_not_called()
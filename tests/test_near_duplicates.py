@@ -0,0 +1,105 @@
+"""
+Tests unitaires de la détection de quasi-doublons (MinHash + LSH).
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ajouter la racine du projet au PYTHONPATH
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from pipelines.analytics import NearDuplicateIndex
+
+DESCRIPTION = (
+    "Au sein de l'équipe data, vous concevez et maintenez les pipelines d'ingestion "
+    "Spark et Airflow, modélisez l'entrepôt de données et accompagnez les analystes "
+    "sur la qualité des données. Environnement AWS, Python et SQL."
+)
+
+
+def test_reposted_offer_is_grouped_incrementally(tmp_path):
+    index = NearDuplicateIndex()
+    index.add([
+        {"id": "ft:1", "title": "Data engineer", "description": DESCRIPTION},
+        {"id": "ft:2", "title": "Boulanger", "description": "Boulangerie artisanale recherche un boulanger."},
+    ])
+    state = tmp_path / "index.json"
+    index.save(state)
+
+    index = NearDuplicateIndex.load(state)
+    added = index.add([
+        {"id": "ft:1", "title": "Data engineer", "description": DESCRIPTION},  # déjà indexée
+        {"id": "ft:3", "title": "Data engineer (H/F)", "description": DESCRIPTION},
+    ])
+    assert added == 1
+    assert index.group_of("ft:3") == "ft:1"
+    assert index.group_of("ft:2") == "ft:2"
+    assert index.clusters() == [["ft:1", "ft:3"]]
+
+
+def test_empty_texts_are_not_grouped():
+    index = NearDuplicateIndex()
+    index.add([{"id": "a"}, {"id": "b"}])
+    assert index.clusters() == []
+
+
+def test_edited_offer_is_resigned_and_leaves_its_group():
+    index = NearDuplicateIndex()
+    index.add([
+        {"id": "ft:1", "title": "Data engineer", "description": DESCRIPTION},
+        {"id": "ft:2", "title": "Data engineer (H/F)", "description": DESCRIPTION},
+        {"id": "ft:3", "title": "Boulanger", "description": "Boulangerie artisanale recherche un boulanger."},
+    ])
+    assert index.group_of("ft:2") == "ft:1"
+
+    # Même identifiant, contenu devenu différent
+    changed = index.add([{"id": "ft:1", "title": "Boulanger", "description": "Boulangerie artisanale recherche un boulanger."}])
+
+    assert changed == 1 and len(index) == 3
+    assert index.group_of("ft:2") == "ft:2"
+    assert index.group_of("ft:3") == "ft:1"
+    # Plus aucune entrée de l'ancienne signature dans les buckets
+    old = index.signatures([f"Data engineer {DESCRIPTION}"])[0]
+    for band, key in enumerate(index._band_keys(old)):
+        assert 0 not in index._buckets[band].get(key, [])
+
+
+def test_unchanged_offers_are_skipped_by_content():
+    index = NearDuplicateIndex()
+    offer = {"id": "ft:1", "title": "Data engineer", "description": DESCRIPTION}
+    index.add([offer])
+
+    assert index.add([offer, dict(offer)]) == 0
+    # Dernière occurrence d'un identifiant répété dans le batch
+    assert index.add([{**offer, "title": "Data analyst"}, offer]) == 0
+
+
+def test_saved_state_roundtrips_without_pickle(tmp_path):
+    index = NearDuplicateIndex(threshold=0.7)
+    index.add([
+        {"id": "ft:1", "title": "Data engineer", "description": DESCRIPTION},
+        {"id": "ft:2", "title": "Data engineer (H/F)", "description": DESCRIPTION},
+        {"id": "ft:3", "title": "Boulanger", "description": "Boulangerie artisanale recherche un boulanger."},
+    ])
+    state = tmp_path / "index.json"
+    index.save(state)
+
+    reloaded = NearDuplicateIndex.load(state)
+    assert reloaded.threshold == 0.7 and reloaded.groups() == index.groups()
+    assert reloaded._buckets == index._buckets
+    # Offres inchangées reconnues, nouvelle quasi-copie rattachée au groupe existant
+    assert reloaded.add([{"id": "ft:1", "title": "Data engineer", "description": DESCRIPTION}]) == 0
+    reloaded.add([{"id": "ft:4", "title": "Data engineer H/F", "description": DESCRIPTION}])
+    assert reloaded.group_of("ft:4") == "ft:1"
+
+    # Tableaux d'un autre index : rejeté
+    other = NearDuplicateIndex()
+    other.add([{"id": "x", "title": "Boulanger"}])
+    other.save(tmp_path / "other.json")
+    (tmp_path / "other.npz").replace(tmp_path / "index.npz")
+    with pytest.raises(ValueError):
+        NearDuplicateIndex.load(state)
@@ -0,0 +1,49 @@
+"""
+Tests unitaires du registre d'adapters de la normalisation.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ajouter la racine du projet au PYTHONPATH
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from pipelines.ingest import normalizer
+
+
+def test_adapters_are_imported_lazily():
+    code = (
+        "import sys; import pipelines.ingest.normalizer as n; "
+        "assert 'pipelines.ingest.sources.francetravail.mapping' not in sys.modules; "
+        "n.normalize_offer({'id': '1'}, 'francetravail'); "
+        "assert 'pipelines.ingest.sources.francetravail.mapping' in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=project_root, check=True)
+
+
+def test_normalize_offer_stamps_version_and_hash():
+    offer = normalizer.normalize_offer({"id": "42", "intitule": "Data engineer"}, "francetravail")
+    assert offer.id == "francetravail:42"
+    assert offer.mapping_version == normalizer.mapping_version("francetravail")
+    assert offer.raw_hash == normalizer.raw_content_hash({"intitule": "Data engineer", "id": "42"})
+    assert normalizer.registry_stats()["francetravail"]["loaded"] is True
+
+
+def test_register_source_by_module_path():
+    normalizer.register_source("test", "pipelines.ingest.sources.francetravail.mapping:map_france_travail")
+    try:
+        assert normalizer.normalize_offer({"id": "1"}, "test").source == "francetravail"
+        assert "test" in normalizer.available_sources()
+    finally:
+        normalizer._SOURCE_PATHS.pop("test", None)
+        normalizer._loaded.pop("test", None)
+
+
+def test_unknown_source():
+    with pytest.raises(ValueError):
+        normalizer.normalize_offer({}, "inconnue")
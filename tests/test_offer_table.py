@@ -0,0 +1,91 @@
+"""
+Tests unitaires de la table d'offres à colonnes encodées (pipelines.analytics).
+"""
+
+import sys
+from pathlib import Path
+
+# Ajouter la racine du projet au PYTHONPATH
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from pipelines.analytics import OfferTable
+
+
+def _offers():
+    return [
+        {"id": "1", "contract_type": "CDI", "rome_code": "M1805"},
+        {"id": "2", "contract_type": "CDD", "rome_code": "M1805"},
+        {"id": "3", "contract_type": "CDI", "rome_code": "M1419"},
+        {"id": "4", "contract_type": None, "rome_code": "M1419"},
+        {"id": "1", "contract_type": "CDI", "rome_code": "M1805"},  # doublon
+    ]
+
+
+def test_value_counts_on_codes():
+    table = OfferTable(fields=["contract_type", "rome_code"])
+    table.extend(_offers())
+    assert len(table) == 4
+    assert table.duplicates == 1
+    assert table.value_counts("contract_type") == [("CDI", 2), ("CDD", 1)]
+    assert table.columns["contract_type"].null_count() == 1
+
+
+def test_group_counts_skips_missing_values():
+    table = OfferTable(fields=["contract_type", "rome_code"])
+    table.extend(_offers())
+    assert table.group_counts(["rome_code", "contract_type"]) == {
+        ("M1805", "CDI"): 1,
+        ("M1805", "CDD"): 1,
+        ("M1419", "CDI"): 1,
+    }
+
+
+def test_last_duplicate_wins():
+    table = OfferTable(fields=["contract_type"])
+    table.extend([{"id": "1", "contract_type": "CDD"}, {"id": "1", "contract_type": "CDI"}])
+    assert table.value_counts("contract_type") == [("CDI", 1)]
+
+
+def test_to_frame_uses_categoricals():
+    table = OfferTable(fields=["contract_type"])
+    table.extend(_offers())
+    frame = table.to_frame()
+    assert str(frame["contract_type"].dtype) == "category"
+    assert frame["contract_type"].isna().sum() == 1
+
+
+def test_append_after_reading_codes():
+    table = OfferTable(fields=["contract_type"])
+    table.extend(_offers()[:2])
+    codes = table.columns["contract_type"].codes
+
+    # Aucune vue ne verrouille le tableau de codes
+    table.append({"id": "9", "contract_type": "CDI"})
+    assert len(codes) == 2
+    assert table.value_counts("contract_type") == [("CDI", 2), ("CDD", 1)]
+
+
+def test_group_counts_with_high_cardinality_product():
+    # 2000 × 1000 × 600 combinaisons possibles : pas de tableau dense
+    offers = [
+        {"id": str(n), "company": f"c{n % 2000}", "city": f"v{n % 1000}", "rome_code": f"r{n % 600}"}
+        for n in range(6000)
+    ]
+    offers.append({"id": "x", "company": "c0", "city": None, "rome_code": "r0"})
+    table = OfferTable(fields=["company", "city", "rome_code"])
+    table.extend(offers)
+
+    counts = table.group_counts(["company", "city", "rome_code"])
+
+    expected = {}
+    for offer in offers[:-1]:
+        key = (offer["company"], offer["city"], offer["rome_code"])
+        expected[key] = expected.get(key, 0) + 1
+    assert counts == expected
+
+
+def test_group_counts_on_empty_table():
+    table = OfferTable(fields=["contract_type", "rome_code"])
+    assert table.group_counts(["rome_code", "contract_type"]) == {}
@@ -0,0 +1,78 @@
+"""
+Tests unitaires des parseurs du mapping France Travail et de leurs caches.
+"""
+
+import sys
+from pathlib import Path
+
+# Ajouter la racine du projet au PYTHONPATH
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from pipelines.ingest.memo import MemoizedParser, cache_stats
+from pipelines.ingest.sources.francetravail.mapping import (
+    _parse_salary,
+    _parse_weekly_hours,
+    map_france_travail,
+    warm_parser_caches,
+)
+
+
+def test_parse_salary():
+    result = _parse_salary({"libelle": "Mensuel de 3000.0 Euros à 3500.0 Euros", "commentaire": "selon profil"})
+    assert result == (3000.0, 3500.0, "monthly", "selon profil")
+    assert _parse_salary({}) == (None, None, None, None)
+
+
+def test_parse_weekly_hours_is_memoized():
+    _parse_weekly_hours.cache_clear()
+    assert _parse_weekly_hours("35H/semaine") == 35.0
+    assert _parse_weekly_hours("35H/semaine") == 35.0
+    stats = _parse_weekly_hours.cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_memoized_parser_is_bounded():
+    memo = MemoizedParser(str.upper, maxsize=2)
+    for value in ["a", "b", "c", "a"]:
+        memo(value)
+    assert memo.cache_stats()["size"] == 2
+    assert memo.misses == 4
+
+
+def test_warm_parser_caches_reserves_batch_cardinality():
+    raw_offers = [{"dureeTravailLibelle": f"{h}H/semaine"} for h in range(2000)]
+    distinct = warm_parser_caches(raw_offers)
+    assert distinct["weekly_hours"] == 2000
+    assert cache_stats()["weekly_hours"]["maxsize"] >= 2000
+
+
+def test_map_france_travail_classifies_experience():
+    offer = map_france_travail({"id": "1", "experienceLibelle": "Débutant accepté"})
+    assert offer.experience_level == "junior"
+
+
+def test_primed_values_are_not_counted_as_misses():
+    memo = MemoizedParser(str.upper)
+    assert memo.prime(["a", "b", "a", None]) == 2
+    assert memo("a") == "A"
+    memo("c")
+
+    stats = memo.cache_stats()
+    assert (stats["primed"], stats["hits"], stats["misses"]) == (2, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_prime_keeps_cached_batch_values():
+    memo = MemoizedParser(str.upper, maxsize=3)
+    for value in ["a", "b", "c"]:
+        memo(value)  # "a" est la plus ancienne entrée du cache
+    memo.prime(["a", "d", "e"])
+
+    # "a" fait partie du batch : b et c sont évincés, pas a
+    assert set(memo._cache) == {"a", "d", "e"}
+    memo("a")
+    assert (memo.hits, memo.misses) == (1, 3)
@@ -0,0 +1,179 @@
+"""
+Tests du partitionnement mensuel (choix des index, template, chargement massif) sans cluster.
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+# Ajouter la racine du projet au PYTHONPATH
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+pytest.importorskip("elasticsearch")
+
+from pipelines.storage import elasticsearch as es_module
+from pipelines.storage.content_hashes import ContentHashStore
+from pipelines.storage.elasticsearch import ElasticsearchClient
+from pipelines.storage.query_cache import QueryCache
+
+PARTITIONS = ["jobmarket_v3-2025.12", "jobmarket_v3-2026.01", "jobmarket_v3-2026.02", "jobmarket_v3-2026.03"]
+
+
+@pytest.fixture
+def es_client():
+    client = ElasticsearchClient.__new__(ElasticsearchClient)
+    client.index_name = "jobmarket_v3"
+    client.partitioning = "monthly"
+    client.query_cache = QueryCache(max_entries=0)
+    client.client = MagicMock()
+    client.client.indices.get_alias.return_value = {name: {} for name in PARTITIONS + ["jobmarket_v3-20260101093000"]}
+    client.client.search.return_value = {"hits": {"hits": []}}
+    return client
+
+
+def _dated(start, end, extra=None):
+    clauses = [{"range": {"published_at": {"gte": start, "lte": end}}}]
+    return {"query": {"bool": {"must": [extra or {"match_all": {}}], "filter": clauses}}}
+
+
+def test_search_queries_only_months_of_the_range(es_client):
+    es_client.search(_dated("2026-01-15", "2026-02-10"))
+
+    assert es_client.client.search.call_args.kwargs["index"] == "jobmarket_v3-2026.01,jobmarket_v3-2026.02"
+
+
+def test_search_without_date_bound_uses_alias(es_client):
+    es_client.search({"query": {"bool": {"should": [{"range": {"published_at": {"gte": "2026-03-01"}}}]}}})
+
+    # Un range facultatif (should) ne restreint pas les résultats
+    assert es_client.client.search.call_args.kwargs["index"] == "jobmarket_v3"
+
+
+def test_search_outside_existing_months_skips_cluster(es_client):
+    result = es_client.search(_dated("2024-01-01", "2024-06-30"))
+
+    assert result["hits"]["total"]["value"] == 0
+    es_client.client.search.assert_not_called()
+
+
+def test_multi_search_prunes_each_query(es_client):
+    es_client.client.msearch.return_value = {"responses": [{"hits": {}}, {"hits": {}}]}
+
+    results = es_client.multi_search({
+        "recent": _dated("2026-03-01", "now"),
+        "all": {"size": 0},
+        "old": _dated("2020-01-01", "2020-12-31"),
+    })
+
+    headers = es_client.client.msearch.call_args.kwargs["searches"][::2]
+    assert [header["index"] for header in headers] == ["jobmarket_v3-2026.03", "jobmarket_v3"]
+    assert results["old"]["hits"]["total"]["value"] == 0
+
+
+def test_partition_template_refuses_non_partitioned_alias(es_client):
+    es_client.client.indices.exists.return_value = True
+    es_client.client.indices.exists_alias.return_value = True
+    es_client.client.indices.get_alias.return_value = {"jobmarket_v3-20260101093000": {}}
+
+    with pytest.raises(RuntimeError, match="jobmarket_v3-20260101093000"):
+        es_client.put_partition_template()
+    es_client.client.indices.put_index_template.assert_not_called()
+
+
+def test_partition_template_refuses_concrete_index(es_client):
+    es_client.client.indices.exists.return_value = True
+    es_client.client.indices.exists_alias.return_value = False
+
+    with pytest.raises(RuntimeError):
+        es_client.put_partition_template()
+
+
+def test_bulk_load_restores_settings_of_each_partition(es_client):
+    es_client.client.indices.get_settings.return_value = {
+        "jobmarket_v3-2026.01": {"settings": {"index.refresh_interval": "30s", "index.number_of_replicas": "0"}},
+        "jobmarket_v3-2026.02": {"settings": {"index.number_of_replicas": "1"}},
+    }
+
+    with es_client.bulk_load():
+        pass
+
+    restored = {
+        call.kwargs["index"]: call.kwargs["settings"]
+        for call in es_client.client.indices.put_settings.call_args_list[1:]
+    }
+    assert restored == {
+        "jobmarket_v3-2026.01": {"index.refresh_interval": "30s", "index.number_of_replicas": "0"},
+        "jobmarket_v3-2026.02": {"index.refresh_interval": None, "index.number_of_replicas": "1"},
+    }
+
+
+def test_retention_removes_deleted_offers_from_sidecar(es_client, monkeypatch):
+    class FixedDate(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2026, 3, 15)
+
+    monkeypatch.setattr(es_module, "datetime", FixedDate)
+    monkeypatch.setattr(es_module.helpers, "scan", lambda client, index, **kwargs: [{"_id": f"{index}-offer"}])
+    es_client.client.indices.get_settings.return_value = {}
+    hashes = ContentHashStore()
+    hashes.update((f"{name}-offer", "h") for name in PARTITIONS)
+
+    result = es_client.apply_retention(keep_months=3, readonly_after_months=12, hashes=hashes)
+
+    assert result["deleted"] == ["jobmarket_v3-2025.12"]
+    assert "jobmarket_v3-2025.12-offer" not in hashes and len(hashes) == 3
+
+
+def test_generate_actions_forgets_acknowledged_offers(es_client, monkeypatch):
+    monkeypatch.setattr(es_module, "_QUEUED_PRUNE_MIN", 2)
+    es_client.partitioning = None
+    hashes = ContentHashStore()
+    offers = [{"id": str(i), "title": f"Offre {i}"} for i in range(6)]
+    actions = es_client._generate_actions(iter(offers + offers[:1]), hashes, {"unchanged": 0, "total": 0})
+
+    sent = []
+    for action in actions:
+        sent.append(action["_id"])
+        # Acquittement immédiat, comme après chaque chunk
+        hashes.set(action["_id"], action["_source"]["content_hash"])
+
+    # L'offre répétée reste reconnue après l'élagage des offres en attente
+    assert sent == [str(i) for i in range(6)]
+
+
+def test_bulk_load_tunes_partitions_created_during_load(es_client):
+    listed = [PARTITIONS[:1], PARTITIONS[:2]]  # un nouveau mois créé par le chargement
+    es_client.client.indices.get_alias.side_effect = lambda index: {name: {} for name in listed.pop(0)}
+    es_client.client.indices.get_settings.return_value = {PARTITIONS[0]: {"settings": {}}}
+
+    with es_client.bulk_load():
+        pass
+
+    templates = [c.kwargs["template"]["settings"] for c in es_client.client.indices.put_index_template.call_args_list]
+    assert (templates[0]["refresh_interval"], templates[0]["number_of_replicas"]) == ("-1", 0)
+    assert "refresh_interval" not in templates[-1] and templates[-1]["number_of_replicas"] == 0
+    restored = {c.kwargs["index"]: c.kwargs["settings"] for c in es_client.client.indices.put_settings.call_args_list[1:]}
+    assert restored == {
+        PARTITIONS[0]: {"index.refresh_interval": None, "index.number_of_replicas": None},
+        PARTITIONS[1]: {"index.refresh_interval": None, "index.number_of_replicas": 0},
+    }
+
+
+def test_bulk_load_refresh_tolerates_missing_partitions(es_client):
+    es_client.client.indices.get_alias.return_value = {}
+    es_client.client.indices.get_settings.return_value = {}
+
+    with pytest.raises(ValueError):
+        with es_client.bulk_load():
+            raise ValueError("erreur de chargement")
+
+    # Aucun index créé : le refresh ne doit pas masquer l'erreur d'origine
+    assert es_client.client.indices.refresh.call_args.kwargs == {
+        "index": "jobmarket_v3", "ignore_unavailable": True, "allow_no_indices": True
+    }
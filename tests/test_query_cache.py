@@ -0,0 +1,73 @@
+"""
+Tests unitaires du cache local des résultats de recherche.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ajouter la racine du projet au PYTHONPATH
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+pytest.importorskip("elasticsearch")
+
+from pipelines.storage.query_cache import QueryCache
+
+
+def test_key_is_independent_of_key_order():
+    a = QueryCache.key("jobmarket_v3", {"size": 0, "aggs": {"by": {"terms": {"field": "x", "size": 5}}}})
+    b = QueryCache.key("jobmarket_v3", {"aggs": {"by": {"terms": {"size": 5, "field": "x"}}}, "size": 0})
+
+    assert a == b
+    assert a != QueryCache.key("other", {"size": 0, "aggs": {"by": {"terms": {"field": "x", "size": 5}}}})
+
+
+def test_lru_eviction_and_hit_rate():
+    cache = QueryCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 1)
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("pipelines.storage.query_cache.time.monotonic", lambda: now[0])
+    cache = QueryCache(ttl=10)
+    cache.put("a", 1)
+
+    now[0] += 9
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_invalidate_related_indices():
+    cache = QueryCache()
+    alias = QueryCache.key("jobmarket_v3", {"size": 0})
+    partitions = QueryCache.key("jobmarket_v3-2026.01,jobmarket_v3-2026.02", {"size": 0})
+    other = QueryCache.key("jobmarket_v3_test", {"size": 0})
+    for key in (alias, partitions, other):
+        cache.put(key, {})
+
+    assert cache.invalidate("jobmarket_v3-2026.02") == 2
+    assert cache.get(other) == {}
+    assert cache.invalidate() == 1
+
+
+def test_disabled_cache_stores_nothing():
+    cache = QueryCache(max_entries=0)
+    cache.put("a", 1)
+
+    assert not cache.enabled
+    assert cache.get("a") is None
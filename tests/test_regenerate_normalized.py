@@ -0,0 +1,116 @@
+"""
+Tests de la régénération parallèle des fichiers normalisés (tranches, réassemblage ordonné).
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ajouter la racine du projet au PYTHONPATH
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+maintenance_dir = project_root / "scripts" / "maintenance"
+if str(maintenance_dir) not in sys.path:
+    sys.path.insert(0, str(maintenance_dir))
+
+import regenerate_normalized as regen
+from pipelines.ingest.normalizer import mapping_version, raw_content_hash
+
+
+def _write_raw(path, offers, trailing_newline=True):
+    lines = [json.dumps(offer) if isinstance(offer, dict) else offer for offer in offers]
+    path.write_text("\n".join(lines) + ("\n" if trailing_newline else ""), encoding="utf-8")
+
+
+@pytest.mark.parametrize("trailing_newline", [True, False])
+@pytest.mark.parametrize("shard_bytes", [1, 7, 40, 10_000])
+def test_shards_end_on_line_boundaries(tmp_path, shard_bytes, trailing_newline):
+    path = tmp_path / "raw.jsonl"
+    _write_raw(path, [{"id": str(i), "intitule": "x" * (i * 13 % 50)} for i in range(20)], trailing_newline)
+    data = path.read_bytes()
+
+    shards = regen.compute_shards(path, shard_bytes)
+
+    assert shards[0][0] == 0 and shards[-1][1] == len(data)
+    for (_, end), (next_start, _) in zip(shards, shards[1:]):
+        # Tranches contiguës, coupées juste après un saut de ligne
+        assert end == next_start and data[end - 1:end] == b"\n"
+    assert b"".join(data[start:end] for start, end in shards) == data
+
+
+def test_empty_file_has_no_shard(tmp_path):
+    path = tmp_path / "raw.jsonl"
+    path.write_bytes(b"")
+
+    assert regen.compute_shards(path) == []
+
+
+def _result(rows, invalid=(), failed=(), lines=None):
+    return {
+        "rows": rows,
+        "errors": len(invalid) + len(failed),
+        "invalid": list(invalid),
+        "failed": list(failed),
+        "lines": lines or len(rows) + len(invalid) + len(failed),
+    }
+
+
+def test_writer_merges_shards_in_file_order(tmp_path, capsys):
+    version = mapping_version("francetravail")
+    existing = [{"id": "francetravail:2", "raw_hash": "h2", "mapping_version": version, "collected_at": "2026-01-01"}]
+    raw_path = tmp_path / "raw.jsonl"
+    raw_path.write_text("", encoding="utf-8")
+    normalized_path = tmp_path / "normalized.jsonl"
+    writer = regen.PartitionWriter(raw_path, normalized_path, 3, existing, version)
+
+    writer.add(2, _result([("h4", {"id": "francetravail:4"})], invalid=[(1, "Expecting value")]))
+    writer.add(1, _result([("h3", {"id": "francetravail:3"})], failed=[(2, "5", "date invalide")]))
+    # Rien n'est écrit tant que la première tranche manque
+    assert not writer.done and writer.stats["total"] == 0
+    writer.add(0, _result([("h1", {"id": "francetravail:1"}), ("h2", None)]))
+
+    assert writer.done
+    stats = writer.finalize()
+    ids = [json.loads(line)["id"] for line in normalized_path.read_text(encoding="utf-8").splitlines()]
+    assert ids == ["francetravail:1", "francetravail:2", "francetravail:3", "francetravail:4"]
+    assert stats["reused"] == 1 and stats["remapped"] == 3 and stats["errors"] == 2
+    # Numéro de ligne dans le fichier raw, et non dans la tranche
+    out = capsys.readouterr().out
+    assert "Erreur ligne 5 (raw.jsonl): Expecting value" in out
+    assert "Erreur de normalisation ligne 4 (raw.jsonl, offre 5): date invalide" in out
+
+
+def test_normalize_shard_reports_invalid_lines_and_skips_current_offers(tmp_path):
+    raw_path = tmp_path / "raw.jsonl"
+    current = {"id": "1", "intitule": "Data engineer"}
+    _write_raw(raw_path, [current, "{pas du json", {"id": "2", "intitule": "Data analyst"}])
+    regen._init_worker({"raw.jsonl": frozenset({raw_content_hash(current)})})
+    try:
+        result = regen.normalize_shard(str(raw_path), 0, raw_path.stat().st_size)
+    finally:
+        regen._init_worker({})
+
+    assert [normalized is None for _, normalized in result["rows"]] == [True, False]
+    assert result["rows"][1][1]["id"] == "francetravail:2"
+    assert [line for line, _ in result["invalid"]] == [2]
+    assert result["errors"] == 1 and result["lines"] == 3
+
+
+def test_normalize_shard_reports_mapping_errors(tmp_path, monkeypatch):
+    raw_path = tmp_path / "raw.jsonl"
+    _write_raw(raw_path, [{"id": "1", "intitule": "Data engineer"}, {"id": "2", "intitule": "Data analyst"}])
+    real_normalize = regen.normalize_offer
+
+    def normalize(offer, source):
+        if offer["id"] == "2":
+            raise ValueError("salaire illisible")
+        return real_normalize(offer, source)
+
+    monkeypatch.setattr(regen, "normalize_offer", normalize)
+    result = regen.normalize_shard(str(raw_path), 0, raw_path.stat().st_size)
+
+    assert len(result["rows"]) == 1 and result["errors"] == 1
+    assert result["failed"] == [(2, "2", "salaire illisible")]
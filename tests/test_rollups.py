@@ -0,0 +1,78 @@
+"""
+Tests unitaires de la synthèse quotidienne (jours touchés, intervalles, documents de synthèse).
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ajouter la racine du projet au PYTHONPATH
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+pytest.importorskip("elasticsearch")
+
+from pipelines.storage.rollups import DailyRollup, day_ranges, offer_day, record_days
+
+
+def test_offer_day_uses_utc():
+    assert offer_day({"published_at": "2026-01-15T10:00:00Z"}) == "2026-01-15"
+    assert offer_day({"published_at": "2026-01-16T00:30:00+01:00"}) == "2026-01-15"
+    assert offer_day({"published_at": "2026-01-16"}) == "2026-01-16"
+    assert offer_day({"published_at": "hier"}) is None
+    assert offer_day({}) is None
+
+
+def test_record_days_passes_offers_through():
+    offers = [{"id": "1", "published_at": "2026-01-15T10:00:00Z"}, {"id": "2"}]
+    days = set()
+
+    assert list(record_days(iter(offers), days)) == offers
+    assert days == {"2026-01-15"}
+
+
+def test_day_ranges_merge_consecutive_days():
+    days = ["2026-01-03", "2026-01-01", "2026-01-02", "2026-01-05", "2025-12-31"]
+
+    assert day_ranges(days) == [("2025-12-31", "2026-01-04"), ("2026-01-05", "2026-01-06")]
+    assert day_ranges([]) == []
+
+
+class FakeOffersClient:
+    index_name = "jobmarket_v3"
+    client = None
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.calls = []
+
+    def iter_composite(self, sources, query=None, aggs=None, page_size=1000):
+        self.calls.append({"sources": sources, "query": query, "aggs": aggs})
+        return iter(self.buckets)
+
+
+def test_summaries_build_one_document_per_bucket():
+    salary = {"count": 2, "sum": 80000.0, "min": 35000.0, "max": 45000.0}
+    empty = {"count": 0, "sum": 0.0, "min": None, "max": None}
+    es = FakeOffersClient([{
+        "key": {"day": "2026-01-15", "rome_code": "M1805", "location_department": None, "contract_type": "CDI"},
+        "doc_count": 3,
+        "salary_annual_min": salary,
+        "salary_annual_max": empty,
+    }])
+    rollup = DailyRollup(es)
+
+    actions = list(rollup._summaries(["2026-01-15"], "2026-01-16T00:00:00+00:00"))
+
+    assert rollup.rollup_index == "jobmarket_v3_daily"
+    assert actions[0]["_id"] == "2026-01-15|M1805||CDI"
+    doc = actions[0]["_source"]
+    assert doc["offers"] == 3
+    assert (doc["salary_annual_min_count"], doc["salary_annual_min_sum"]) == (2, 80000.0)
+    assert (doc["salary_annual_max_count"], doc["salary_annual_max_sum"]) == (0, None)
+    assert set(doc) <= set(rollup.index_definition()["mappings"]["properties"])
+    assert es.calls[0]["query"]["bool"]["should"] == [
+        {"range": {"published_at": {"gte": "2026-01-15", "lt": "2026-01-16"}}}
+    ]
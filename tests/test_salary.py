@@ -0,0 +1,89 @@
+"""
+Tests unitaires des salaires annuels normalisés.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ajouter la racine du projet au PYTHONPATH
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+pytest.importorskip("numpy")
+
+from pipelines.ingest.normalizer import normalize_offer, normalize_offers
+from pipelines.ingest.salary import annual_salary, annualize_salaries
+from pipelines.ingest.sources.francetravail.mapping import _parse_salary_libelle
+
+
+def test_annualize_salaries_by_unit():
+    offers = [
+        {"salary_min": 12.0, "salary_max": 14.0, "salary_unit": "hourly", "weekly_hours": 35.0},
+        {"salary_min": 12.0, "salary_max": None, "salary_unit": "hourly", "weekly_hours": 24.0},
+        {"salary_min": 3000.0, "salary_max": 3500.0, "salary_unit": "monthly"},
+        {"salary_min": 45000.0, "salary_max": 55000.0, "salary_unit": "yearly"},
+    ]
+
+    annualize_salaries(offers)
+
+    assert [(o["salary_annual_min"], o["salary_annual_max"]) for o in offers] == [
+        (21840.0, 25480.0),
+        (14976.0, None),
+        (36000.0, 42000.0),
+        (45000.0, 55000.0),
+    ]
+
+
+def test_annualize_salaries_ignores_missing_amounts_and_units():
+    offers = [
+        {"salary_min": 3000.0, "salary_unit": None},
+        {"salary_min": 1800.0, "salary_max": None, "salary_unit": "monthly"},
+        {},
+    ]
+
+    annualize_salaries(offers)
+
+    assert offers[0]["salary_annual_min"] is None
+    assert (offers[1]["salary_annual_min"], offers[1]["salary_annual_max"]) == (21600.0, None)
+    assert offers[2] == {"salary_annual_min": None, "salary_annual_max": None}
+    assert annualize_salaries([]) == []
+
+
+def test_scalar_and_vectorized_conversions_agree():
+    offers = [
+        {"salary_min": 11.65, "salary_unit": "hourly", "weekly_hours": 24.0},
+        {"salary_min": 11.65, "salary_unit": "hourly", "weekly_hours": 0},
+        {"salary_min": 2500.0, "salary_unit": "monthly"},
+        {"salary_min": 42000.0, "salary_unit": "yearly"},
+        {"salary_min": 42000.0, "salary_unit": "weekly"},
+    ]
+
+    expected = [annual_salary(o["salary_min"], o["salary_unit"], o.get("weekly_hours")) for o in offers]
+
+    assert [o["salary_annual_min"] for o in annualize_salaries(offers)] == expected
+
+
+def test_parser_ignores_payment_duration():
+    # "sur 12.0 mois" n'est pas un montant maximum
+    assert _parse_salary_libelle("Mensuel de 3000.0 Euros sur 12.0 mois") == (3000.0, None, "monthly")
+    assert _parse_salary_libelle("Annuel de 38000.0 Euros à 42000.0 Euros sur 13 mois") == (38000.0, 42000.0, "yearly")
+
+
+def test_normalize_offers_fills_annual_salary():
+    raws = [{"id": "1", "salaire": {"libelle": "Mensuel de 2500.0 Euros à 3000.0 Euros"}}]
+
+    offer = normalize_offers(raws, "francetravail")[0]
+
+    assert offer["salary_unit"] == "monthly"
+    assert (offer["salary_annual_min"], offer["salary_annual_max"]) == (30000.0, 36000.0)
+
+
+def test_normalize_offer_fills_annual_salary():
+    raw = {"id": "1", "salaire": {"libelle": "Horaire de 12.0 Euros sur 12 mois"}}
+
+    offer = normalize_offer(raw, "francetravail")
+
+    assert (offer.salary_annual_min, offer.salary_annual_max) == (21840.0, None)
@@ -0,0 +1,174 @@
+"""
+Tests du stockage SQLite embarqué (FTS5, filtres, pagination, agrégations).
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ajouter la racine du projet au PYTHONPATH
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from pipelines.storage.backends import UnsupportedQuery, create_storage_client, storage_backend
+from pipelines.storage.content_hashes import ContentHashStore
+from pipelines.storage.sqlite import SQLiteClient
+
+OFFERS = [
+    {"id": "1", "title": "Data engineer", "description": "Pipelines Spark", "contract_type": "CDI",
+     "rome_code": "M1805", "published_at": "2026-01-15T10:00:00Z", "salary_annual_min": 40000.0,
+     "skills": ["Python", "Spark"]},
+    {"id": "2", "title": "Data analyst", "description": "Tableaux de bord pour l'équipe data engineer",
+     "contract_type": "CDD", "rome_code": "M1403", "published_at": "2026-01-16T00:30:00+01:00",
+     "salary_annual_min": 50000.0, "skills": ["SQL"]},
+    {"id": "3", "title": "Développeur back-end", "description": "API Python", "contract_type": "CDI",
+     "rome_code": "M1805", "published_at": "2026-02-01T08:00:00Z", "salary_annual_min": 60000.0,
+     "skills": ["Python"]},
+    {"id": "4", "title": "Chef de projet", "description": "Méthodes agiles", "contract_type": "CDI",
+     "rome_code": "M1806"},
+]
+
+
+@pytest.fixture
+def store():
+    client = SQLiteClient(":memory:", index_name="offers_test")
+    client.create_index()
+    client.bulk_index_offers(OFFERS)
+    yield client
+    client.close()
+
+
+def ids(result):
+    return [hit["_id"] for hit in result["hits"]["hits"]]
+
+
+def test_bulk_index_skips_unchanged_offers(tmp_path):
+    client = SQLiteClient(":memory:", index_name="offers_test")
+    client.create_index()
+    hashes = ContentHashStore(tmp_path / "hashes.json")
+
+    first = client.bulk_index_offers(OFFERS, hashes=hashes)
+    second = client.bulk_index_offers(OFFERS + [{"title": "sans identifiant"}], hashes=hashes)
+
+    assert (first["indexed"], first["errors"]) == (4, 0)
+    assert (second["indexed"], second["unchanged"], second["errors"]) == (0, 4, 1)
+    assert client.count() == 4
+    assert client.get_stats()["total_documents"] == 4
+
+
+def test_full_text_search_ranks_title_matches_first(store):
+    result = store.search({"query": {"multi_match": {"query": "data engineer", "fields": ["title^3", "description"]}}})
+
+    assert ids(result) == ["1", "2"]
+    assert result["hits"]["hits"][0]["_score"] > result["hits"]["hits"][1]["_score"]
+    # Accents ignorés, comme l'analyseur français d'Elasticsearch
+    assert ids(store.search({"query": {"match": {"title": "developpeur"}}})) == ["3"]
+
+
+def test_filters_on_columns_arrays_and_dates(store):
+    query = {"bool": {
+        "filter": [{"term": {"skills": "Python"}}, {"range": {"published_at": {"gte": "2026-01-01", "lt": "2026-02-01"}}}],
+        "must_not": [{"term": {"contract_type": "CDD"}}],
+    }}
+
+    assert ids(store.search({"query": query})) == ["1"]
+    assert ids(store.search({"query": {"bool": {"must_not": [{"exists": {"field": "salary_annual_min"}}]}}})) == ["4"]
+
+
+def test_update_keeps_full_text_index_in_sync(store):
+    store.bulk_index_offers([dict(OFFERS[0], title="Architecte cloud")])
+
+    assert ids(store.search({"query": {"match": {"title": "engineer"}}})) == []
+    assert ids(store.search({"query": {"match": {"title": "architecte"}}})) == ["1"]
+    assert store.count() == 4
+
+
+def test_search_after_pages_through_sorted_results(store):
+    body = {"size": 2, "sort": [{"published_at": {"order": "desc", "missing": "_last"}}, {"id": "asc"}]}
+    seen = []
+    while True:
+        page = store.search(dict(body))["hits"]["hits"]
+        seen += [hit["_id"] for hit in page]
+        if len(page) < body["size"]:
+            break
+        body["search_after"] = page[-1]["sort"]
+
+    assert seen == ["3", "2", "1", "4"]
+
+
+def test_aggregations_match_elasticsearch_shape(store):
+    result = store.search({
+        "size": 0,
+        "aggs": {
+            "contracts": {"terms": {"field": "contract_type"}, "aggs": {"salary": {"avg": {"field": "salary_annual_min"}}}},
+            "skills": {"terms": {"field": "skills", "size": 1}},
+            "days": {"date_histogram": {"field": "published_at", "calendar_interval": "day", "format": "yyyy-MM-dd"}},
+        }
+    })
+    aggs = result["aggregations"]
+
+    assert result["hits"]["total"]["value"] == 4
+    assert aggs["contracts"]["buckets"][0] == {"key": "CDI", "doc_count": 3, "salary": {"value": 50000.0}}
+    assert aggs["skills"]["buckets"] == [{"key": "Python", "doc_count": 2}]
+    assert aggs["skills"]["sum_other_doc_count"] == 2
+    # 2026-01-16T00:30+01:00 est le 15 janvier en UTC
+    assert [(b["key_as_string"], b["doc_count"]) for b in aggs["days"]["buckets"]] == [("2026-01-15", 2), ("2026-02-01", 1)]
+
+
+def test_salary_benchmark_uses_exact_percentiles(store):
+    benchmark = store.salary_benchmark(by="rome_code", percents=(50,), ranks=[45000])
+
+    assert benchmark["M1805"]["offers"] == 2
+    assert benchmark["M1805"]["percentiles"] == {50.0: 50000.0}
+    assert benchmark["M1805"]["ranks"] == {45000.0: 50.0}
+    assert "M1806" not in benchmark
+
+
+def test_unsupported_aggregation_is_rejected(store):
+    with pytest.raises(UnsupportedQuery):
+        store.search({"size": 0, "aggs": {"tiles": {"geotile_grid": {"field": "location_coordinates"}}}})
+
+
+def test_api_reports_unsupported_endpoint_as_not_implemented(store, capsys):
+    from pipelines.api.service import ReadAPI
+
+    api = ReadAPI(store)
+    status, body, _ = api.handle("/geo", {"zoom": ["6"]})
+
+    assert status == 501 and "geotile_grid" in body["error"]
+    # Limite connue : pas de trace d'erreur interne
+    assert "Traceback" not in capsys.readouterr().out
+    assert api.handle("/facets", {"field": ["contract_type"]})[0] == 200
+
+
+def test_backend_selected_from_environment(monkeypatch, tmp_path):
+    monkeypatch.setenv("STORAGE_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "offers.sqlite"))
+
+    client = create_storage_client(index_name="offers_test", connections_per_node=4)
+
+    assert storage_backend() == "sqlite"
+    assert isinstance(client, SQLiteClient)
+    assert client.create_index() and (tmp_path / "offers.sqlite").exists()
+    with pytest.raises(ValueError):
+        storage_backend("mongodb")
+
+
+def test_sqlite_backend_does_not_need_elasticsearch_package():
+    script = (
+        "import sys; sys.modules['elasticsearch'] = None\n"
+        "from pipelines.storage import create_storage_client\n"
+        "client = create_storage_client('sqlite')\n"
+        "client.create_index()\n"
+        "client.bulk_index_offers([{'id': '1', 'title': 'Data engineer', 'salary_annual_min': 40000.0}])\n"
+        "assert client.salary_benchmark()['_all']['offers'] == 1\n"
+        "assert 'pipelines.storage.elasticsearch' not in sys.modules\n"
+    )
+    env = dict(os.environ, SQLITE_PATH=":memory:")
+    result = subprocess.run([sys.executable, "-c", script], cwd=project_root, env=env, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr